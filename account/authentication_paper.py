@@ -1,11 +1,9 @@
 
 import os
-import sys
 
 from dotenv import load_dotenv
 
-from alpaca.trading.client import TradingClient
-from alpaca.data.historical.stock import StockHistoricalDataClient
+from account import clients
 
 def load_credentials():
 
@@ -27,28 +25,26 @@ def load_credentials():
     return email, password, paperAcc, liveAcc, paperAccUUID, accUUID, api_key, secret_key, webhook
 
 
-def load_client(email, api_key, secret_key):
+# Logs in (the account probe) and returns the shared clients; nothing is built at import any more.
+# api_key/secret_key: use these keys instead of the ones in .env from now on
+def load_client(email=None, api_key=None, secret_key=None):
 
-    print(f"logging in as {email} ...")
+    if api_key is not None or secret_key is not None:
+        clients.use_keys(api_key, secret_key, paper=True)
+    clients.login(paper=True, email=email)
 
-    client = TradingClient(api_key, secret_key, paper=True)
-    historicalClient = StockHistoricalDataClient(api_key, secret_key)
-    account = dict(client.get_account())
-    cash = account["cash"]
-    status = account["status"]
+    return clients.get("trading", paper=True), clients.get("historical")
 
-    print(f"\nlogin successful!\naccount status : {status}\ncash available : ${cash}\n\nhappy trading!\n\n")
 
-    return client, historicalClient
+#clients are built on first use (see account/clients.py)
+client = clients.lazy("trading", paper=True)
+historicalClient = clients.lazy("historical")
 
+CREDENTIALS = ("email", "password", "paperAcc", "liveAcc", "paperAccUUID", "accUUID", "api_key", "secret_key", "webhook")
 
-#load credentials
-email, password, paperAcc, liveAcc, paperAccUUID, accUUID, api_key, secret_key, webhook = load_credentials()
-
-#create client and historical client
-try:
-    client, historicalClient = load_client(email, api_key, secret_key)
-except Exception as error:
-    print("error creating client ...\nexiting program ...\ngoodbye!")
-    sys.exit(str(error))
 
+#credentials are read from .env when first asked for
+def __getattr__(name):
+    if name in CREDENTIALS:
+        return dict(zip(CREDENTIALS, load_credentials()))[name]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
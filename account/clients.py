@@ -0,0 +1,170 @@
+# clients.py
+
+# Alpaca clients built on first use instead of at import. The authentication modules used to load
+# credentials, build both clients and call get_account() as soon as they were imported, so a
+# backtest that only reads bars paid a login round trip and could not start without network.
+#
+#   get("historical")            the shared StockHistoricalDataClient (no account call)
+#   get("trading", paper=False)  the shared TradingClient for the live account
+#   lazy(kind, paper)            a stand-in object that resolves get() on first attribute access,
+#                                for module-level names like authentication_paper.historicalClient
+#   login(paper)                 the account probe (status and cash), for the live runner only
+#   install(kind, client)        put any object in place of a client (fakes for tests, offline runs)
+#   use_keys(api_key, secret_key) build and install clients for keys other than the .env ones
+#
+# Every client shares one requests.Session: keep-alive connections, and a pool as large as the
+# batch loader's thread count so concurrent requests don't open and drop connections.
+# ALPACA_OFFLINE=1 hands out OfflineClient for every kind not installed, so nothing reaches the network.
+
+import os
+import threading
+
+from dotenv import load_dotenv
+from requests import Session
+from requests.adapters import HTTPAdapter
+
+
+KINDS = ("trading", "historical")
+
+POOL_SIZE = int(os.getenv("ALPACA_POOL_SIZE", "32"))
+OFFLINE = os.getenv("ALPACA_OFFLINE", "0") == "1"
+# ALPACA_FAKE_DATA=synthetic or a fixture directory: the historical client is market_data.fake_client's
+FAKE_DATA = os.getenv("ALPACA_FAKE_DATA")
+
+_lock = threading.RLock()
+_clients = {}
+_installed = {}
+_session = None
+
+
+# Stand-in that refuses every call; offline backtests read only what the bar store already has
+class OfflineClient:
+
+    def __init__(self, kind):
+        self.kind = kind
+
+    def __getattr__(self, name):
+        raise RuntimeError(f"offline: the {self.kind} client is not available ({name}); "
+                           f"unset ALPACA_OFFLINE or install a client")
+
+
+# Resolves the registry on every attribute access, so a name imported before install() still
+# reaches the installed client
+class LazyClient:
+
+    def __init__(self, kind, paper=True):
+        self.kind = kind
+        self.paper = paper
+
+    def __getattr__(self, name):
+        return getattr(get(self.kind, self.paper), name)
+
+    def __repr__(self):
+        return f"LazyClient({self.kind!r}, paper={self.paper})"
+
+
+def lazy(kind, paper=True):
+    _check(kind)
+    return LazyClient(kind, paper)
+
+
+def session():
+    global _session
+    with _lock:
+        if _session is None:
+            _session = Session()
+            adapter = HTTPAdapter(pool_connections=len(KINDS) * 2, pool_maxsize=POOL_SIZE)
+            _session.mount("https://", adapter)
+            _session.mount("http://", adapter)
+        return _session
+
+
+def api_keys():
+    load_dotenv()
+    api_key = os.getenv("API_KEY")
+    secret_key = os.getenv("SECRET_KEY")
+    if not api_key or not secret_key:
+        raise ValueError("Missing API_KEY / SECRET_KEY in .env")
+    return api_key, secret_key
+
+
+# The client for kind (and paper/live for trading), built once; the historical client is the same
+# for paper and live keys
+def get(kind, paper=True):
+    key = _key(kind, paper)
+    with _lock:
+        for installed in (key, (kind, None)):
+            if installed in _installed:
+                return _installed[installed]
+        if kind == "historical" and FAKE_DATA and key not in _clients:
+            from market_data import fake_client
+            _clients[key] = fake_client.from_env()
+        if key in _clients:
+            return _clients[key]
+        if OFFLINE:
+            return OfflineClient(kind)
+        _clients[key] = build(*key)
+        return _clients[key]
+
+
+# A new client for kind, with the .env keys unless both keys are given
+def build(kind, paper=True, api_key=None, secret_key=None):
+    from alpaca.trading.client import TradingClient
+    from alpaca.data.historical.stock import StockHistoricalDataClient
+
+    _check(kind)
+    if api_key is None and secret_key is None:
+        api_key, secret_key = api_keys()
+    elif not api_key or not secret_key:
+        raise ValueError("pass both api_key and secret_key, or neither to use .env")
+    if kind == "trading":
+        client = TradingClient(api_key, secret_key, paper=paper)
+    else:
+        client = StockHistoricalDataClient(api_key, secret_key)
+    # alpaca's RESTClient opens a Session per client; share one pool instead
+    client._session = session()
+    if kind == "historical":
+        # the SDK retries a 429 three times, 3s apart, before raising; batch_loader retries bar requests
+        # itself so its rate limiter sees the first 429 (retry_attempts=0 can't be passed: the SDK
+        # keeps its default for anything but a positive count)
+        client._retry = 0
+    return client
+
+
+# Use client for kind from now on (paper=None: for both paper and live)
+def install(kind, client, paper=None):
+    _check(kind)
+    with _lock:
+        _installed[_key(kind, paper) if paper is not None else (kind, None)] = client
+
+
+# Clients built for explicit keys in place of the .env ones: trading for paper or live, and historical
+def use_keys(api_key, secret_key, paper=True):
+    install("trading", build("trading", paper, api_key, secret_key), paper=paper)
+    install("historical", build("historical", paper, api_key, secret_key))
+
+
+# Drop installed and built clients (the next get() builds again)
+def reset():
+    with _lock:
+        _installed.clear()
+        _clients.clear()
+
+
+# The old import-time login: one get_account() call to show the account is reachable
+def login(paper=True, email=None):
+    print(f"logging in as {email or os.getenv('EMAIL')} ...")
+    account = dict(get("trading", paper).get_account())
+    print(f"\nlogin successful!\naccount status : {account['status']}\ncash available : ${account['cash']}"
+          f"\n\nhappy trading!\n\n")
+    return account
+
+
+def _check(kind):
+    if kind not in KINDS:
+        raise ValueError(f"unknown client kind {kind!r}, expected one of {KINDS}")
+
+
+def _key(kind, paper):
+    _check(kind)
+    return kind, paper if kind == "trading" else True
@@ -8,8 +8,11 @@ import os
 from config import SCHEDULE_HOUR, SCHEDULE_MINUTE, MST, EST, UTC
 from notification import send_discord_alert
 from strategy import run_strategy
+from warmup import load_warmup, run_warmup
 from trading import account_info
 from logger import logger
+from account.authentication_paper import load_client
+from instrumentation import profiling
 
 from datetime import datetime, time
 import time as t
@@ -45,11 +48,39 @@ def scheduled_run():
         send_discord_alert(f"❗ BIBO failed at {timestamp}")
 
 
+def warmup_run():
+    try:
+        timestamp = datetime.now(tz=MST).strftime("%Y-%m-%d %H:%M")
+        logger.info(f"Running BIBO warm-up: {timestamp} -- ")
+        run_warmup()
+    except Exception as e:
+        # the pre-close scan falls back to warming up on its own
+        logger.error("BIBO warm-up failed", exc_info=True)
+        send_discord_alert("❗ BIBO warm-up failed, scan will warm up at pre-close")
+
+
 if __name__ == "__main__":
+    # `python main.py warmup` runs only the morning phase (e.g. from cron before the open)
+    if len(sys.argv) > 1 and sys.argv[1] == "warmup":
+        warmup_run()
+        profiling.report(logger.info)
+        sys.exit()
+
     timestamp = datetime.now(tz=MST).strftime("%Y-%m-%d %H:%M")
     logger.info(f"\n\n\n -- booting application: {timestamp} -- ")
     send_discord_alert(f" -- booting application: {timestamp} -- ")
 
+    # the account check that used to run when authentication_paper was imported
+    try:
+        load_client()
+    except Exception as error:
+        print("error creating client ...\nexiting program ...\ngoodbye!")
+        sys.exit(str(error))
+
+    # warm up while waiting for the pre-close window so the scan itself only pulls snapshots
+    if load_warmup() is None:
+        warmup_run()
+
     timecheck = datetime.now(tz=MST).time()
     while not time(13, 46) <= timecheck < time(13, 58):
         logger.info(f"-- delay BIBO: {timecheck.strftime('%H:%M')} -- ")
@@ -57,3 +88,5 @@ if __name__ == "__main__":
         timecheck = datetime.now(tz=MST).time()
 
     scheduled_run()
+    # PROFILE=1: where the scan's time went, in the trading log
+    profiling.report(logger.info)
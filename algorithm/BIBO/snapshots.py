@@ -0,0 +1,92 @@
+#snapshots.py
+
+# One scan's worth of snapshots. load() pulls the whole universe in a few multi-symbol
+# StockSnapshotRequests and keeps them in memory, so each symbol's daily_bar is a dict lookup
+# instead of its own HTTP call.
+
+import sys
+import os
+import threading
+
+from logger import logger
+from market_data import batch_loader
+
+from alpaca.data.requests import StockSnapshotRequest
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+
+SNAPSHOT_BATCH_SIZE = 200
+
+
+class SnapshotService:
+
+    def __init__(self, client, batch_size=SNAPSHOT_BATCH_SIZE, rate_limiter=None):
+        self.client = client
+        self.batch_size = batch_size
+        self.rate_limiter = rate_limiter or batch_loader.limiter
+        self.snapshots = {}
+        self.requested = set()
+        self.requests = 0
+        self.served = 0
+        # daily_bar is called from the scan's worker threads
+        self._lock = threading.Lock()
+
+    def _request(self, symbols):
+        with self._lock:
+            self.requested.update([symbols] if isinstance(symbols, str) else symbols)
+            self.requests += 1
+        self.rate_limiter.acquire()
+        snapshots = self.client.get_stock_snapshot(StockSnapshotRequest(symbol_or_symbols=symbols))
+        self.rate_limiter.success()
+        return snapshots
+
+    # Fetch every symbol not cached yet, batch_size symbols per request
+    def load(self, symbols):
+        missing = [s for s in dict.fromkeys(symbols) if s not in self.requested]
+        before = len(self.snapshots)
+        for batch in batch_loader.chunk(missing, self.batch_size):
+            try:
+                snapshots = self._request(batch)
+            except Exception as e:
+                logger.error(f"snapshot batch starting {batch[0]} failed: {e}")
+                continue
+            with self._lock:
+                self.snapshots.update(snapshots)
+
+        logger.info(f"snapshots: {len(self.snapshots) - before}/{len(missing)} symbols loaded in {self.requests} request(s)")
+        return self
+
+    # Today's daily bar so far as a dict, or None if the symbol has no snapshot
+    def daily_bar(self, symbol):
+        if symbol not in self.requested:
+            # not part of any batch: fall back to a single request so callers still get a bar
+            try:
+                snapshots = self._request(symbol)
+            except Exception as e:
+                logger.warning(f"snapshot for {symbol} failed: {e}")
+                return None
+            with self._lock:
+                self.snapshots.update(snapshots)
+
+        snapshot = self.snapshots.get(symbol)
+        if snapshot is None or snapshot.daily_bar is None:
+            return None
+
+        with self._lock:
+            self.served += 1
+        bar = snapshot.daily_bar
+        return {
+            "open": bar.open,
+            "high": bar.high,
+            "low": bar.low,
+            "close": bar.close,
+            "volume": bar.volume
+        }
+
+    # Every served bar used to be its own get_stock_snapshot call
+    def log_savings(self):
+        saved = max(self.served - self.requests, 0)
+        logger.info(f"snapshots: served {self.served} daily bars with {self.requests} HTTP call(s), "
+                    f"{saved} call(s) saved")
+        return saved
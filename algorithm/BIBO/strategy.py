@@ -4,110 +4,40 @@
 import sys
 import os
 
-from config import SPY_HARD, SPY_VOL_HARD, BASE_DIR, RISK_PER_TRADE, ATR_STOP_MULT, ATR_TP_MULT, MST
+from config import SPY_HARD, SPY_VOL_HARD, RISK_PER_TRADE, ATR_STOP_MULT, ATR_TP_MULT, MST, SCAN_WORKERS
 from trading import submit_order, load_open_positions, load_bto_orders
 from notification import send_discord_alert
 from logger import logger
 from account.authentication_paper import client, historicalClient
+from warmup import load_warmup, run_warmup, today_frame
+from snapshots import SnapshotService
+from instrumentation import profiling
 
-import pandas as pd
-from datetime import datetime, timedelta, time
-import pytz
+from datetime import datetime, time
 import math
+import concurrent.futures
 
-from alpaca.data.requests import StockBarsRequest, StockSnapshotRequest
 from alpaca.trading.requests import GetOrdersRequest
-from alpaca.data.timeframe import TimeFrame
 from alpaca.trading.enums import OrderSide
 
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
 
 
-def fetch_data(symbol):
-    end = datetime.now(pytz.UTC) - timedelta(days=1)
-    start = end - timedelta(days=230)
-    request = StockBarsRequest(
-        symbol_or_symbols=symbol,
-        timeframe=TimeFrame.Day,
-        start=start,
-        end=end,
-    )
-    try:
-        bars = historicalClient.get_stock_bars(request).df
-    except Exception as e:
-        logger.warning(f"Skipping {symbol}: {e}")
-        return None
-    if bars.empty or symbol not in bars.index.get_level_values(0):
-        return None
-
-    df = bars.xs(symbol, level=0).copy()
-    df.index = df.index.tz_convert('US/Eastern')
-
-    df = df.drop(columns=["vwap", "trade_count"])
-
-    latest_bar_resp = historicalClient.get_stock_snapshot(StockSnapshotRequest(symbol_or_symbols=symbol))
-    latest_bar = latest_bar_resp[symbol].daily_bar
-
-    latest_df = pd.DataFrame([{
-        "open": latest_bar.open,
-        "high": latest_bar.high,
-        "low": latest_bar.low,
-        "close": latest_bar.close,
-        "volume": latest_bar.volume
-    }], index=[latest_bar.timestamp.astimezone(pytz.timezone('US/Eastern'))])
-
-    df = pd.concat([df, latest_df])
-
-    return df
-
-
-def generate_symbols():
-    spy_holdings = pd.read_excel( os.path.join(BASE_DIR, "spy_holdings.xlsx"), skiprows=4)
-    spy_symbols = spy_holdings["Ticker"].dropna().tolist()
-    volume_rank = {}
-
-    for symbol in spy_symbols:
-        df = fetch_data(symbol)
-        if df is None or len(df) < 20:
-            continue
-        avg_dollar_volume = (df["close"] * df["volume"]).tail(20).mean()
-        volume_rank[symbol] = avg_dollar_volume
-
-    spy = sorted(volume_rank, key=volume_rank.get, reverse=True)
-    return spy
-
-
-def calculate_indicators(df):
-    if df is None or df.empty:
-        return None
-
-    df['SMA50'] = df['close'].rolling(50).mean()
-    df['SMA100'] = df['close'].rolling(100).mean()
-    df['SMA150'] = df['close'].rolling(150).mean()
-    high_low = df["high"] - df["low"]
-    high_close = (df["high"] - df["close"].shift()).abs()
-    low_close = (df["low"] - df["close"].shift()).abs()
-    tr = pd.concat([high_low, high_close, low_close], axis=1).max(axis=1)
-    df['ATR'] = tr.rolling(14).mean()
-    df['stock_return'] = df['close'].iloc[-1] / df['close'].iloc[-21] - 1
-
-    return df.dropna()
-
-
-def spy_data():
+def spy_data(warm, snapshots):
 
-    spy_df = fetch_data("SPY")
-    spy_df['SMA150'] = spy_df['close'].rolling(150).mean()
-    spy_return = spy_df['close'].iloc[-1] / spy_df['close'].iloc[-21] - 1
+    entry = warm["symbols"].get("SPY")
+    bar = snapshots.daily_bar("SPY")
+    spy_df = today_frame(entry, bar) if entry and bar else None
 
     if spy_df is None or len(spy_df) < 1:
         send_discord_alert("❌ SPY data insufficient.")
-        return False
+        return False, None
 
     today = spy_df.iloc[-1]
+    spy_return = today['stock_return']
     if today['close'] <= today['SMA150']:
         send_discord_alert("⚠️ No trades: SPY is below its 150SMA.")
-        return False
+        return False, None
 
     send_discord_alert("✅ Scanning: SPY is above its 150SMA.")
     logger.info("SPY trading above 150SMA")
@@ -158,46 +88,81 @@ def clear_bto_orders():
         logger.error(f"error canceling orders: {e}")
 
 
+# Signal row for one symbol (or None): today's snapshot applied to its warm indicators
+@profiling.timed("scan", symbol_arg=0)
+def scan_symbol(symbol, warm, snapshots, spy_return):
+    try:
+        bar = snapshots.daily_bar(symbol)
+        if bar is None:
+            logger.warning(f"No snapshot returned for {symbol}")
+            return None
+
+        df = today_frame(warm["symbols"][symbol], bar)
+        if df is None:
+            return None
+
+        signal, today = check_signal(df, spy_return)
+        return today if signal else None
+    except Exception as e:
+        logger.error(f"Error scanning {symbol}: {e}")
+        return None
+
+
+@profiling.timed()
 def run_strategy():
 
-    positions = list(load_open_positions().keys())
-    bto_orders = load_bto_orders()
-    account = client.get_account()
-    capital = float(account.cash)
+    with profiling.phase("account"):
+        positions = list(load_open_positions().keys())
+        bto_orders = load_bto_orders()
+        account = client.get_account()
+        capital = float(account.cash)
 
     if not time_check():
         return
 
-    check_spy, spy_return = spy_data()
+    # indicators, 20-day returns and the volume rank come from the morning warm-up;
+    # only rebuild them here if that job didn't run today
+    with profiling.phase("load_warmup"):
+        warm = load_warmup()
+    if warm is None:
+        logger.warning("no warm-up for today, running it inside the pre-close window")
+        warm = run_warmup()
+
+    spy = warm["rank"]
+
+    # every snapshot the scan needs, in a few batched requests
+    with profiling.phase("snapshots"):
+        snapshots = SnapshotService(historicalClient).load(["SPY"] + spy)
+
+    check_spy, spy_return = spy_data(warm, snapshots)
 
     if not check_spy:
+        snapshots.log_savings()
         return
 
-    spy = generate_symbols()
-
-    clear_bto_orders()
+    with profiling.phase("clear_bto_orders"):
+        clear_bto_orders()
 
+    candidates = []
     for symbol in spy:
-        timestamp = datetime.now(tz=MST).strftime("%Y-%m-%d %H:%M")
-
         if symbol in positions:
             logger.info(f"position exists: {symbol}")
             continue
         if symbol in bto_orders:
             logger.info(f"bto order exists: {symbol}")
             continue
+        candidates.append(symbol)
 
-        df = fetch_data(symbol)
-        if df is None or df.empty:
-            logger.warning(f"No data returned for {symbol}")
-            continue
+    # fetch + indicators + signal check run concurrently; orders still go out in rank order below
+    with concurrent.futures.ThreadPoolExecutor(max_workers=SCAN_WORKERS) as executor:
+        results = dict(zip(candidates, executor.map(lambda symbol: scan_symbol(symbol, warm, snapshots, spy_return),
+                                                     candidates)))
 
-        df = calculate_indicators(df)
-        if df is None or len(df) < 2:
-            continue
+    for symbol in candidates:
+        timestamp = datetime.now(tz=MST).strftime("%Y-%m-%d %H:%M")
 
-        signal, today = check_signal(df, spy_return)
-        if not signal:
+        today = results[symbol]
+        if today is None:
             continue
 
         risk = capital * RISK_PER_TRADE
@@ -218,7 +183,10 @@ def run_strategy():
             continue
 
         try:
-            submit_order(capital, symbol, qty, entry, sl, tp)
+            with profiling.phase("submit_order", symbol):
+                submit_order(capital, symbol, qty, entry, sl, tp)
         except Exception as e:
             logger.error(f"Error submitting order in {symbol}: {e}")
 
+    snapshots.log_savings()
+
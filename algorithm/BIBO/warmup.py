@@ -0,0 +1,142 @@
+#warmup.py
+
+# Morning phase of the BIBO runner. Everything that only depends on prior closes is computed
+# here and written to WARMUP_FILE, so the pre-close scan only needs one snapshot per symbol:
+#   - streaming SMA50/100/150 + ATR14 state (applied to today's bar at scan time)
+#   - yesterday's low, close and SMA50 for the buy-in condition
+#   - the close 20 bars back for the 20-day return
+#   - the dollar-volume rank of the universe
+
+import sys
+import os
+import json
+
+from config import BASE_DIR, WARMUP_FILE, HISTORY_DAYS, RANK_DAYS, MST
+from logger import logger
+from account.authentication_paper import historicalClient
+from market_data import batch_loader
+from instrumentation import profiling
+from algorithm.tradingObjects import indicators
+
+import pandas as pd
+from datetime import datetime, timedelta
+import pytz
+
+from alpaca.data.timeframe import TimeFrame
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+
+def history_window():
+    end = datetime.now(pytz.UTC) - timedelta(days=1)
+    start = end - timedelta(days=HISTORY_DAYS)
+    return start, end
+
+
+@profiling.timed()
+def fetch_history(symbols):
+    start, end = history_window()
+    try:
+        return batch_loader.load_bars_batched(symbols, TimeFrame.Day, start, end, client=historicalClient)
+    except batch_loader.BatchLoadError as e:
+        # warm up what did load; the failed symbols are left out of today's rank
+        logger.error(f"warmup: {e}")
+        return e.frames
+
+
+def universe():
+    spy_holdings = pd.read_excel(os.path.join(BASE_DIR, "spy_holdings.xlsx"), skiprows=4)
+    return spy_holdings["Ticker"].dropna().tolist()
+
+
+def trading_date():
+    return datetime.now(tz=MST).date().isoformat()
+
+
+# Warm state for one symbol from its completed daily bars
+def warm_symbol(df):
+    df = df.sort_index()
+    state = indicators.BiboIndicators()
+    state.update_frame(df)
+    yesterday = df.iloc[-1]
+
+    return {
+        "indicators": state.to_dict(),
+        "yesterday": {
+            "low": float(yesterday["low"]),
+            "close": float(yesterday["close"]),
+            "SMA50": state.sma50.value,
+            "SMA150": state.sma150.value
+        },
+        # today's close is compared with the close 20 bars before it
+        "close_20": float(df["close"].iloc[-20]) if len(df) >= 20 else None,
+        "dollar_volume": float((df["close"] * df["volume"]).tail(RANK_DAYS).mean())
+    }
+
+
+@profiling.timed()
+def run_warmup():
+    started = datetime.now()
+    symbols = universe()
+
+    history = fetch_history(symbols + ["SPY"])
+    logger.info(f"warmup: daily history loaded for {len(history)}/{len(symbols) + 1} symbols")
+
+    states = {}
+    for symbol, df in history.items():
+        if df is None or df.empty:
+            continue
+        with profiling.phase("warm_symbol", symbol):
+            states[symbol] = warm_symbol(df)
+
+    ranked = [s for s in symbols if s in states and len(history[s]) >= RANK_DAYS]
+    ranked.sort(key=lambda s: states[s]["dollar_volume"], reverse=True)
+
+    warm = {"date": trading_date(), "rank": ranked, "symbols": states}
+    save_warmup(warm)
+
+    logger.info(f"warmup: {len(ranked)} symbols ranked in {(datetime.now() - started).total_seconds():.1f}s")
+    return warm
+
+
+def save_warmup(warm, path=WARMUP_FILE):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(warm, f)
+    os.replace(tmp_path, path)
+
+
+# Today's warm state, or None if the morning job hasn't run today
+def load_warmup(path=WARMUP_FILE):
+    if not os.path.isfile(path):
+        return None
+    with open(path) as f:
+        warm = json.load(f)
+    if warm.get("date") != trading_date():
+        return None
+    return warm
+
+
+# Yesterday + today rows in the shape check_signal expects, with today's bar applied to a copy of the
+# warm indicator state (the persisted state itself stays at yesterday's close)
+def today_frame(entry, bar):
+    state = indicators.BiboIndicators.from_dict(entry["indicators"])
+    values = state.update(bar["high"], bar["low"], bar["close"])
+    # like calculate_indicators' dropna(): yesterday needs a full set of indicators too
+    if None in values.values() or entry["yesterday"]["SMA150"] is None or entry["close_20"] is None:
+        return None
+
+    stock_return = bar["close"] / entry["close_20"] - 1
+    yesterday = entry["yesterday"]
+    return pd.DataFrame([
+        {"open": None, "high": None, "low": yesterday["low"], "close": yesterday["close"], "volume": None,
+         "SMA50": yesterday["SMA50"], "SMA100": None, "SMA150": None, "ATR": None, "stock_return": None},
+        {"open": bar["open"], "high": bar["high"], "low": bar["low"], "close": bar["close"], "volume": bar["volume"],
+         "SMA50": values["SMA50"], "SMA100": values["SMA100"], "SMA150": values["SMA150"], "ATR": values["ATR14"],
+         "stock_return": stock_return}
+    ])
+
+
+if __name__ == "__main__":
+    run_warmup()
@@ -1,3 +1,10 @@
+import numpy as np
+
+
+BULL = 1
+BEAR = -1
+NEUTRAL = 0
+SIDES = {BULL: 'bull', BEAR: 'bear', NEUTRAL: 'neutral'}
 
 
 class Candle:
@@ -15,3 +22,96 @@ class Candle:
             self.side = 'bear'
         else:
             self.side = 'neutral'
+
+
+# Bars as contiguous float64 columns plus an int8 side (1 bull, -1 bear, 0 neutral).
+# Per-bar loops read opens/highs/lows/closes/lasts: memoryviews over the same arrays that index
+# like lists and hand back Python floats, with no object built per bar. Indexing one bar gives a
+# CandleView with the same attributes as Candle, for code that wants a bar object rather than
+# speed; slicing gives a CandleSeries over views of the same arrays, so windows never copy.
+class CandleSeries:
+
+    def __init__(self, open, high, low, close, last=None, side=None):
+        self.open = np.ascontiguousarray(open, dtype=np.float64)
+        self.high = np.ascontiguousarray(high, dtype=np.float64)
+        self.low = np.ascontiguousarray(low, dtype=np.float64)
+        self.close = np.ascontiguousarray(close, dtype=np.float64)
+        self.last = self.close if last is None else np.ascontiguousarray(last, dtype=np.float64)
+        if side is None:
+            side = np.sign(self.close - self.open).astype(np.int8)
+        self.side = side
+        self.opens, self.highs, self.lows, self.closes, self.lasts = (
+            memoryview(a) for a in (self.open, self.high, self.low, self.close, self.last))
+
+    # From alpaca Bars or bar_store rows (anything with .open/.high/.low/.close); last is the close
+    @classmethod
+    def from_bars(cls, bars):
+        bars = bars if isinstance(bars, (list, tuple)) else list(bars)
+        # one column at a time straight into its final array, no per-bar tuples kept alive
+        columns = [np.fromiter((getattr(bar, name) for bar in bars), dtype=np.float64, count=len(bars))
+                   for name in ("open", "high", "low", "close")]
+        return cls(*columns)
+
+    @classmethod
+    def from_frame(cls, df):
+        return cls(df["open"].to_numpy(), df["high"].to_numpy(), df["low"].to_numpy(), df["close"].to_numpy())
+
+    def __len__(self):
+        return len(self.close)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return CandleSeries(self.open[i], self.high[i], self.low[i], self.close[i], self.last[i], self.side[i])
+        if i < 0:
+            i += len(self.close)
+        if not 0 <= i < len(self.close):
+            raise IndexError("candle index out of range")
+        return CandleView(self, i)
+
+    def __iter__(self):
+        for i in range(len(self.close)):
+            yield CandleView(self, i)
+
+    # The n bars before index end (fewer near the start), as a view
+    def window(self, end, n):
+        return self[max(0, end - n):end]
+
+    @property
+    def nbytes(self):
+        arrays = [self.open, self.high, self.low, self.close, self.side]
+        if self.last is not self.close:
+            arrays.append(self.last)
+        return sum(a.nbytes for a in arrays)
+
+
+# One bar of a CandleSeries, read through to the arrays; values come back as Python floats
+class CandleView:
+    __slots__ = ("series", "index")
+
+    def __init__(self, series, index):
+        self.series = series
+        self.index = index
+
+    @property
+    def open(self):
+        return self.series.opens[self.index]
+
+    @property
+    def high(self):
+        return self.series.highs[self.index]
+
+    @property
+    def low(self):
+        return self.series.lows[self.index]
+
+    @property
+    def close(self):
+        return self.series.closes[self.index]
+
+    @property
+    def lastPrice(self):
+        return self.series.lasts[self.index]
+
+    @property
+    def side(self):
+        return SIDES[self.series.side.item(self.index)]
@@ -0,0 +1,415 @@
+# indicators.py
+
+# Streaming indicators: each object holds just enough state to fold in one new bar in O(1),
+# and round-trips through to_dict()/from_dict() (plain JSON types) so a live runner can
+# persist it overnight and apply only the next bar. value is None until the window is full,
+# matching the NaN warm-up of the pandas rolling versions they replace. rolling_max/rolling_min/
+# swing_levels are the whole-series counterparts for backtests that have every bar up front.
+
+import json
+import math
+import os
+from collections import deque
+
+import numpy as np
+import pandas as pd
+
+
+def _missing(x):
+    return x is None or (isinstance(x, float) and math.isnan(x))
+
+
+# Rolling sum over the last `window` values with Kahan compensation, like pandas' rolling sum.
+# Missing values occupy a slot but are not summed; the result needs a full window of real values.
+class RollingSum:
+
+    def __init__(self, window):
+        self.window = window
+        self.values = deque()
+        self.total = 0.0
+        self.comp = 0.0
+        self.count = 0
+
+    def _add(self, x):
+        y = x - self.comp
+        t = self.total + y
+        self.comp = (t - self.total) - y
+        self.total = t
+
+    def update(self, x):
+        x = None if _missing(x) else float(x)
+        self.values.append(x)
+        if x is not None:
+            self._add(x)
+            self.count += 1
+
+        if len(self.values) > self.window:
+            old = self.values.popleft()
+            if old is not None:
+                self._add(-old)
+                self.count -= 1
+            if self.count == 0:
+                # nothing left in the window, drop any rounding residue
+                self.total = self.comp = 0.0
+        return self.value
+
+    @property
+    def value(self):
+        if self.count < self.window:
+            return None
+        return self.total
+
+    def to_dict(self):
+        return {"window": self.window, "values": list(self.values), "total": self.total,
+                "comp": self.comp, "count": self.count}
+
+    @classmethod
+    def from_dict(cls, state):
+        obj = cls(state["window"])
+        obj.values = deque(state["values"])
+        obj.total = state["total"]
+        obj.comp = state["comp"]
+        obj.count = state["count"]
+        return obj
+
+
+# df[col].rolling(window).mean()
+class SMA:
+
+    def __init__(self, window):
+        self.sum = RollingSum(window)
+
+    def update(self, x):
+        self.sum.update(x)
+        return self.value
+
+    @property
+    def value(self):
+        total = self.sum.value
+        return None if total is None else total / self.sum.window
+
+    def to_dict(self):
+        return {"sum": self.sum.to_dict()}
+
+    @classmethod
+    def from_dict(cls, state):
+        obj = cls.__new__(cls)
+        obj.sum = RollingSum.from_dict(state["sum"])
+        return obj
+
+
+# EMA seeded with the SMA of the first `period` closes, as calculate_ema in backtesting.py
+class EMA:
+
+    def __init__(self, period):
+        self.period = period
+        self.k = 2 / (period + 1)
+        self.seed = []
+        self.value = None
+
+    def update(self, x):
+        if self.value is not None:
+            self.value = x * self.k + self.value * (1 - self.k)
+        else:
+            self.seed.append(x)
+            if len(self.seed) == self.period:
+                self.value = sum(self.seed) / self.period
+                self.seed = []
+        return self.value
+
+    def to_dict(self):
+        return {"period": self.period, "seed": list(self.seed), "value": self.value}
+
+    @classmethod
+    def from_dict(cls, state):
+        obj = cls(state["period"])
+        obj.seed = list(state["seed"])
+        obj.value = state["value"]
+        return obj
+
+
+# True range: max(high - low, |high - prev close|, |low - prev close|); just high - low on the first bar
+class TrueRange:
+
+    def __init__(self):
+        self.prev_close = None
+        self.value = None
+
+    def update(self, high, low, close):
+        tr = high - low
+        if self.prev_close is not None:
+            tr = max(tr, abs(high - self.prev_close), abs(low - self.prev_close))
+        self.prev_close = close
+        self.value = tr
+        return tr
+
+    def to_dict(self):
+        return {"prev_close": self.prev_close, "value": self.value}
+
+    @classmethod
+    def from_dict(cls, state):
+        obj = cls()
+        obj.prev_close = state["prev_close"]
+        obj.value = state["value"]
+        return obj
+
+
+# tr.rolling(window).mean(), the ATR14 used by the BIBO scripts
+class ATR:
+
+    def __init__(self, window=14):
+        self.tr = TrueRange()
+        self.mean = SMA(window)
+
+    def update(self, high, low, close):
+        return self.mean.update(self.tr.update(high, low, close))
+
+    @property
+    def value(self):
+        return self.mean.value
+
+    def to_dict(self):
+        return {"tr": self.tr.to_dict(), "mean": self.mean.to_dict()}
+
+    @classmethod
+    def from_dict(cls, state):
+        obj = cls.__new__(cls)
+        obj.tr = TrueRange.from_dict(state["tr"])
+        obj.mean = SMA.from_dict(state["mean"])
+        return obj
+
+
+# ADX14 from BIBO6: rolling-sum directional movement over rolling-sum TR, DX averaged over `window`
+class ADX:
+
+    def __init__(self, window=14):
+        self.tr = TrueRange()
+        self.tr_sum = RollingSum(window)
+        self.plus_dm = RollingSum(window)
+        self.minus_dm = RollingSum(window)
+        self.dx = SMA(window)
+        self.prev_high = None
+        self.prev_low = None
+
+    def update(self, high, low, close):
+        tr_sum = self.tr_sum.update(self.tr.update(high, low, close))
+
+        if self.prev_high is None:
+            # high.diff() is NaN on the first bar
+            plus_dm = minus_dm = None
+        else:
+            delta_high = high - self.prev_high
+            delta_low = self.prev_low - low
+            plus_dm = delta_high if delta_high > delta_low and delta_high > 0 else 0.0
+            minus_dm = delta_low if delta_low > delta_high and delta_low > 0 else 0.0
+        self.prev_high, self.prev_low = high, low
+
+        plus_sum = self.plus_dm.update(plus_dm)
+        minus_sum = self.minus_dm.update(minus_dm)
+
+        dx = None
+        if tr_sum is not None and plus_sum is not None and minus_sum is not None and tr_sum != 0:
+            plus_di = 100 * plus_sum / tr_sum
+            minus_di = 100 * minus_sum / tr_sum
+            if plus_di + minus_di != 0:
+                dx = 100 * abs(plus_di - minus_di) / (plus_di + minus_di)
+        return self.dx.update(dx)
+
+    @property
+    def value(self):
+        return self.dx.value
+
+    def to_dict(self):
+        return {"tr": self.tr.to_dict(), "tr_sum": self.tr_sum.to_dict(), "plus_dm": self.plus_dm.to_dict(),
+                "minus_dm": self.minus_dm.to_dict(), "dx": self.dx.to_dict(),
+                "prev_high": self.prev_high, "prev_low": self.prev_low}
+
+    @classmethod
+    def from_dict(cls, state):
+        obj = cls.__new__(cls)
+        obj.tr = TrueRange.from_dict(state["tr"])
+        obj.tr_sum = RollingSum.from_dict(state["tr_sum"])
+        obj.plus_dm = RollingSum.from_dict(state["plus_dm"])
+        obj.minus_dm = RollingSum.from_dict(state["minus_dm"])
+        obj.dx = SMA.from_dict(state["dx"])
+        obj.prev_high = state["prev_high"]
+        obj.prev_low = state["prev_low"]
+        return obj
+
+
+# Rolling max over the last `window` values with a monotonic deque of (index, value): each value is
+# pushed and popped at most once, so update is O(1) amortized instead of max() over the window.
+class RollingMax:
+
+    def __init__(self, window):
+        self.window = window
+        self.deque = deque()
+        self.count = 0
+
+    @staticmethod
+    def _dominates(new, old):
+        return new >= old
+
+    def update(self, x):
+        x = float(x)
+        while self.deque and self._dominates(x, self.deque[-1][1]):
+            self.deque.pop()
+        self.deque.append((self.count, x))
+        self.count += 1
+        if self.deque[0][0] <= self.count - 1 - self.window:
+            self.deque.popleft()
+        return self.value
+
+    @property
+    def value(self):
+        if self.count < self.window:
+            return None
+        return self.deque[0][1]
+
+    def to_dict(self):
+        return {"window": self.window, "deque": [list(item) for item in self.deque], "count": self.count}
+
+    @classmethod
+    def from_dict(cls, state):
+        obj = cls(state["window"])
+        obj.deque = deque(tuple(item) for item in state["deque"])
+        obj.count = state["count"]
+        return obj
+
+
+class RollingMin(RollingMax):
+
+    @staticmethod
+    def _dominates(new, old):
+        return new <= old
+
+
+# Swing high/low of the last `lookback` bars for the Fib retracement scans. Read value before folding
+# in the current bar to get find_recent_swing(data, c): the range of the bars before c.
+class Swing:
+
+    def __init__(self, lookback=20):
+        self.high = RollingMax(lookback)
+        self.low = RollingMin(lookback)
+
+    def update(self, high, low):
+        self.high.update(high)
+        self.low.update(low)
+        return self.value
+
+    @property
+    def value(self):
+        if self.high.value is None:
+            return None
+        return self.high.value, self.low.value
+
+    def to_dict(self):
+        return {"high": self.high.to_dict(), "low": self.low.to_dict()}
+
+    @classmethod
+    def from_dict(cls, state):
+        obj = cls.__new__(cls)
+        obj.high = RollingMax.from_dict(state["high"])
+        obj.low = RollingMin.from_dict(state["low"])
+        return obj
+
+
+# Whole-series rolling max in O(n) (van Herk/Gil-Werman): split into window-sized blocks, take running
+# maxima forwards and backwards inside each block, and every window is the max of one suffix and one
+# prefix. out[i] covers values[i - window + 1 : i + 1]; NaN until the window is full.
+def rolling_max(values, window):
+    values = np.asarray(values, dtype=np.float64)
+    n = len(values)
+    out = np.full(n, np.nan)
+    if window < 1 or n < window:
+        return out
+
+    padded = np.full(-(-n // window) * window, -np.inf)
+    padded[:n] = values
+    blocks = padded.reshape(-1, window)
+    prefix = np.maximum.accumulate(blocks, axis=1).ravel()
+    suffix = np.maximum.accumulate(blocks[:, ::-1], axis=1)[:, ::-1].ravel()
+
+    out[window - 1:] = np.maximum(suffix[:n - window + 1], prefix[window - 1:n])
+    return out
+
+
+def rolling_min(values, window):
+    return -rolling_max(-np.asarray(values, dtype=np.float64), window)
+
+
+# Swing.value for every bar of a series at once: (swing_high, swing_low) arrays where entry i is the
+# range of the `lookback` bars before i, NaN for the first `lookback` bars
+def swing_levels(high, low, lookback=20):
+    swing_high = np.full(len(high), np.nan)
+    swing_low = np.full(len(low), np.nan)
+    swing_high[1:] = rolling_max(high, lookback)[:-1]
+    swing_low[1:] = rolling_min(low, lookback)[:-1]
+    return swing_high, swing_low
+
+
+# The BIBO indicator set (SMA50/100/150, ATR14) for one symbol, plus the timestamp of the last bar
+# folded in so a resumed state only applies bars it has not seen
+class BiboIndicators:
+
+    def __init__(self):
+        self.sma50 = SMA(50)
+        self.sma100 = SMA(100)
+        self.sma150 = SMA(150)
+        self.atr14 = ATR(14)
+        self.last_timestamp = None
+
+    def update(self, high, low, close, timestamp=None):
+        self.sma50.update(close)
+        self.sma100.update(close)
+        self.sma150.update(close)
+        self.atr14.update(high, low, close)
+        if timestamp is not None:
+            self.last_timestamp = str(timestamp)
+        return self.values()
+
+    # Fold in the rows of a bar frame newer than last_timestamp
+    def update_frame(self, df):
+        if self.last_timestamp is not None:
+            df = df[df.index > pd.Timestamp(self.last_timestamp)]
+        for ts, high, low, close in zip(df.index, df["high"], df["low"], df["close"]):
+            self.update(high, low, close, ts)
+        return self.values()
+
+    def values(self):
+        return {"SMA50": self.sma50.value, "SMA100": self.sma100.value,
+                "SMA150": self.sma150.value, "ATR14": self.atr14.value}
+
+    def copy(self):
+        return BiboIndicators.from_dict(self.to_dict())
+
+    def to_dict(self):
+        return {"sma50": self.sma50.to_dict(), "sma100": self.sma100.to_dict(), "sma150": self.sma150.to_dict(),
+                "atr14": self.atr14.to_dict(), "last_timestamp": self.last_timestamp}
+
+    @classmethod
+    def from_dict(cls, state):
+        obj = cls.__new__(cls)
+        obj.sma50 = SMA.from_dict(state["sma50"])
+        obj.sma100 = SMA.from_dict(state["sma100"])
+        obj.sma150 = SMA.from_dict(state["sma150"])
+        obj.atr14 = ATR.from_dict(state["atr14"])
+        obj.last_timestamp = state["last_timestamp"]
+        return obj
+
+
+# {symbol: BiboIndicators} <-> one JSON file, written atomically
+def save_states(path, states):
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump({symbol: state.to_dict() for symbol, state in states.items()}, f)
+    os.replace(tmp_path, path)
+
+
+def load_states(path):
+    if not os.path.isfile(path):
+        return {}
+    with open(path) as f:
+        return {symbol: BiboIndicators.from_dict(state) for symbol, state in json.load(f).items()}
+
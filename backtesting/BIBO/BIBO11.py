@@ -7,14 +7,19 @@ from bs4 import BeautifulSoup
 import concurrent.futures
 
 from datetime import datetime, timedelta
-from alpaca.data.requests import StockBarsRequest
 from alpaca.data.timeframe import TimeFrame
-from account.authentication_paper import historicalClient
+from market_data import bar_store, batch_loader
+from instrumentation import profiling
+from simulation import engine, exits, panel, trading_calendar
 import algorithm.tradingObjects.candle as candle
 import csv
 import pytz
 
 
+# BIBO11 logs BarsHeld before PnL
+CLOSE_COLUMNS = ("ExitPrice", "Outcome", "BarsHeld", "PnL")
+
+
 def get_sp500_symbols():
 
     #symbols = ['MMM', 'AOS', 'ABT', 'ABBV', 'ACN', 'ADBE', 'AMD', 'AES', 'AFL', 'A', 'APD', 'ABNB', 'AKAM', 'ALB', 'ARE', 'ALGN', 'ALLE', 'LNT', 'ALL', 'GOOGL', 'MO', 'AMZN', 'AMCR', 'AEE', 'AEP', 'AXP', 'AIG', 'AMT', 'AWK', 'AMP', 'AME', 'AMGN', 'APH', 'ADI', 'ANSS', 'AON', 'APA', 'APO', 'AAPL', 'AMAT', 'APTV', 'ACGL', 'ADM', 'ANET', 'AJG', 'AIZ', 'T', 'ATO', 'ADSK', 'ADP', 'AZO', 'AVB', 'AVY', 'AXON', 'BKR', 'BALL', 'BAC', 'BAX', 'BDX', 'BBY', 'TECH', 'BIIB', 'BLK', 'BX', 'BK', 'BA', 'BKNG', 'BSX', 'BMY', 'AVGO', 'BR', 'BRO', 'BLDR', 'BG', 'BXP', 'CHRW', 'CDNS', 'CZR', 'CPT', 'CPB', 'COF', 'CAH', 'KMX', 'CCL', 'CARR', 'CAT', 'CBOE', 'CBRE', 'CDW', 'COR', 'CNC', 'CNP', 'CF', 'CRL', 'SCHW', 'CHTR', 'CVX', 'CMG', 'CB', 'CHD', 'CI', 'CINF', 'CTAS', 'CSCO', 'C', 'CFG', 'CLX', 'CME', 'CMS', 'KO', 'CTSH', 'COIN', 'CL', 'CMCSA', 'CAG', 'COP', 'ED', 'STZ', 'CEG', 'COO', 'CPRT', 'GLW', 'CPAY', 'CTVA', 'CSGP', 'COST', 'CTRA', 'CRWD', 'CCI', 'CSX', 'CMI', 'CVS', 'DHR', 'DRI', 'DDOG', 'DVA', 'DAY', 'DECK', 'DE', 'DELL', 'DAL', 'DVN', 'DXCM', 'FANG', 'DLR', 'DG', 'DLTR', 'D', 'DPZ', 'DASH', 'DOV', 'DOW', 'DHI', 'DTE', 'DUK', 'DD', 'EMN', 'ETN', 'EBAY', 'ECL', 'EIX', 'EW', 'EA', 'ELV', 'EMR', 'ENPH', 'ETR', 'EOG', 'EPAM', 'EQT', 'EFX', 'EQIX', 'EQR', 'ERIE', 'ESS', 'EL', 'EG', 'EVRG', 'ES', 'EXC', 'EXE', 'EXPE', 'EXPD', 'EXR', 'XOM', 'FFIV', 'FDS', 'FICO', 'FAST', 'FRT', 'FDX', 'FIS', 'FITB', 'FSLR', 'FE', 'FI', 'F', 'FTNT', 'FTV', 'FOXA', 'FOX', 'BEN', 'FCX', 'GRMN', 'IT', 'GE', 'GEHC', 'GEV', 'GEN', 'GNRC', 'GD', 'GIS', 'GM', 'GPC', 'GILD', 'GPN', 'GL', 'GDDY', 'GS', 'HAL', 'HIG', 'HAS', 'HCA', 'DOC', 'HSIC', 'HSY', 'HES', 'HPE', 'HLT', 'HOLX', 'HD', 'HON', 'HRL', 'HST', 'HWM', 'HPQ', 'HUBB', 'HUM', 'HBAN', 'HII', 'IBM', 'IEX', 'IDXX', 'ITW', 'INCY', 'IR', 'PODD', 'INTC', 'ICE', 'IFF', 'IP', 'IPG', 'INTU', 'ISRG', 'IVZ', 'INVH', 'IQV', 'IRM', 'JBHT', 'JBL', 'JKHY', 'J', 'JNJ', 'JCI', 'JPM', 'K', 'KVUE', 'KDP', 'KEY', 'KEYS', 'KMB', 'KIM', 'KMI', 'KKR', 'KLAC', 'KHC', 'KR', 'LHX', 'LH', 'LRCX', 'LW', 'LVS', 'LDOS', 'LEN', 'LII', 'LLY', 'LIN', 'LYV', 'LKQ', 'LMT', 'L', 'LOW', 'LULU', 'LYB', 'MTB', 'MPC', 'MKTX', 'MAR', 'MMC', 'MLM', 'MAS', 'MA', 'MTCH', 'MKC', 'MCD', 'MCK', 'MDT', 'MRK', 'META', 'MET', 'MTD', 'MGM', 'MCHP', 'MU', 'MSFT', 'MAA', 'MRNA', 'MHK', 'MOH', 'TAP', 'MDLZ', 'MPWR', 'MNST', 'MCO', 'MS', 'MOS', 'MSI', 'MSCI', 'NDAQ', 'NTAP', 'NFLX', 'NEM', 'NWSA', 'NWS', 'NEE', 'NKE', 'NI', 'NDSN', 'NSC', 'NTRS', 'NOC', 'NCLH', 'NRG', 'NUE', 'NVDA', 'NVR', 'NXPI', 'ORLY', 'OXY', 'ODFL', 'OMC', 'ON', 'OKE', 'ORCL', 'OTIS', 'PCAR', 'PKG', 'PLTR', 'PANW', 'PARA', 'PH', 'PAYX', 'PAYC', 'PYPL', 'PNR', 'PEP', 'PFE', 'PCG', 'PM', 'PSX', 'PNW', 'PNC', 'POOL', 'PPG', 'PPL', 'PFG', 'PG', 'PGR', 'PLD', 'PRU', 'PEG', 'PTC', 'PSA', 'PHM', 'PWR', 'QCOM', 'DGX', 'RL', 'RJF', 'RTX', 'O', 'REG', 'REGN', 'RF', 'RSG', 'RMD', 'RVTY', 'ROK', 'ROL', 'ROP', 'ROST', 'RCL', 'SPGI', 'CRM', 'SBAC', 'SLB', 'STX', 'SRE', 'NOW', 'SHW', 'SPG', 'SWKS', 'SJM', 'SW', 'SNA', 'SOLV', 'SO', 'LUV', 'SWK', 'SBUX', 'STT', 'STLD', 'STE', 'SYK', 'SMCI', 'SYF', 'SNPS', 'SYY', 'TMUS', 'TROW', 'TTWO', 'TPR', 'TRGP', 'TGT', 'TEL', 'TDY', 'TER', 'TSLA', 'TXN', 'TPL', 'TXT', 'TMO', 'TJX', 'TKO', 'TSCO', 'TT', 'TDG', 'TRV', 'TRMB', 'TFC', 'TYL', 'TSN', 'USB', 'UBER', 'UDR', 'ULTA', 'UNP', 'UAL', 'UPS', 'URI', 'UNH', 'UHS', 'VLO', 'VTR', 'VLTO', 'VRSN', 'VRSK', 'VZ', 'VRTX', 'VTRS', 'VICI', 'V', 'VST', 'VMC', 'WRB', 'GWW', 'WAB', 'WBA', 'WMT', 'DIS', 'WBD', 'WM', 'WAT', 'WEC', 'WFC', 'WELL', 'WST', 'WDC', 'WY', 'WSM', 'WMB', 'WTW', 'WDAY', 'WYNN', 'XEL', 'XYL', 'YUM', 'ZBRA', 'ZBH', 'ZTS']
@@ -23,10 +28,10 @@ def get_sp500_symbols():
     return symbols
 
 
+@profiling.timed(symbol_arg=0)
 def fetch_data(symbol, start, end, buffer_days=400):
     buffered_start = start - timedelta(days=buffer_days)
-    req = StockBarsRequest(symbol_or_symbols=symbol, timeframe=TimeFrame.Day, start=buffered_start, end=end)
-    bars = historicalClient.get_stock_bars(req)[symbol]
+    bars = bar_store.load_bar_rows(symbol, TimeFrame.Day, buffered_start, end)
     data = [{
         "timestamp": pd.to_datetime(bar.timestamp).normalize(),
         "symbol": symbol,
@@ -52,143 +57,43 @@ def add_indicators(df):
     return df
 
 
-def find_signal_today(df, spy, current_date):
-    if current_date not in df.index:
-        return None
-
-    idx = df.index.get_loc(current_date)
-
-    if idx < 1:
-        return None
-
-    today = df.iloc[idx]
-    yesterday = df.iloc[idx - 1]
-    spy_today = spy.iloc[idx]
-
-    cond1 = today["SMA50"] > today["SMA100"] > today["SMA150"]
-    cond2 = yesterday["low"] < yesterday["SMA50"] < yesterday["close"]
-    cond3 = today["close"] > yesterday["close"]
-    cond4 = today["close"] > today["open"]
-    cond5 = spy_today["close"] > spy_today["SMA150"]
-    cond6 = today["low"] < yesterday["high"] * 1.05
-
-    if cond1 and cond2 and cond3 and cond4 and cond5:
-        return today
-
-    return None
-
-
+@profiling.timed()
 def simulate_market(start, end):
     symbols = get_sp500_symbols()
-    market_data = {}
+
+    # one request per batch of symbols (with fetch_data's buffer); fetch_data below then reads from the bar store
+    with profiling.phase("prefetch"):
+        batch_loader.prefetch(symbols + ["SPY"], TimeFrame.Day, start - timedelta(days=400), end)
+
+    def indicators(symbol, df):
+        with profiling.phase("add_indicators", symbol):
+            return add_indicators(df)
 
     with concurrent.futures.ThreadPoolExecutor() as executor:
         futures = {executor.submit(fetch_data, symbol, start, end): symbol for symbol in symbols}
-        for future in concurrent.futures.as_completed(futures):
-            symbol = futures[future]
-            try:
-                df = future.result()
-                df = add_indicators(df)
-                market_data[symbol] = df
-            except Exception as e:
-                print(f"Error loading {symbol}: {e}")
+        market_data = batch_loader.collect_in_order(futures, symbols, indicators)
 
     spy_data = fetch_data("SPY", start, end)
-    spy_data = add_indicators(spy_data)
-
-    initial_capital = 10000
-    available_capital = capital = initial_capital
-    signals_total = 0
-    signals_taken = 0
-    open_positions = []
-    trade_log = []
-    peak = capital
-    max_drawdown = 0
-
-    all_dates = pd.date_range(start=start, end=end, freq='B', tz="UTC")
-
-    for current_date in all_dates:
-        still_open = []
-        for trade in open_positions:
-            symbol = trade["Symbol"]
-            df = market_data[symbol]
-            if current_date not in df.index:
-                still_open.append(trade)
-                continue
-
-            row = df.loc[current_date]
-            if row["low"] <= trade["StopLoss"]:
-                exit_price = trade["StopLoss"]
-                outcome = "Stopped Out"
-            elif row["high"] >= trade["TakeProfit"]:
-                exit_price = trade["TakeProfit"]
-                outcome = "Target Hit"
-            else:
-                still_open.append(trade)
-                continue
-
-            pnl = round((exit_price - trade["EntryPrice"]) * trade["PositionSize"], 2)
-            bars_held = (current_date - trade["EntryDate"]).days
-            capital += pnl
-            available_capital += ((trade["PositionSize"] * trade["EntryPrice"]) + pnl)
-
-            trade_log.append({
-                **trade,
-                "ExitPrice": round(exit_price, 2),
-                "Outcome": outcome,
-                "BarsHeld": bars_held,
-                "PnL": pnl
-            })
-
-        open_positions = still_open
-
-        for symbol, df in market_data.items():
-
-            signal = find_signal_today(df, spy_data, current_date)
-
-            if signal is None:
-                continue
-
-            if any(position.get("Symbol") == symbol for position in open_positions):
-                continue
-
-            signals_total += 1
-
-            entry_price = signal["close"] * 1.0025
-            atr = signal["ATR14"]
-            stop_loss = entry_price - 0.4 * atr
-            take_profit = entry_price + 1.2 * atr
-            risk = 0.01 * available_capital
-            diff = entry_price - stop_loss
-            position_size = math.floor(risk / diff) if diff > 0 else 0
-            required_capital = position_size * entry_price
-
-            if required_capital <= available_capital and position_size > 0:
-                available_capital -= required_capital
-                signals_taken += 1
-                open_positions.append({
-                    "Symbol": symbol,
-                    "EntryDate": current_date,
-                    "EntryPrice": round(entry_price, 2),
-                    "StopLoss": round(stop_loss, 2),
-                    "TakeProfit": round(take_profit, 2),
-                    "PositionSize": round(position_size, 2)
-                })
-
-        if capital > peak:
-            peak = capital
-        drawdown = (peak - capital) / peak
-        max_drawdown = max(max_drawdown, drawdown)
-
-    max_drawdown_pct = max_drawdown * 100
-    return trade_log, initial_capital, capital, max_drawdown_pct, signals_total, signals_taken
+    with profiling.phase("add_indicators", "SPY"):
+        spy_data = add_indicators(spy_data)
+    trading_days = trading_calendar.TradingCalendar(market_data)
+    with profiling.phase("signals"):
+        signal_calendar = panel.bibo_signal_calendar(market_data, spy_data, min_row=1, trading_calendar=trading_days)
+
+    all_dates = trading_days.between(start, end)
+    entry_rule = engine.atr_bracket(0.4, 1.2, 0.01, entry_markup=1.0025, risk_available=True, whole_shares=True)
+    exit_rule = profiling.timed("exits")(exits.ExitSchedule(market_data, trading_days).resolve)
+    with profiling.phase("simulate"):
+        result = engine.simulate(signal_calendar, all_dates, entry_rule, exit_rule,
+                                 initial_capital=10000, one_per_symbol=True, close_columns=CLOSE_COLUMNS)
+    return (result.trade_log, result.initial_capital, result.capital, result.max_drawdown_pct,
+            result.signals_total, result.signals_taken)
 
 
 def calculate_spy(start_date, end_date):
     symbol = "SPY"
 
-    req = StockBarsRequest(symbol_or_symbols=symbol, timeframe=TimeFrame.Day, start=start_date, end=end_date)
-    bars = historicalClient.get_stock_bars(req)[symbol]
+    bars = bar_store.load_bar_rows(symbol, TimeFrame.Day, start_date, end_date)
     data = [{
         "timestamp": pd.to_datetime(bar.timestamp).normalize(),
         "symbol": symbol,
@@ -214,6 +119,7 @@ def calculate_spy(start_date, end_date):
     return pnl, max_drawdown
 
 
+@profiling.timed()
 def save_trades_to_csv(trades, initial_capital, final_capital, max_drawdown_pct, signals_total, signals_taken,
                        spy_performance, spy_drawdown, filename):
     if not trades:
@@ -4,9 +4,9 @@ from bs4 import BeautifulSoup
 import concurrent.futures
 
 from datetime import datetime
-from alpaca.data.requests import StockBarsRequest
 from alpaca.data.timeframe import TimeFrame
-from account.authentication_paper import historicalClient
+from market_data import bar_store
+from simulation import exits
 import algorithm.tradingObjects.candle as candle
 import csv
 import pytz
@@ -36,8 +36,7 @@ def get_sp500_symbols():
 
 
 def fetch_data(symbol, start, end):
-    req = StockBarsRequest(symbol_or_symbols=symbol, timeframe=TimeFrame.Day, start=start, end=end)
-    bars = historicalClient.get_stock_bars(req)[symbol]
+    bars = bar_store.load_bar_rows(symbol, TimeFrame.Day, start, end)
     data = [{
         "timestamp": pd.to_datetime(bar.timestamp).normalize(),
         "open": bar.open,
@@ -85,23 +84,7 @@ def simulate_trade(df, signal_index, capital):
     diff = entry_price - stop_loss
     position_size = risk / diff if diff > 0 else 0
 
-    outcome = "Expired"
-    exit_price = df.iloc[-1]["close"]
-    bars_held = 0
-
-    for j in range(signal_index + 1, len(df)):
-        low = df.iloc[j]["low"]
-        high = df.iloc[j]["high"]
-        bars_held = j - signal_index
-
-        if low <= stop_loss:
-            outcome = "Stopped Out"
-            exit_price = stop_loss
-            break
-        if high >= take_profit:
-            outcome = "Target Hit"
-            exit_price = take_profit
-            break
+    outcome, exit_price, bars_held = exits.resolve_bracket(df, signal_index, stop_loss, take_profit)
 
     pnl = round((exit_price - entry_price) * position_size, 2)
 
@@ -4,9 +4,9 @@ from bs4 import BeautifulSoup
 import concurrent.futures
 
 from datetime import datetime, timedelta
-from alpaca.data.requests import StockBarsRequest
 from alpaca.data.timeframe import TimeFrame
-from account.authentication_paper import historicalClient
+from market_data import bar_store, batch_loader
+from simulation import engine, exits, panel, trading_calendar
 import algorithm.tradingObjects.candle as candle
 import csv
 import pytz
@@ -27,8 +27,7 @@ def get_sp500_symbols():
 
 
 def fetch_data(symbol, start, end):
-    req = StockBarsRequest(symbol_or_symbols=symbol, timeframe=TimeFrame.Day, start=start, end=end)
-    bars = historicalClient.get_stock_bars(req)[symbol]
+    bars = bar_store.load_bar_rows(symbol, TimeFrame.Day, start, end)
     data = [{
         "timestamp": pd.to_datetime(bar.timestamp).normalize(),
         "symbol": symbol,
@@ -54,135 +53,24 @@ def add_indicators(df):
     return df
 
 
-def find_signal_today(df, current_date):
-
-    if current_date not in df.index:
-        return None
-
-    idx = df.index.get_loc(current_date)
-    if idx < 151:
-        return None
-
-    today = df.iloc[idx]
-    yesterday = df.iloc[idx - 1]
-
-    #indicators = ["SMA50", "SMA100", "SMA150", "ATR14"]
-    #if any(pd.isna(today[ind]) or pd.isna(yesterday.get(ind)) for ind in indicators):
-    #    return None
-
-    cond1 = today["SMA50"] > today["SMA100"] > today["SMA150"]
-    cond2 = yesterday["low"] < yesterday["SMA50"] < yesterday["close"]
-    cond3 = today["close"] > yesterday["close"]
-    cond4 = today["close"] > today["open"]
-
-    if cond1 and cond2 and cond3 and cond4:
-        return today
-
-    return None
-
-
 def simulate_market(start, end):
     symbols = get_sp500_symbols()
-    market_data = {}
+
+    # one request per batch of symbols; fetch_data below then reads from the bar store
+    batch_loader.prefetch(symbols, TimeFrame.Day, start, end)
 
     with concurrent.futures.ThreadPoolExecutor() as executor:
         futures = {executor.submit(fetch_data, symbol, start, end): symbol for symbol in symbols}
-        for future in concurrent.futures.as_completed(futures):
-            symbol = futures[future]
-            try:
-                df = future.result()
-                df = add_indicators(df)
-                market_data[symbol] = df
-            except Exception as e:
-                print(f"Error loading {symbol}: {e}")
-
-    capital = 10000
-    available_capital = capital
-    signals_total = 0
-    signals_taken = 0
-    open_positions = []
-    trade_log = []
-    peak = capital
-    max_drawdown = 0
-
-    all_dates = pd.date_range(start=start, end=end, freq='B', tz="UTC")
-
-    for current_date in all_dates:
-        # Close trades
-        still_open = []
-        for trade in open_positions:
-            symbol = trade["Symbol"]
-            df = market_data[symbol]
-            if current_date not in df.index:
-                still_open.append(trade)
-                continue
-
-            row = df.loc[current_date]
-            if row["low"] <= trade["StopLoss"]:
-                exit_price = trade["StopLoss"]
-                outcome = "Stopped Out"
-            elif row["high"] >= trade["TakeProfit"]:
-                exit_price = trade["TakeProfit"]
-                outcome = "Target Hit"
-            else:
-                still_open.append(trade)
-                continue
-
-            pnl = round((exit_price - trade["EntryPrice"]) * trade["PositionSize"], 2)
-            bars_held = (current_date - trade["EntryDate"]).days
-            capital += pnl
-            available_capital += ((trade["PositionSize"] * trade["EntryPrice"]) + pnl)
-
-            trade_log.append({
-                **trade,
-                "ExitPrice": round(exit_price, 2),
-                "Outcome": outcome,
-                "PnL": pnl,
-                "BarsHeld": bars_held
-            })
-
-        open_positions = still_open
-
-        # Open new trades
-        for symbol, df in market_data.items():
-
-            print(f"checking {symbol}")
-            signal = find_signal_today(df, current_date)
-            if signal is None:
-                continue
-
-            print(f"signal found in {symbol}")
-            signals_total += 1
-
-            entry_price = signal["close"]
-            atr = signal["ATR14"]
-            stop_loss = entry_price - 0.5 * atr
-            take_profit = entry_price + 1 * atr
-            risk = 0.005 * capital
-            diff = entry_price - stop_loss
-            position_size = risk / diff if diff > 0 else 0
-            required_capital = position_size * entry_price
-
-            if required_capital <= available_capital and position_size > 0:
-                print(f"opening a position in {symbol} @ {entry_price} -- portfolio = {capital}")
-                available_capital -= required_capital
-                signals_taken += 1
-                open_positions.append({
-                    "Symbol": symbol,
-                    "EntryDate": current_date,
-                    "EntryPrice": round(entry_price, 2),
-                    "StopLoss": round(stop_loss, 2),
-                    "TakeProfit": round(take_profit, 2),
-                    "PositionSize": round(position_size, 2)
-                })
-
-        if capital > peak:
-            peak = capital
-        drawdown = (peak - capital) / peak
-        max_drawdown = max(max_drawdown, drawdown)
-
-    max_drawdown_pct = max_drawdown * 100
-    return trade_log, capital, max_drawdown_pct, signals_total, signals_taken
+        market_data = batch_loader.collect_in_order(futures, symbols, lambda symbol, df: add_indicators(df))
+
+    trading_days = trading_calendar.TradingCalendar(market_data)
+    signal_calendar = panel.bibo_signal_calendar(market_data, trading_calendar=trading_days)
+
+    all_dates = trading_days.between(start, end)
+    entry_rule = engine.atr_bracket(0.5, 1, 0.005)
+    result = engine.simulate(signal_calendar, all_dates, entry_rule, exits.ExitSchedule(market_data, trading_days).resolve,
+                             initial_capital=10000, verbose=True)
+    return result.trade_log, result.capital, result.max_drawdown_pct, result.signals_total, result.signals_taken
 
 
 def save_trades_to_csv(trades, final_capital, max_drawdown_pct, signals_total, signals_taken, filename):
@@ -1,5 +1,6 @@
 import math
 import random
+import sys
 
 import pandas as pd
 import requests
@@ -7,14 +8,21 @@ from bs4 import BeautifulSoup
 import concurrent.futures
 
 from datetime import datetime, timedelta
-from alpaca.data.requests import StockBarsRequest
 from alpaca.data.timeframe import TimeFrame
-from account.authentication_paper import historicalClient
+from market_data import bar_store, batch_loader
+from instrumentation import profiling
+from simulation import bracket_grid, engine, exits, ordering, panel, results_store, sweep, trading_calendar, walk_forward
 import algorithm.tradingObjects.candle as candle
 import csv
 import pytz
 
 
+# Order the day's signals are considered in (see simulation.ordering); "random" shuffles with the
+# sweep's per-combination rng, or with ORDER_SEED when simulate_market is called without one
+SIGNAL_ORDER = "random"
+ORDER_SEED = 42
+
+
 def get_sp500_symbols():
     # url = "https://en.wikipedia.org/wiki/List_of_S%26P_500_companies"
     # resp = requests.get(url)
@@ -31,9 +39,9 @@ def get_sp500_symbols():
     return symbols
 
 
+@profiling.timed(symbol_arg=0)
 def fetch_data(symbol, start, end):
-    req = StockBarsRequest(symbol_or_symbols=symbol, timeframe=TimeFrame.Day, start=start, end=end)
-    bars = historicalClient.get_stock_bars(req)[symbol]
+    bars = bar_store.load_bar_rows(symbol, TimeFrame.Day, start, end)
     data = [{
         "timestamp": pd.to_datetime(bar.timestamp).normalize(),
         "symbol": symbol,
@@ -59,136 +67,65 @@ def add_indicators(df):
     return df
 
 
-def find_signal_today(df, spy, current_date):
-
-    if current_date not in df.index:
-        return None
-
-    idx = df.index.get_loc(current_date)
-    if idx < 151:
-        return None
-
-    today = df.iloc[idx]
-    yesterday = df.iloc[idx - 1]
-
-    spy_today = spy.iloc[idx]
-
-    cond1 = today["SMA50"] > today["SMA100"] > today["SMA150"]
-    cond2 = yesterday["low"] < yesterday["SMA50"] < yesterday["close"]
-    cond3 = today["close"] > yesterday["close"]
-    cond4 = today["close"] > today["open"]
-    cond5 = spy_today["close"] > spy_today["SMA150"]
-
-    if cond1 and cond2 and cond3 and cond4 and cond5:
-        return today
-
-    return None
-
-
-def simulate_market(start, end, market_data, spy_data, initial_capital, sl_multiple, tp_multiple, risk_perc):
-
-    available_capital = capital = initial_capital
-    signals_total = 0
-    signals_taken = 0
-    open_positions = []
-    trade_log = []
-    peak = capital
-    max_drawdown = 0
-
-    all_dates = pd.date_range(start=start, end=end, freq='B', tz="UTC")
-
-    for current_date in all_dates:
-        still_open = []
-        for trade in open_positions:
-            symbol = trade["Symbol"]
-            df = market_data[symbol]
-            if current_date not in df.index:
-                still_open.append(trade)
-                continue
-
-            row = df.loc[current_date]
-            if row["low"] <= trade["StopLoss"]:
-                exit_price = trade["StopLoss"]
-                outcome = "Stopped Out"
-            elif row["high"] >= trade["TakeProfit"]:
-                exit_price = trade["TakeProfit"]
-                outcome = "Target Hit"
-            else:
-                still_open.append(trade)
-                continue
-
-            pnl = round((exit_price - trade["EntryPrice"]) * trade["PositionSize"], 2)
-            bars_held = (current_date - trade["EntryDate"]).days
-            capital += pnl
-            available_capital += ((trade["PositionSize"] * trade["EntryPrice"]) + pnl)
-
-            trade_log.append({
-                **trade,
-                "ExitPrice": round(exit_price, 2),
-                "Outcome": outcome,
-                "PnL": pnl,
-                "BarsHeld": bars_held
-            })
-
-        open_positions = still_open
-
-        # Convert the items to a list and shuffle it
-        items = list(market_data.items())
-        random.shuffle(items)
-
-        # Loop through randomized symbol-data pairs
-        for symbol, df in items:
-
-        #for symbol, df in market_data.items():
-
-            #print(f"checking {symbol}")
-            signal = find_signal_today(df, spy_data, current_date)
-
-            if signal is None:
-                continue
-
-            if any(position.get("symbol") == symbol for position in open_positions):
-                continue
-
-            #print(f"signal found in {symbol}")
-            signals_total += 1
-
-            entry_price = signal["close"]
-            atr = signal["ATR14"]
-            stop_loss = entry_price - sl_multiple * atr
-            take_profit = entry_price + tp_multiple * atr
-            risk = risk_perc * capital
-            diff = entry_price - stop_loss
-            position_size = risk / diff if diff > 0 else 0
-            required_capital = position_size * entry_price
-
-            if required_capital <= available_capital and position_size > 0:
-                #print(f"opening a position in {symbol} @ {entry_price} -- portfolio = {capital}")
-                available_capital -= required_capital
-                signals_taken += 1
-                open_positions.append({
-                    "Symbol": symbol,
-                    "EntryDate": current_date,
-                    "EntryPrice": round(entry_price, 2),
-                    "StopLoss": round(stop_loss, 2),
-                    "TakeProfit": round(take_profit, 2),
-                    "PositionSize": round(position_size, 2)
-                })
-
-        if capital > peak:
-            peak = capital
-        drawdown = (peak - capital) / peak
-        max_drawdown = max(max_drawdown, drawdown)
-
-    max_drawdown_pct = max_drawdown * 100
-    return trade_log, capital, max_drawdown_pct, signals_total, signals_taken
+@profiling.timed()
+def simulate_market(start, end, market_data, spy_data, initial_capital, sl_multiple, tp_multiple, risk_perc, signal_calendar=None, rng=None,
+                    trading_days=None, signal_order=SIGNAL_ORDER):
+
+    if trading_days is None:
+        trading_days = trading_calendar.TradingCalendar(market_data)
+    if signal_calendar is None:
+        with profiling.phase("signals"):
+            signal_calendar = panel.bibo_signal_calendar(market_data, spy_data, trading_calendar=trading_days)
+
+    if signal_order == "random" and rng is not None:
+        order = ordering.shuffled(market_data, rng)
+    else:
+        order = ordering.make(signal_order, market_data, trading_days, seed=ORDER_SEED)
+
+    all_dates = trading_days.between(start, end)
+    entry_rule = engine.atr_bracket(sl_multiple, tp_multiple, risk_perc)
+    exit_rule = profiling.timed("exits")(exits.ExitSchedule(market_data, trading_days).resolve)
+    with profiling.phase("simulate"):
+        result = engine.simulate(signal_calendar, all_dates, entry_rule, exit_rule,
+                                 initial_capital=initial_capital, order=order)
+    return result.trade_log, result.capital, result.max_drawdown_pct, result.signals_total, result.signals_taken
+
+
+# Every combination of a grid in one process: signals scanned once, exits for all SL/TP pairs resolved
+# in one batch, then each combination's sizing replayed on its own. All combinations share one signal
+# ordering (signal_order seeded with ORDER_SEED), so each result equals simulate_market without an rng.
+def simulate_grid(start, end, market_data, spy_data, combinations, signal_calendar=None, trading_days=None,
+                  signal_order=SIGNAL_ORDER):
+
+    if trading_days is None:
+        trading_days = trading_calendar.TradingCalendar(market_data)
+    if signal_calendar is None:
+        with profiling.phase("signals"):
+            signal_calendar = panel.bibo_signal_calendar(market_data, spy_data, trading_calendar=trading_days)
+
+    all_dates = list(trading_days.between(start, end))
+    with profiling.phase("exits"):
+        grid = bracket_grid.BracketGrid(market_data, signal_calendar, all_dates,
+                                        [(p["sl_multiple"], p["tp_multiple"]) for p in combinations],
+                                        trading_calendar=trading_days)
+    order = ordering.memoized(ordering.make(signal_order, market_data, trading_days, seed=ORDER_SEED))
+
+    results = []
+    for params in combinations:
+        entry_rule = engine.atr_bracket(params["sl_multiple"], params["tp_multiple"], params["risk_perc"])
+        with profiling.phase("simulate"):
+            result = engine.simulate(signal_calendar, all_dates, entry_rule,
+                                     grid.exit_rule(params["sl_multiple"], params["tp_multiple"]),
+                                     initial_capital=params["initial_capital"], order=order)
+        results.append((result.trade_log, result.capital, result.max_drawdown_pct, result.signals_total,
+                        result.signals_taken))
+    return results
 
 
 def calculate_spy(start_date, end_date):
     symbol = "SPY"
 
-    req = StockBarsRequest(symbol_or_symbols=symbol, timeframe=TimeFrame.Day, start=start_date, end=end_date)
-    bars = historicalClient.get_stock_bars(req)[symbol]
+    bars = bar_store.load_bar_rows(symbol, TimeFrame.Day, start_date, end_date)
     data = [{
         "timestamp": pd.to_datetime(bar.timestamp).normalize(),
         "symbol": symbol,
@@ -214,6 +151,7 @@ def calculate_spy(start_date, end_date):
     return pnl, max_drawdown
 
 
+@profiling.timed()
 def save_trades_to_csv(trades, initial_capital, final_capital, max_drawdown_pct, signals_total, signals_taken, spy_performance, spy_drawdown,
                        filename):
     if not trades:
@@ -258,95 +196,99 @@ def save_trades_to_csv(trades, initial_capital, final_capital, max_drawdown_pct,
         f.write(f"Alpha: {round(pct_change - spy_performance, 2)}\n")
 
 
-def save_parameter_stats_to_csv(stats, spy_performance, spy_drawdown, filename):
+# signals don't depend on SL/TP/risk, so each sweep worker scans once for the whole grid
+def scan_signals(data):
+    trading_days = trading_calendar.TradingCalendar(data["market_data"])
+    with profiling.phase("signals"):
+        signal_calendar = panel.bibo_signal_calendar(data["market_data"], data["spy_data"], trading_calendar=trading_days)
+    return {"trading_days": trading_days, "signal_calendar": signal_calendar}
 
-    if not stats:
-        print("No trades to save.")
-        return
 
-    with open(filename, "w", newline="", encoding="utf-8") as f:
+def run_combination(data, params, rng):
+    return simulate_market(SWEEP_START, SWEEP_END, data["market_data"], data["spy_data"], params["initial_capital"],
+                           params["sl_multiple"], params["tp_multiple"], params["risk_perc"],
+                           data["signal_calendar"], rng, data["trading_days"])
 
-        for i in stats:
-
-            trades = i["Trades"]
-            initial_capital = i["InitialCapital"]
-            final_capital = i["FinalCapital"]
-            drawdown = i["Drawdown"]
-            signals_total = i["SigTotal"]
-            signals_taken = i["SigTaken"]
-            sl_multiple = i["SLMult"]
-            tp_multiple = i["TPMult"]
-            risk = i["Risk"]
-
-            f.write(f"\n\nStrategy Description:\n")
-            f.write(f"Initial Capital: {initial_capital}\n")
-            f.write(f"Risk Amount: {risk}\n")
-            f.write(f"SL Multiple: {sl_multiple}\n")
-            f.write(f"TP Multiple: {tp_multiple}\n")
-
-            total_pnl = sum(t["PnL"] for t in trades)
-            num_trades = len(trades)
-            wins = [t for t in trades if t["PnL"] > 0]
-            win_rate = len(wins) / num_trades * 100 if num_trades > 0 else 0
-            avg_pnl = total_pnl / num_trades if num_trades > 0 else 0
-            avg_bars_held = sum(t["BarsHeld"] for t in trades) / num_trades if num_trades > 0 else 0
-            pct_change = ((final_capital - initial_capital) / initial_capital) * 100
-
-            f.write("\nSummary:\n")
-            f.write(f"Total PnL: {round(total_pnl, 2)}\n")
-            f.write(f"Win Rate: {round(win_rate, 2)}%\n")
-            f.write(f"Average PnL: {round(avg_pnl, 2)}\n")
-            f.write(f"Average Bars Held: {round(avg_bars_held, 2)}\n")
-            f.write(f"% Change: {round(pct_change, 2)}%\n")
-            f.write(f"Max Drawdown (%): {round(drawdown, 2)}%\n")
-            f.write(f"Signals Total: {signals_total}\n")
-            f.write(f"Signals Taken: {signals_taken}\n")
-            f.write(f"Signals Taken (%): {round((signals_taken / signals_total) * 100, 2)}\n")
-            f.write(f"SPY Performance: {spy_performance}%\n")
-            f.write(f"SPY Drawdown: {spy_drawdown}%\n")
-            f.write(f"Alpha: {round(pct_change - spy_performance, 2)}\n")
 
-if __name__ == "__main__":
+# One combination over the fold window in params["start"] / params["end"] (walk-forward mode)
+def run_window(data, params, rng):
+    return simulate_market(params["start"], params["end"], data["market_data"], data["spy_data"], params["initial_capital"],
+                           params["sl_multiple"], params["tp_multiple"], params["risk_perc"],
+                           data["signal_calendar"], rng, data["trading_days"])
+
+
+# One parameter set under N seeded signal orderings, for the spread that ordering alone causes
+def run_seed(data, params, rng):
+    return simulate_market(SWEEP_START, SWEEP_END, data["market_data"], data["spy_data"], **MONTE_CARLO_PARAMS,
+                           signal_calendar=data["signal_calendar"], rng=rng, trading_days=data["trading_days"])
+
 
-    start_date = datetime(2021, 1, 1)
-    end_date = datetime(2025, 6, 30)
+SWEEP_START = datetime(2021, 1, 1)
+SWEEP_END = datetime(2025, 6, 30)
+SWEEP_SEED = 42
+MONTE_CARLO_PARAMS = {"initial_capital": 10000, "sl_multiple": 0.4, "tp_multiple": 1.2, "risk_perc": 0.01}
+MONTE_CARLO_RUNS = 100
+WALK_FORWARD_TRAIN_MONTHS = 24
+WALK_FORWARD_TEST_MONTHS = 6
 
-    parameter_stats = []
-    num_tests = 0
+if __name__ == "__main__":
+
+    start_date = SWEEP_START
+    end_date = SWEEP_END
 
     symbols = get_sp500_symbols()
-    market_data = {}
+
+    # one request per batch of symbols; fetch_data below then reads from the bar store
+    with profiling.phase("prefetch"):
+        batch_loader.prefetch(symbols + ["SPY"], TimeFrame.Day, start_date, end_date)
+
+    def indicators(symbol, df):
+        with profiling.phase("add_indicators", symbol):
+            return add_indicators(df)
 
     with concurrent.futures.ThreadPoolExecutor() as executor:
         futures = {executor.submit(fetch_data, symbol, start_date, end_date): symbol for symbol in symbols}
-        for future in concurrent.futures.as_completed(futures):
-            symbol = futures[future]
-            try:
-                df = future.result()
-                df = add_indicators(df)
-                market_data[symbol] = df
-            except Exception as e:
-                print(f"Error loading {symbol}: {e}")
+        market_data = batch_loader.collect_in_order(futures, symbols, indicators)
 
     spy_data = fetch_data("SPY", start_date, end_date)
-    spy_data = add_indicators(spy_data)
-
-    initial_capital = [10000]
-    for i in initial_capital:
-        sl_multiple = [0.2, 0.4, 0.5]
-        for s in sl_multiple:
-            tp_multiple = [0.8, 1, 1.2]
-            for t in tp_multiple:
-                risk_perc = [0.005, 1]
-                for r in risk_perc:
-
-                    trades, final_capital, max_dd, signals_total, signals_taken = simulate_market(start_date, end_date, market_data, spy_data, i, s, t, r)
-                    print(f"Test {num_tests}: Final Capital: {final_capital:.2f}, Max Drawdown: {max_dd:.2f}%, Trades: {len(trades)}")
-                    stats = {"Trades":trades, "FinalCapital":final_capital, "Drawdown":max_dd, "SigTotal":signals_total, "SigTaken":signals_taken, "InitialCapital": i, "SLMult":s, "TPMult":t, "Risk":r}
-                    parameter_stats.append(stats)
-                    num_tests += 1
+    with profiling.phase("add_indicators", "SPY"):
+        spy_data = add_indicators(spy_data)
+
+    # python BIBO9.py montecarlo [runs]: distribution of MONTE_CARLO_PARAMS over seeded orderings
+    if len(sys.argv) > 1 and sys.argv[1] == "montecarlo":
+        runs = int(sys.argv[2]) if len(sys.argv) > 2 else MONTE_CARLO_RUNS
+        results = sweep.run_seeds(run_seed, {"market_data": market_data, "spy_data": spy_data}, runs,
+                                  seed=SWEEP_SEED, setup=scan_signals)
+        sweep.print_distribution("Final Capital", sweep.distribution([r[1] for r in results]))
+        sweep.print_distribution("Max Drawdown %", sweep.distribution([r[2] for r in results]))
+        sys.exit(0)
+
+    combinations = sweep.grid(initial_capital=[10000], sl_multiple=[0.2, 0.4, 0.5], tp_multiple=[0.8, 1, 1.2],
+                              risk_perc=[0.005, 1])
+
+    # python BIBO9.py walkforward: best combination of each train fold, run on the fold after it
+    if len(sys.argv) > 1 and sys.argv[1] == "walkforward":
+        fold_list = walk_forward.folds(start_date, end_date, WALK_FORWARD_TRAIN_MONTHS, WALK_FORWARD_TEST_MONTHS)
+        result = walk_forward.run(run_window, combinations, {"market_data": market_data, "spy_data": spy_data},
+                                  fold_list, initial_capital=10000, seed=SWEEP_SEED, setup=scan_signals)
+        walk_forward.print_walk_forward(result, initial_capital=10000)
+        sys.exit(0)
+
+    # python BIBO9.py batched: the grid in one pass with a shared signal ordering (see simulate_grid)
+    if len(sys.argv) > 1 and sys.argv[1] == "batched":
+        results = simulate_grid(start_date, end_date, market_data, spy_data, combinations)
+    else:
+        results = sweep.run_sweep(run_combination, combinations, {"market_data": market_data, "spy_data": spy_data},
+                                  seed=SWEEP_SEED, setup=scan_signals)
 
     spy_performance, spy_drawdown = calculate_spy(start_date, end_date)
-    filename = input("Enter a name for the results file (without extension): ").strip() + ".csv"
-    save_parameter_stats_to_csv(parameter_stats, spy_performance, spy_drawdown, filename)
-    print(f"Saved stats to {filename}")
+    runs = []
+    for num_tests, (params, (trades, final_capital, max_dd, signals_total, signals_taken)) in enumerate(zip(combinations, results)):
+        print(f"Test {num_tests}: Final Capital: {final_capital:.2f}, Max Drawdown: {max_dd:.2f}%, Trades: {len(trades)}")
+        metrics = results_store.summary(trades, params["initial_capital"], final_capital, max_dd, signals_total, signals_taken)
+        metrics.update(spy_pct=spy_performance, spy_drawdown_pct=spy_drawdown, alpha=metrics["pct_change"] - spy_performance)
+        runs.append(({**params, "start": start_date, "end": end_date}, metrics, trades))
+
+    store = results_store.ResultsStore()
+    run_ids = store.add("BIBO9", runs)
+    print(f"Saved {len(run_ids)} runs to {store.path} ({run_ids[0].rsplit('-', 1)[0]})")
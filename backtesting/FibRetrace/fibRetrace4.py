@@ -1,8 +1,9 @@
 from datetime import datetime
-from alpaca.data.requests import StockBarsRequest
 from alpaca.data.timeframe import TimeFrame
-from account.authentication_paper import historicalClient
+from market_data import bar_store
+from simulation import scan
 import algorithm.tradingObjects.candle as candle
+from algorithm.tradingObjects import indicators
 import csv
 import pytz
 import concurrent.futures
@@ -13,16 +14,13 @@ mountain = pytz.timezone("America/Denver")
 # Portfolio value and risk setup
 initial_cash = 100000
 
+# Bars before the current one that define the swing high/low
+SWING_LOOKBACK = 20
+
 
 # Load historical data for a symbol
 def load_historical_data(symbol, start, end, timeframe=TimeFrame.Minute):
-    request = StockBarsRequest(
-        symbol_or_symbols=symbol,
-        timeframe=timeframe,
-        start=start,
-        end=end
-    )
-    return historicalClient.get_stock_bars(request)[symbol]
+    return bar_store.load_bar_rows(symbol, timeframe, start, end)
 
 
 # Calculate Fibonacci retracement levels
@@ -36,22 +34,20 @@ def calculate_fibonacci_levels(swing_high, swing_low):
     }
 
 
-# Identify swing highs and lows
-def find_recent_swing(data, lookback=20):
-    highs = [bar.high for bar in data[-lookback:]]
-    lows = [bar.low for bar in data[-lookback:]]
-    return max(highs), min(lows)
+# Identify swing highs and lows over the lookback bars before index end (data is a CandleSeries)
+def find_recent_swing(data, end, lookback=SWING_LOOKBACK):
+    window = scan.lookback(data, end, lookback)
+    return window.high.max().item(), window.low.min().item()
 
 
 # Simulate entry based on Fib retracement
 
-def simulate_trade_fib(bar, symbol, time, portfolio, portfolio_value, fib_levels, prev_bar, swing_low):
-    price = bar.close
+def simulate_trade_fib(price, open_price, prev_close, symbol, time, portfolio, portfolio_value, fib_levels, swing_low):
     buffer = 0.25  # Loosen condition slightly
 
     if symbol not in portfolio or portfolio[symbol]["status"] != "open":
         in_zone = fib_levels['50.0'] - buffer <= price <= fib_levels['61.8'] + buffer
-        bounce = bar.close > bar.open and bar.close > prev_bar.close
+        bounce = price > open_price and price > prev_close
 
         if in_zone and bounce:
             risk_amount = portfolio_value * 0.01
@@ -70,8 +66,8 @@ def simulate_trade_fib(bar, symbol, time, portfolio, portfolio_value, fib_levels
     return portfolio_value
 
 
-# Check for target and trailing stop loss
-def check_exit(bar, symbol, time, portfolio, trade_log, portfolio_value):
+# Check for target and trailing stop loss against the bar's close
+def check_exit(price, symbol, time, portfolio, trade_log, portfolio_value):
     if symbol in portfolio and portfolio[symbol]["status"] == "open":
         entry = portfolio[symbol]["entry"]
         trail_price = portfolio[symbol]["trail_price"]
@@ -80,13 +76,13 @@ def check_exit(bar, symbol, time, portfolio, trade_log, portfolio_value):
         quantity = portfolio[symbol]["quantity"]
 
         # Trail SL upward
-        if bar.close > trail_price:
-            portfolio[symbol]["trail_price"] = bar.close
-            portfolio[symbol]["sl"] = round(bar.close * 0.99, 2)
+        if price > trail_price:
+            portfolio[symbol]["trail_price"] = price
+            portfolio[symbol]["sl"] = round(price * 0.99, 2)
 
         # Take profit at 0% level (sell full position)
-        if bar.close >= target:
-            exit_price = round(bar.close, 2)
+        if price >= target:
+            exit_price = round(price, 2)
             pnl = round((exit_price - entry) * quantity, 2)
             portfolio_value += pnl
             trade_log.append([
@@ -106,8 +102,8 @@ def check_exit(bar, symbol, time, portfolio, trade_log, portfolio_value):
             return portfolio_value
 
         # Stop out if SL is hit
-        if bar.close <= portfolio[symbol]["sl"]:
-            exit_price = round(bar.close, 2)
+        if price <= portfolio[symbol]["sl"]:
+            exit_price = round(price, 2)
             pnl = round((exit_price - entry) * quantity, 2)
             portfolio_value += pnl
             trade_log.append([
@@ -128,24 +124,28 @@ def check_exit(bar, symbol, time, portfolio, trade_log, portfolio_value):
 
 
 # Signal scan for Fib retracement setup
-def signalScan_fib(data, symbol, timestamps, portfolio, trade_log, portfolio_value):
-    if len(data) < 61:
+# c is the current bar; data and timestamps are the full series and only [0, c] is read.
+# swings is the (swing_high, swing_low) pair from indicators.swing_levels for the whole series;
+# without it the swing is recomputed from the window.
+def signalScan_fib(data, c, symbol, timestamps, portfolio, trade_log, portfolio_value, swings=None):
+    if c < 60:
         return portfolio_value
 
-    c = len(data) - 1
-    bar = data[c]
-    prev_bar = data[c - 1]
+    opens, closes = data.opens, data.closes
     bar_time = timestamps[c].astimezone(mountain)
 
     if not (7 <= bar_time.hour < 14):
         return portfolio_value
 
-    swing_high, swing_low = find_recent_swing(data[:c])
+    if swings is not None:
+        swing_high, swing_low = swings[0].item(c), swings[1].item(c)
+    else:
+        swing_high, swing_low = find_recent_swing(data, c)
     fib_levels = calculate_fibonacci_levels(swing_high, swing_low)
 
-    portfolio_value = simulate_trade_fib(bar, symbol, timestamps[c], portfolio, portfolio_value, fib_levels, prev_bar,
-                                         swing_low)
-    portfolio_value = check_exit(bar, symbol, timestamps[c], portfolio, trade_log, portfolio_value)
+    portfolio_value = simulate_trade_fib(closes[c], opens[c], closes[c - 1], symbol, timestamps[c], portfolio,
+                                         portfolio_value, fib_levels, swing_low)
+    portfolio_value = check_exit(closes[c], symbol, timestamps[c], portfolio, trade_log, portfolio_value)
 
     return portfolio_value
 
@@ -157,15 +157,14 @@ def run_backtest(symbol, start, end):
     trade_log = []
     portfolio_value = initial_cash
 
-    simulated_data = []
-    timestamps = []
-    for bar in data:
-        simulated_data.append(candle.Candle(bar.open, bar.high, bar.low, bar.close, bar.close))
-        timestamps.append(bar.timestamp)
+    simulated_data = candle.CandleSeries.from_bars(data)
+    timestamps = [bar.timestamp for bar in data]
+    swings = indicators.swing_levels(simulated_data.high, simulated_data.low, SWING_LOOKBACK)
+
+    def step(i, value):
+        return signalScan_fib(simulated_data, i, symbol, timestamps, portfolio, trade_log, value, swings)
 
-    for i in range(61, len(simulated_data)):
-        portfolio_value = signalScan_fib(simulated_data[:i + 1], symbol, timestamps[:i + 1], portfolio, trade_log,
-                                         portfolio_value)
+    portfolio_value = scan.scan(step, len(simulated_data), start=61, state=portfolio_value)
 
     return trade_log
 
@@ -281,7 +280,6 @@ def export_results(all_trade_logs, custom_filename=None):
     # Collect daily stats and SPY returns
     from collections import defaultdict
     from alpaca.data.historical import StockHistoricalDataClient
-    from alpaca.data.requests import StockBarsRequest
     from alpaca.data.timeframe import TimeFrame
 
     spy_data = load_historical_data("SPY", start, end, timeframe=TimeFrame.Day)
@@ -3,9 +3,9 @@ import random
 import pandas as pd
 import concurrent.futures
 from datetime import datetime, timedelta
-from alpaca.data.requests import StockBarsRequest
 from alpaca.data.timeframe import TimeFrame
-from account.authentication_paper import historicalClient
+from market_data import bar_store
+from simulation import exits, orb
 import csv
 import pytz
 
@@ -18,8 +18,7 @@ def get_sp500_symbols():
 
 
 def fetch_intraday_data(symbol, start, end):
-    req = StockBarsRequest(symbol_or_symbols=symbol, timeframe=TimeFrame.Minute, start=start, end=end)
-    bars = historicalClient.get_stock_bars(req)[symbol]
+    bars = bar_store.load_bar_rows(symbol, TimeFrame.Minute, start, end)
     data = [{
         "timestamp": pd.to_datetime(bar.timestamp).tz_convert(EST).tz_convert(MST),
         "symbol": symbol,
@@ -33,75 +32,35 @@ def fetch_intraday_data(symbol, start, end):
     return df
 
 
-def find_orb_signal_and_execute(df, current_date, capital):
-
-    day_data = df[df.index.date == current_date.date()]
-    if len(day_data) < 16:
-        return None, capital
-
-    opening_range = day_data.iloc[:15]
-    high = opening_range["high"].max()
-    low = opening_range["low"].min()
-
-    trade_data = day_data.iloc[15:]
-    entry = stop = target = entry_time = range = None
-    for t, row in trade_data.iterrows():
-        if entry is None and row["high"] > high:
-            entry = high
-            range = round(high - low, 2)
-            stop = high - (range / 4)
-            target = high + (range)
-            entry_time = t
-            break
-
-    if entry is None:
+# Size and close one day's breakout (an orb.Setup) against the running capital.
+# A breakout that hits neither stop nor target by the close is not taken.
+def execute_orb_trade(setup, symbol, index, capital):
+    if setup is None or setup.outcome == 0:
         return None, capital
 
+    entry, stop, target = setup.entry, setup.stop, setup.target
     position_size = (0.005 * capital) / (entry - stop) if (entry - stop) > 0 else 0
     qty = math.floor(position_size)
     cost_basis = round(qty * entry, 2)
 
-    for t, row in trade_data[trade_data.index > entry_time].iterrows():
-        if row["low"] <= stop:
-            exit_price = stop
-            pnl = (exit_price - entry) * qty
-            capital += pnl
-            return {
-                "EntryTime": entry_time.strftime("%Y-%m-%d %H:%M"),
-                "Symbol": df["symbol"].iloc[0],
-                "Entry": round(entry, 2),
-                "Stop": round(stop, 2),
-                "Target": round(target, 2),
-                "Qty": qty,
-                "Range": range,
-                "PositionSize": round(position_size, 2),
-                "CostBasis": cost_basis,
-                "Outcome": "Stop",
-                "ExitTime": t.strftime("%Y-%m-%d %H:%M"),
-                "Exit": round(exit_price, 2),
-                "PnL": round(pnl, 2)
-            }, capital
-        elif row["high"] >= target:
-            exit_price = target
-            pnl = (exit_price - entry) * qty
-            capital += pnl
-            return {
-                "EntryTime": entry_time.strftime("%Y-%m-%d %H:%M"),
-                "Symbol": df["symbol"].iloc[0],
-                "Entry": round(entry, 2),
-                "Stop": round(stop, 2),
-                "Target": round(target, 2),
-                "Qty": qty,
-                "Range": range,
-                "PositionSize": round(position_size, 2),
-                "CostBasis": cost_basis,
-                "Outcome": "Target",
-                "ExitTime": t.strftime("%Y-%m-%d %H:%M"),
-                "Exit": round(exit_price, 2),
-                "PnL": round(pnl, 2)
-            }, capital
-
-    return None, capital
+    exit_price = setup.exit_price
+    pnl = (exit_price - entry) * qty
+    capital += pnl
+    return {
+        "EntryTime": index[setup.entry_index].strftime("%Y-%m-%d %H:%M"),
+        "Symbol": symbol,
+        "Entry": round(entry, 2),
+        "Stop": round(stop, 2),
+        "Target": round(target, 2),
+        "Qty": qty,
+        "Range": setup.range,
+        "PositionSize": round(position_size, 2),
+        "CostBasis": cost_basis,
+        "Outcome": "Stop" if setup.outcome == exits.STOPPED else "Target",
+        "ExitTime": index[setup.exit_index].strftime("%Y-%m-%d %H:%M"),
+        "Exit": round(exit_price, 2),
+        "PnL": round(pnl, 2)
+    }, capital
 
 
 def simulate_orb(start, end):
@@ -117,6 +76,9 @@ def simulate_orb(start, end):
             except Exception as e:
                 print(f"Error loading {symbol}: {e}")
 
+    # every symbol's days are resolved up front; the date loop below only threads capital through
+    orb_days = {symbol: orb.OrbDays(df) for symbol, df in market_data.items()}
+
     initial_capital = 10000
     capital = initial_capital
     trade_log = []
@@ -125,8 +87,8 @@ def simulate_orb(start, end):
     all_dates = pd.date_range(start=start, end=end, freq='B', tz=MST)
 
     for current_date in all_dates:
-        for symbol, df in market_data.items():
-            trade, capital = find_orb_signal_and_execute(df, current_date, capital)
+        for symbol, days in orb_days.items():
+            trade, capital = execute_orb_trade(days.setup(current_date.date()), symbol, days.index, capital)
             if trade:
                 trade_log.append(trade)
                 if trade["PnL"] > 0:
@@ -1,8 +1,9 @@
 from datetime import datetime
-from alpaca.data.requests import StockBarsRequest
 from alpaca.data.timeframe import TimeFrame
-from account.authentication_paper import historicalClient
+from market_data import bar_store
+from simulation import scan
 import algorithm.tradingObjects.candle as candle
+import algorithm.tradingObjects.indicators as indicators
 import csv
 import pytz
 import concurrent.futures
@@ -15,32 +16,15 @@ initial_cash = 100000
 
 # Load historical data for a symbol
 def load_historical_data(symbol, start, end, timeframe=TimeFrame.Minute):
-    request = StockBarsRequest(
-        symbol_or_symbols=symbol,
-        timeframe=timeframe,
-        start=start,
-        end=end
-    )
-    return historicalClient.get_stock_bars(request)[symbol]
-
-# Calculate EMA
+    return bar_store.load_bar_rows(symbol, timeframe, start, end)
+
+# Calculate EMA (None until `period` closes are in, then seeded with their SMA)
 def calculate_ema(data, period):
-    ema = []
-    k = 2 / (period + 1)
-    for i in range(len(data)):
-        close = data[i].close
-        if i < period - 1:
-            ema.append(None)
-        elif i == period - 1:
-            sma = sum([data[j].close for j in range(i - period + 1, i + 1)]) / period
-            ema.append(sma)
-        else:
-            ema.append(close * k + ema[-1] * (1 - k))
-    return ema
-
-# Simulate entry logic
-def simulate_trade(bar, symbol, time, portfolio, portfolio_value):
-    price = bar.close
+    ema = indicators.EMA(period)
+    return [ema.update(close) for close in data.closes]
+
+# Simulate entry logic at the bar's close
+def simulate_trade(price, symbol, time, portfolio, portfolio_value):
     if symbol not in portfolio or portfolio[symbol]["status"] != "open":
         risk_amount = portfolio_value * 0.01
         quantity = round(risk_amount / price, 2)
@@ -55,18 +39,18 @@ def simulate_trade(bar, symbol, time, portfolio, portfolio_value):
         }
     return portfolio_value
 
-# Check for trailing stop loss
-def check_exit(bar, symbol, time, portfolio, trade_log, portfolio_value):
+# Check for trailing stop loss against the bar's close
+def check_exit(price, symbol, time, portfolio, trade_log, portfolio_value):
     if symbol in portfolio and portfolio[symbol]["status"] == "open":
         entry = portfolio[symbol]["entry"]
         trail_price = portfolio[symbol]["trail_price"]
         quantity = portfolio[symbol]["quantity"]
 
-        if bar.close > trail_price:
-            portfolio[symbol]["trail_price"] = bar.close
+        if price > trail_price:
+            portfolio[symbol]["trail_price"] = price
 
-        if bar.close <= portfolio[symbol]["trail_price"] * 0.99:
-            exit_price = round(bar.close, 2)
+        if price <= portfolio[symbol]["trail_price"] * 0.99:
+            exit_price = round(price, 2)
             pnl = round((exit_price - entry) * quantity, 2)
             portfolio_value += pnl
             trade_log.append([
@@ -85,12 +69,12 @@ def check_exit(bar, symbol, time, portfolio, trade_log, portfolio_value):
     return portfolio_value
 
 # Signal logic based on 3-bar momentum and positive 9 EMA and above 50 EMA, during market hours
-def signalScan(data, symbol, timestamps, ema_9, ema_50, portfolio, trade_log, portfolio_value):
-    if len(data) < 51:
+# c is the current bar; data (a CandleSeries), timestamps and the EMAs are the full series and only [0, c] is read
+def signalScan(data, c, symbol, timestamps, ema_9, ema_50, portfolio, trade_log, portfolio_value):
+    if c < 50:
         return portfolio_value
 
-    c = len(data) - 1
-    b0, b1, b2 = data[c], data[c-1], data[c-2]
+    opens, closes = data.opens, data.closes
     bar_time = timestamps[c].astimezone(mountain)
 
     if not (bar_time.hour >= 7 and bar_time.hour < 14):
@@ -100,15 +84,15 @@ def signalScan(data, symbol, timestamps, ema_9, ema_50, portfolio, trade_log, po
         ema_9[c] is not None and
         ema_50[c] is not None and
         ema_9[c] > 0 and
-        b0.close > ema_50[c] and
-        b2.close < b1.close < b0.close and
-        b2.close > b2.open and
-        b1.close > b1.open and
-        b0.close > b0.open
+        closes[c] > ema_50[c] and
+        closes[c-2] < closes[c-1] < closes[c] and
+        closes[c-2] > opens[c-2] and
+        closes[c-1] > opens[c-1] and
+        closes[c] > opens[c]
     ):
-        portfolio_value = simulate_trade(b0, symbol, timestamps[c], portfolio, portfolio_value)
+        portfolio_value = simulate_trade(closes[c], symbol, timestamps[c], portfolio, portfolio_value)
 
-    portfolio_value = check_exit(b0, symbol, timestamps[c], portfolio, trade_log, portfolio_value)
+    portfolio_value = check_exit(closes[c], symbol, timestamps[c], portfolio, trade_log, portfolio_value)
 
     return portfolio_value
 
@@ -119,17 +103,16 @@ def run_backtest(symbol, start, end):
     trade_log = []
     portfolio_value = initial_cash
 
-    simulated_data = []
-    timestamps = []
-    for bar in data:
-        simulated_data.append(candle.Candle(bar.open, bar.high, bar.low, bar.close, bar.close))
-        timestamps.append(bar.timestamp)
+    simulated_data = candle.CandleSeries.from_bars(data)
+    timestamps = [bar.timestamp for bar in data]
 
     ema_9 = calculate_ema(simulated_data, 9)
     ema_50 = calculate_ema(simulated_data, 50)
 
-    for i in range(50, len(simulated_data)):
-        portfolio_value = signalScan(simulated_data[:i+1], symbol, timestamps[:i+1], ema_9[:i+1], ema_50[:i+1], portfolio, trade_log, portfolio_value)
+    def step(i, value):
+        return signalScan(simulated_data, i, symbol, timestamps, ema_9, ema_50, portfolio, trade_log, value)
+
+    portfolio_value = scan.scan(step, len(simulated_data), start=50, state=portfolio_value)
 
     return trade_log
 
@@ -6,9 +6,8 @@ from bs4 import BeautifulSoup
 import concurrent.futures
 
 from datetime import datetime, timedelta
-from alpaca.data.requests import StockBarsRequest
 from alpaca.data.timeframe import TimeFrame
-from account.authentication_paper import historicalClient
+from market_data import bar_store
 import algorithm.tradingObjects.candle as candle
 import math
 import csv
@@ -19,8 +18,7 @@ end_date = datetime(2025, 6, 30)
 
 symbol = "SPY"
 
-req = StockBarsRequest(symbol_or_symbols=symbol, timeframe=TimeFrame.Day, start=start_date, end=end_date)
-bars = historicalClient.get_stock_bars(req)[symbol]
+bars = bar_store.load_bar_rows(symbol, TimeFrame.Day, start_date, end_date)
 data = [{
         "timestamp": pd.to_datetime(bar.timestamp).normalize(),
         "symbol": symbol,
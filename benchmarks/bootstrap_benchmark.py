@@ -0,0 +1,61 @@
+# bootstrap_benchmark.py
+#
+# simulation.bootstrap on a synthetic trade log: paths x trades for both methods, against a plain
+# per-path Python loop over the same measures. The loop only runs a sample of paths (it is timed and
+# scaled up to the full count) and must agree with bootstrap.walk on exactly those paths.
+# Run from the repo root:  python -m benchmarks.bootstrap_benchmark [paths] [trades]
+
+import sys
+import time
+
+import numpy as np
+
+from simulation import bootstrap
+
+
+LOOP_PATHS = 200
+
+
+def synthetic_pnls(trades=3000, seed=7):
+    rng = np.random.default_rng(seed)
+    return np.round(rng.normal(4, 60, trades), 2)
+
+
+# Final capital, max drawdown (%) and longest losing streak of one sequence, one trade at a time
+def loop_path(pnls, initial_capital):
+    capital = peak = initial_capital
+    max_drawdown = 0.0
+    run = longest = 0
+    for pnl in pnls:
+        capital += pnl
+        peak = max(peak, capital)
+        max_drawdown = max(max_drawdown, (peak - capital) / peak)
+        run = run + 1 if pnl < 0 else 0
+        longest = max(longest, run)
+    return capital, max_drawdown * 100, longest
+
+
+if __name__ == "__main__":
+    paths = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000
+    trades = int(sys.argv[2]) if len(sys.argv) > 2 else 3000
+    initial_capital = 10000.0
+    pnls = synthetic_pnls(trades)
+    print(f"{paths} paths x {trades} trades")
+
+    sample = pnls[np.random.default_rng(1).integers(0, trades, size=(LOOP_PATHS, trades))]
+    t0 = time.perf_counter()
+    expected = np.array([loop_path(row.tolist(), initial_capital) for row in sample])
+    loop_time = (time.perf_counter() - t0) * paths / LOOP_PATHS
+
+    final_capital, max_drawdown, losing_streak = bootstrap.walk(sample.T, LOOP_PATHS, initial_capital)
+    assert np.allclose(final_capital, expected[:, 0]), "final capital differs"
+    assert np.allclose(max_drawdown, expected[:, 1], atol=1e-9), "max drawdown differs"
+    assert (losing_streak == expected[:, 2]).all(), "losing streak differs"
+    print(f"loop     {loop_time:.2f}s (scaled from {LOOP_PATHS} paths)")
+
+    for method in bootstrap.METHODS:
+        t0 = time.perf_counter()
+        results = bootstrap.bootstrap(pnls, initial_capital, paths=paths, method=method)
+        elapsed = time.perf_counter() - t0
+        print(f"{method:<8} {elapsed:.2f}s  speedup {loop_time / elapsed:.0f}x  "
+              f"median max drawdown {np.median(results['max_drawdown_pct']):.2f}%")
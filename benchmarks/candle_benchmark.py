@@ -0,0 +1,74 @@
+# candle_benchmark.py
+#
+# List of Candle objects vs CandleSeries: construction time and peak traced memory for the same
+# bar rows, then one pass over every bar's close three ways: Candle attributes, CandleView
+# attributes, and the series' memoryview columns the scans read.
+# Run from the repo root:  python -m benchmarks.candle_benchmark [bars]
+
+import sys
+import time
+import tracemalloc
+from collections import namedtuple
+
+import numpy as np
+
+import algorithm.tradingObjects.candle as candle
+
+Bar = namedtuple("Bar", ["open", "high", "low", "close"])
+
+
+def bar_rows(n, seed=11):
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.001, n)))
+    open_ = np.concatenate([[close[0]], close[:-1]])
+    high = np.maximum(open_, close) * 1.0005
+    low = np.minimum(open_, close) * 0.9995
+    # plain Python floats, like the rows bar_store.load_bar_rows hands out
+    return [Bar(*row) for row in zip(open_.tolist(), high.tolist(), low.tolist(), close.tolist())]
+
+
+def build_list(rows):
+    return [candle.Candle(bar.open, bar.high, bar.low, bar.close, bar.close) for bar in rows]
+
+
+def build_series(rows):
+    return candle.CandleSeries.from_bars(rows)
+
+
+# (seconds, peak bytes allocated while building, the result)
+def measure(build, rows):
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = build(rows)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak, result
+
+
+def main(n=500_000):
+    rows = bar_rows(n)
+    print(f"{n:,} bars")
+
+    list_time, list_peak, candles = measure(build_list, rows)
+    series_time, series_peak, series = measure(build_series, rows)
+    print(f"  list of Candle : {list_time:7.3f}s  peak {list_peak / 2**20:8.1f} MiB")
+    print(f"  CandleSeries   : {series_time:7.3f}s  peak {series_peak / 2**20:8.1f} MiB  "
+          f"(arrays {series.nbytes / 2**20:.1f} MiB)")
+    print(f"  memory {list_peak / series_peak:.1f}x smaller, construction {list_time / series_time:.1f}x faster")
+
+    # per-bar reads: the scans index series.closes/opens; a CandleView per bar is the slow path
+    candles = build_list(rows)
+    reads = [("Candle.close", lambda: [bar.close for bar in candles]),
+             ("CandleView.close", lambda: [bar.close for bar in series]),
+             ("series.closes[i]", lambda: [series.closes[i] for i in range(len(series))])]
+    results = []
+    for name, read in reads:
+        start = time.perf_counter()
+        results.append(read())
+        print(f"  {name:17s}: {(time.perf_counter() - start) / n * 1e9:6.0f} ns per bar")
+    assert results[0] == results[1] == results[2], "per-bar reads differ"
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 500_000)
@@ -0,0 +1,81 @@
+# grid_benchmark.py
+#
+# BIBO9's SL/TP/risk grid on synthetic daily bars: one simulate_market per combination (what each
+# sweep task runs) vs simulate_grid (exits for every SL/TP pair resolved in one batch, then a
+# sizing replay per combination). Both use the same seeded signal ordering, one scan of the
+# signals, and must return identical results. Timings are single-process.
+#
+# simulate_grid also orders each day's signals once for the whole grid (ordering.memoized), where
+# simulate_market orders them again per combination; with the random ordering that shuffle is most
+# of a run. So the batched exits are timed like for like too: one engine.simulate per combination
+# with ExitSchedule exits and the grid's memoized ordering, against simulate_grid.
+# Run from the repo root:  python -m benchmarks.grid_benchmark [symbols] [signal_order]
+
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+import backtesting.BIBO.BIBO9 as bibo9
+from simulation import engine, exits, ordering, sweep
+
+
+def synthetic_daily(symbols=300, seed=3):
+    dates = pd.bdate_range("2020-06-01", "2025-06-30", tz="UTC").rename("timestamp")
+    rng = np.random.default_rng(seed)
+
+    def frame(symbol):
+        close = 100 * np.exp(rng.normal(0.0007, 0.02, len(dates)).cumsum())
+        open_ = close * (1 + rng.normal(0, 0.01, len(close)))
+        high = np.maximum(open_, close) * 1.01
+        low = np.minimum(open_, close) * 0.99
+        df = pd.DataFrame({"symbol": symbol, "open": open_, "high": high, "low": low, "close": close,
+                           "volume": 1e6 * (1 + rng.random(len(close)))}, index=dates)
+        return bibo9.add_indicators(df)
+
+    market_data = {f"SYN{k}": frame(f"SYN{k}") for k in range(symbols)}
+    return market_data, frame("SPY")
+
+
+if __name__ == "__main__":
+    symbols = int(sys.argv[1]) if len(sys.argv) > 1 else 300
+    signal_order = sys.argv[2] if len(sys.argv) > 2 else "calendar"
+    market_data, spy_data = synthetic_daily(symbols)
+    combinations = sweep.grid(initial_capital=[10000], sl_multiple=[0.2, 0.3, 0.4, 0.5, 0.6],
+                              tp_multiple=[0.8, 1, 1.2, 1.5, 2], risk_perc=[0.005, 0.01, 0.02])
+    shared = bibo9.scan_signals({"market_data": market_data, "spy_data": spy_data})
+    signals = sum(len(day) for day in shared["signal_calendar"].values())
+    print(f"{symbols} symbols, {signals} signals, {len(combinations)} combinations, {signal_order} ordering")
+
+    t0 = time.perf_counter()
+    single = [bibo9.simulate_market(bibo9.SWEEP_START, bibo9.SWEEP_END, market_data, spy_data, params["initial_capital"],
+                                    params["sl_multiple"], params["tp_multiple"], params["risk_perc"],
+                                    shared["signal_calendar"], None, shared["trading_days"], signal_order)
+              for params in combinations]
+    single_time = time.perf_counter() - t0
+
+    # per combination, with the grid's shared ordering: only the exits differ from simulate_grid
+    t0 = time.perf_counter()
+    all_dates = list(shared["trading_days"].between(bibo9.SWEEP_START, bibo9.SWEEP_END))
+    order = ordering.memoized(ordering.make(signal_order, market_data, shared["trading_days"], seed=bibo9.ORDER_SEED))
+    like_for_like = []
+    for params in combinations:
+        result = engine.simulate(shared["signal_calendar"], all_dates,
+                                 engine.atr_bracket(params["sl_multiple"], params["tp_multiple"], params["risk_perc"]),
+                                 exits.ExitSchedule(market_data, shared["trading_days"]).resolve,
+                                 initial_capital=params["initial_capital"], order=order)
+        like_for_like.append((result.trade_log, result.capital, result.max_drawdown_pct, result.signals_total,
+                              result.signals_taken))
+    shared_order_time = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    batched = bibo9.simulate_grid(bibo9.SWEEP_START, bibo9.SWEEP_END, market_data, spy_data, combinations,
+                                  shared["signal_calendar"], shared["trading_days"], signal_order)
+    batched_time = time.perf_counter() - t0
+
+    assert single == batched == like_for_like, "results differ"
+    print(f"per combination {single_time:.2f}s  batched {batched_time:.2f}s  speedup {single_time / batched_time:.1f}x  "
+          f"trades {sum(len(result[0]) for result in batched)}")
+    print(f"batched exits alone (same memoized ordering on both sides): {shared_order_time:.2f}s -> "
+          f"{batched_time:.2f}s  speedup {shared_order_time / batched_time:.1f}x")
@@ -0,0 +1,52 @@
+# loader_benchmark.py
+#
+# Bar loading against market_data.fake_client instead of the live API: a fixed latency per HTTP
+# call and seeded synthetic bars, so the numbers repeat on a disconnected box. Times one
+# bar_store.load_bars per symbol, batch_loader.load_bars_many into an empty store, and the same
+# call again once the store is warm, and checks all three hand back the same bars.
+# Run from the repo root:  python -m benchmarks.loader_benchmark [symbols] [latency_seconds]
+
+import sys
+import tempfile
+import time
+
+import pandas as pd
+from alpaca.data.timeframe import TimeFrame
+
+from market_data import bar_store, batch_loader, fake_client
+
+
+START = pd.Timestamp("2021-01-01", tz="UTC")
+END = pd.Timestamp("2024-12-31", tz="UTC")
+
+
+def timed(client, fn):
+    before = client.stats()["requests"]
+    t0 = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - t0, client.stats()["requests"] - before
+
+
+if __name__ == "__main__":
+    symbols = [f"SYN{k}" for k in range(int(sys.argv[1]) if len(sys.argv) > 1 else 200)]
+    latency = float(sys.argv[2]) if len(sys.argv) > 2 else 0.05
+    client = fake_client.FakeDataClient(fake_client.SyntheticSource(), latency=latency)
+    # the fake client has no rate limit here, so don't let alpaca's 200/min pacing dominate the timings
+    rate_limiter = batch_loader.AdaptiveRateLimiter(rate=1000, max_rate=1000)
+    print(f"{len(symbols)} symbols, daily bars {START.date()} - {END.date()}, {latency * 1000:.0f}ms per call")
+
+    bar_store.STORE_DIR = tempfile.mkdtemp()
+    single, single_time, single_calls = timed(client, lambda: {
+        symbol: bar_store.load_bars(symbol, TimeFrame.Day, START, END, client=client) for symbol in symbols})
+
+    bar_store.STORE_DIR = tempfile.mkdtemp()
+    many, many_time, many_calls = timed(client, lambda: batch_loader.load_bars_many(
+        symbols, TimeFrame.Day, START, END, client=client, rate_limiter=rate_limiter))
+    warm, warm_time, warm_calls = timed(client, lambda: batch_loader.load_bars_many(
+        symbols, TimeFrame.Day, START, END, client=client, rate_limiter=rate_limiter))
+
+    for symbol in symbols:
+        assert single[symbol].equals(many[symbol]) and many[symbol].equals(warm[symbol]), f"{symbol} differs"
+    print(f"per symbol     {single_time:6.2f}s  {single_calls} calls")
+    print(f"batched, cold  {many_time:6.2f}s  {many_calls} calls")
+    print(f"batched, warm  {warm_time:6.2f}s  {warm_calls} calls  bars {sum(len(df) for df in warm.values())}")
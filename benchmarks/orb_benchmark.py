@@ -0,0 +1,132 @@
+# orb_benchmark.py
+#
+# ORB1's old per-day loop (full-frame date filter + iterrows for every symbol and business day)
+# vs the day-segmented orb.OrbDays engine on synthetic minute bars for several symbols.
+# Both drivers thread capital the same way and must return identical trade logs.
+# Run from the repo root:  python -m benchmarks.orb_benchmark [months] [symbols]
+
+import math
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+import backtesting.ORB.ORB1 as orb1
+
+
+# Minute frames shaped like ORB1.fetch_intraday_data: MST index 07:30-13:59, symbol column
+def synthetic_orb_frames(months=3, symbols=10, seed=3):
+    days = pd.bdate_range("2025-01-01", periods=21 * months)
+    session = pd.timedelta_range("07:30:00", periods=390, freq="min")
+    index = pd.DatetimeIndex((days.values[:, None] + session.values[None, :]).ravel()).tz_localize(orb1.MST)
+
+    rng = np.random.default_rng(seed)
+    frames = {}
+    for k in range(symbols):
+        symbol = f"SYN{k}"
+        close = 50 * (k + 1) * np.exp(np.cumsum(rng.normal(0, 0.0012, len(index))))
+        open_ = np.concatenate([[close[0]], close[:-1]])
+        high = np.maximum(open_, close) * (1 + np.abs(rng.normal(0, 0.0006, len(index))))
+        low = np.minimum(open_, close) * (1 - np.abs(rng.normal(0, 0.0006, len(index))))
+        frames[symbol] = pd.DataFrame({"symbol": symbol, "open": open_, "high": high, "low": low, "close": close},
+                                      index=index.rename("timestamp"))
+    return frames, days[0].tz_localize(orb1.MST), days[-1].tz_localize(orb1.MST)
+
+
+# The pre-engine ORB1.find_orb_signal_and_execute (its two exit branches folded into one) as the baseline
+def legacy_find_orb_signal_and_execute(df, current_date, capital):
+
+    day_data = df[df.index.date == current_date.date()]
+    if len(day_data) < 16:
+        return None, capital
+
+    opening_range = day_data.iloc[:15]
+    high = opening_range["high"].max()
+    low = opening_range["low"].min()
+
+    trade_data = day_data.iloc[15:]
+    entry = stop = target = entry_time = range = None
+    for t, row in trade_data.iterrows():
+        if entry is None and row["high"] > high:
+            entry = high
+            range = round(high - low, 2)
+            stop = high - (range / 4)
+            target = high + (range)
+            entry_time = t
+            break
+
+    if entry is None:
+        return None, capital
+
+    position_size = (0.005 * capital) / (entry - stop) if (entry - stop) > 0 else 0
+    qty = math.floor(position_size)
+    cost_basis = round(qty * entry, 2)
+
+    for t, row in trade_data[trade_data.index > entry_time].iterrows():
+        if row["low"] <= stop:
+            outcome, exit_price = "Stop", stop
+        elif row["high"] >= target:
+            outcome, exit_price = "Target", target
+        else:
+            continue
+        pnl = (exit_price - entry) * qty
+        capital += pnl
+        return {
+            "EntryTime": entry_time.strftime("%Y-%m-%d %H:%M"),
+            "Symbol": df["symbol"].iloc[0],
+            "Entry": round(entry, 2),
+            "Stop": round(stop, 2),
+            "Target": round(target, 2),
+            "Qty": qty,
+            "Range": range,
+            "PositionSize": round(position_size, 2),
+            "CostBasis": cost_basis,
+            "Outcome": outcome,
+            "ExitTime": t.strftime("%Y-%m-%d %H:%M"),
+            "Exit": round(exit_price, 2),
+            "PnL": round(pnl, 2)
+        }, capital
+
+    return None, capital
+
+
+def legacy_run(market_data, start, end):
+    capital, trade_log = 10000, []
+    for current_date in pd.date_range(start=start, end=end, freq='B', tz=orb1.MST):
+        for symbol, df in market_data.items():
+            trade, capital = legacy_find_orb_signal_and_execute(df, current_date, capital)
+            if trade:
+                trade_log.append(trade)
+    return trade_log, capital
+
+
+# simulate_orb's loop after the market data is loaded
+def engine_run(market_data, start, end):
+    orb_days = {symbol: orb1.orb.OrbDays(df) for symbol, df in market_data.items()}
+    capital, trade_log = 10000, []
+    for current_date in pd.date_range(start=start, end=end, freq='B', tz=orb1.MST):
+        for symbol, days in orb_days.items():
+            trade, capital = orb1.execute_orb_trade(days.setup(current_date.date()), symbol, days.index, capital)
+            if trade:
+                trade_log.append(trade)
+    return trade_log, capital
+
+
+if __name__ == "__main__":
+    months = int(sys.argv[1]) if len(sys.argv) > 1 else 3
+    symbols = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+    market_data, start, end = synthetic_orb_frames(months, symbols)
+    print(f"{symbols} symbols x {months} months of minute bars ({sum(len(df) for df in market_data.values())} bars)")
+
+    timings = {}
+    results = {}
+    for name, run in (("legacy", legacy_run), ("engine", engine_run)):
+        t0 = time.perf_counter()
+        results[name] = run(market_data, start, end)
+        timings[name] = time.perf_counter() - t0
+
+    assert results["legacy"] == results["engine"], "trade logs differ"
+    trades, capital = results["engine"]
+    print(f"legacy {timings['legacy']:.2f}s  engine {timings['engine']:.2f}s  "
+          f"speedup {timings['legacy'] / timings['engine']:.1f}x  trades {len(trades)}  final capital {capital:.2f}")
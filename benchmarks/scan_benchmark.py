@@ -0,0 +1,168 @@
+# scan_benchmark.py
+#
+# The pre-change prefix-copying driver vs the cursor scan on ~5 months of synthetic minute bars, for
+# backtesting.run_backtest and fibRetrace5.run_backtest, plus the per-bar window swing in fibRetrace5
+# vs indicators.swing_levels. The old drivers are kept here as they were: a list of Candle objects,
+# every series copied up to the current bar (a data[:i+1] list copy) on each minute, and the scan
+# reading the last bars of those copies. Only the entry/exit helpers are shared with today's code
+# (they now take a price instead of a Candle; same logic).
+# Run from the repo root:  python -m benchmarks.scan_benchmark [months]
+
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+import algorithm.tradingObjects.candle as candle
+from algorithm.tradingObjects import indicators
+import backtesting.backtesting as momentum
+import backtesting.FibRetrace.fibRetrace5 as fib
+from simulation import scan
+
+
+# Regular-session minute bars (13:30-20:00 UTC) for every weekday in the range
+def synthetic_minutes(months=5, seed=7):
+    days = pd.bdate_range("2025-01-01", periods=21 * months, tz="UTC")
+    session = pd.timedelta_range("13:30:00", periods=390, freq="min")
+    index = (days.values[:, None] + session.values[None, :]).ravel()
+    timestamps = [ts.to_pydatetime() for ts in pd.DatetimeIndex(index, tz="UTC")]
+
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.001, len(timestamps))))
+    open_ = np.concatenate([[close[0]], close[:-1]]) * (1 + rng.normal(0, 0.0003, len(close)))
+    high = np.maximum(open_, close) * (1 + np.abs(rng.normal(0, 0.0005, len(close))))
+    low = np.minimum(open_, close) * (1 - np.abs(rng.normal(0, 0.0005, len(close))))
+
+    data = candle.CandleSeries(open_, high, low, close)
+    return data, timestamps
+
+
+def candle_list(data):
+    return [candle.Candle(o, h, l, c, c) for o, h, l, c in zip(data.open.tolist(), data.high.tolist(),
+                                                               data.low.tolist(), data.close.tolist())]
+
+
+# backtesting.signalScan before the cursor scan: data is the prefix copy, the current bar its last
+def legacy_signal_scan(data, symbol, timestamps, ema_9, ema_50, portfolio, trade_log, portfolio_value):
+    if len(data) < 51:
+        return portfolio_value
+
+    c = len(data) - 1
+    b0, b1, b2 = data[c], data[c-1], data[c-2]
+    bar_time = timestamps[c].astimezone(momentum.mountain)
+
+    if not (bar_time.hour >= 7 and bar_time.hour < 14):
+        return portfolio_value
+
+    if (
+        ema_9[c] is not None and
+        ema_50[c] is not None and
+        ema_9[c] > 0 and
+        b0.close > ema_50[c] and
+        b2.close < b1.close < b0.close and
+        b2.close > b2.open and
+        b1.close > b1.open and
+        b0.close > b0.open
+    ):
+        portfolio_value = momentum.simulate_trade(b0.close, symbol, timestamps[c], portfolio, portfolio_value)
+
+    return momentum.check_exit(b0.close, symbol, timestamps[c], portfolio, trade_log, portfolio_value)
+
+
+def momentum_sliced(candles, timestamps, ema_9, ema_50):
+    portfolio, trade_log, value = {}, [], momentum.initial_cash
+    for i in range(50, len(candles)):
+        value = legacy_signal_scan(candles[:i+1], "SYN", timestamps[:i+1], ema_9[:i+1], ema_50[:i+1], portfolio,
+                                   trade_log, value)
+    return trade_log
+
+
+def momentum_cursor(data, timestamps, ema_9, ema_50):
+    portfolio, trade_log = {}, []
+
+    def step(i, value):
+        return momentum.signalScan(data, i, "SYN", timestamps, ema_9, ema_50, portfolio, trade_log, value)
+
+    scan.scan(step, len(data), start=50, state=momentum.initial_cash)
+    return trade_log
+
+
+# fibRetrace5.signalScan_fib before the cursor scan; the swing came from yet another prefix copy
+def legacy_signal_scan_fib(data, symbol, timestamps, portfolio, trade_log, portfolio_value):
+    if len(data) < 61:
+        return portfolio_value
+
+    c = len(data) - 1
+    bar = data[c]
+    prev_bar = data[c - 1]
+    bar_time = timestamps[c].astimezone(fib.mountain)
+
+    if not bar_time.hour > 8 or bar_time.hour >= 14:
+        return portfolio_value
+
+    window = data[:c][-fib.SWING_LOOKBACK:]
+    swing_high, swing_low = max(b.high for b in window), min(b.low for b in window)
+    fib_levels = fib.calculate_fibonacci_levels(swing_high, swing_low)
+
+    portfolio_value = fib.simulate_trade_fib(bar.close, bar.open, prev_bar.close, symbol, timestamps[c], portfolio,
+                                             portfolio_value, fib_levels, swing_low)
+    return fib.check_exit(bar.close, symbol, timestamps[c], portfolio, trade_log, portfolio_value)
+
+
+def fib_sliced(candles, timestamps):
+    portfolio, trade_log, value = {}, [], fib.initial_cash
+    for i in range(61, len(candles)):
+        value = legacy_signal_scan_fib(candles[:i + 1], "SYN", timestamps[:i + 1], portfolio, trade_log, value)
+    return trade_log
+
+
+def fib_cursor(data, timestamps):
+    portfolio, trade_log = {}, []
+
+    def step(i, value):
+        return fib.signalScan_fib(data, i, "SYN", timestamps, portfolio, trade_log, value)
+
+    scan.scan(step, len(data), start=61, state=fib.initial_cash)
+    return trade_log
+
+
+# run_backtest's driver: swing high/low for every bar from indicators.swing_levels up front
+def fib_swings(data, timestamps):
+    portfolio, trade_log = {}, []
+    swings = indicators.swing_levels(data.high, data.low, fib.SWING_LOOKBACK)
+
+    def step(i, value):
+        return fib.signalScan_fib(data, i, "SYN", timestamps, portfolio, trade_log, value, swings)
+
+    scan.scan(step, len(data), start=61, state=fib.initial_cash)
+    return trade_log
+
+
+def timed(fn, *args):
+    t0 = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - t0
+
+
+if __name__ == "__main__":
+    months = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    data, timestamps = synthetic_minutes(months)
+    ema_9 = momentum.calculate_ema(data, 9)
+    ema_50 = momentum.calculate_ema(data, 50)
+    print(f"{len(data)} minute bars ({months} months)")
+
+    candles = candle_list(data)
+
+    cases = [
+        ("backtesting.signalScan", (momentum_sliced, momentum_cursor),
+         (candles, timestamps, ema_9, ema_50), (data, timestamps, ema_9, ema_50)),
+        ("fibRetrace5.signalScan_fib", (fib_sliced, fib_cursor), (candles, timestamps), (data, timestamps)),
+        ("fibRetrace5 window vs swings", (fib_cursor, fib_swings), (data, timestamps), (data, timestamps)),
+    ]
+    for name, (old, new), old_args, new_args in cases:
+        old_log, old_time = timed(old, *old_args)
+        new_log, new_time = timed(new, *new_args)
+        assert old_log == new_log, f"{name}: trade logs differ"
+        print(f"{name:28s} {old.__name__:15s} {old_time:7.2f}s  {new.__name__:15s} {new_time:6.2f}s  "
+              f"speedup {old_time / new_time:5.1f}x  trades {len(new_log)}")
@@ -0,0 +1,487 @@
+# suite.py
+#
+# The performance baseline: every backtest engine and the live scan path, timed offline and recorded
+# as JSON so two commits can be compared.
+#
+#   python -m benchmarks.suite run [case ...] [--repeat N] [--store DIR] [--out FILE]
+#   python -m benchmarks.suite compare OLD [NEW] [--threshold 0.15]
+#   python -m benchmarks.suite list
+#
+# Backtests read a fixed bar store (BAR_STORE_OFFLINE=1): by default benchmarks/data, filled once with
+# market_data.synthetic bars for the engines' own symbol lists; --store points at a recorded copy of
+# market_data/bars instead. The live cases run against fake_client (synthetic bars, --latency seconds
+# per call) and a stand-in broker, with notifications and position files switched off, as of the
+# fixed moment LIVE_NOW rather than the wall clock.
+#
+# Each case runs in a fresh process, so caches don't leak between cases and the process's peak RSS is
+# the case's memory. A case records every repeat's wall time, its peak RSS and the RSS after setup,
+# plus a small summary of its output (trade counts etc.) so a comparison also shows changed results.
+# A store with no bars stops the suite, and a case that trades nothing on it counts as an error (run
+# then exits with 1): timings of empty data are not a baseline.
+#
+# compare takes results files or commits. A commit's results are read from benchmarks/results/<sha>.json
+# when that exists; otherwise the commit's own copy of this suite runs in a temporary git worktree, on
+# the same bar store, so each side times its own cases. NEW defaults to the working tree. A case is
+# flagged when its best time (or peak memory) grows by more than the threshold, or when it errors on
+# either side; compare exits with 1 if anything is flagged. Comparisons start at the commit that added
+# this file: an older commit has no suite to run, and compare stops with an error.
+
+import argparse
+import json
+import os
+import platform
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import traceback
+import types
+from datetime import datetime
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SUITE_FILE = os.path.abspath(__file__)
+RESULTS_DIR = os.path.join(ROOT, "benchmarks", "results")
+DATA_DIR = os.path.join(ROOT, "benchmarks", "data")
+
+# the fixture store: bump FIXTURE when what it holds changes, so old stores are rebuilt
+FIXTURE = 1
+FIXTURE_SEED = 0
+DAILY_RANGE = ("2018-01-01", "2025-06-30")
+MINUTE_RANGE = ("2025-01-01", "2025-03-31")
+FIB_SYMBOLS = ["AMD", "JNJ", "KO", "XOM", "WMT", "TSLA", "JPM", "MCD", "BA", "CVX"]
+
+BIBO_START = datetime(2021, 1, 1)
+BIBO_END = datetime(2024, 12, 31)
+INTRADAY_START = datetime(2025, 1, 6)
+INTRADAY_END = datetime(2025, 3, 28)
+BIBO9_PARAMS = {"initial_capital": 10000, "sl_multiple": 0.4, "tp_multiple": 1.2, "risk_perc": 0.01}
+# the live cases run as of this moment (the pre-close scan, 13:50 MT) instead of the wall clock
+LIVE_NOW = "2025-07-25 19:50"
+
+REPEAT = 3
+THRESHOLD = 0.15       # best-of-REPEAT times still move ~10% run to run on a busy box
+MIN_DELTA = 0.005       # seconds; smaller differences are noise whatever the ratio
+ACTIVITY = ("trades", "orders")     # summary counts that must not be 0 on the fixture
+
+
+CASES = {}
+
+
+# Register setup(args) -> body; body() runs the timed work and returns a summary dict
+def case(name):
+    def register(setup):
+        CASES[name] = setup
+        return setup
+    return register
+
+
+def _daily_frames():
+    import backtesting.BIBO.BIBO9 as bibo9
+    market_data = {symbol: bibo9.fetch_data(symbol, BIBO_START, BIBO_END) for symbol in bibo9.get_sp500_symbols()}
+    return {symbol: df for symbol, df in market_data.items() if len(df)}, bibo9.fetch_data("SPY", BIBO_START, BIBO_END)
+
+
+@case("bibo9.fetch_data")
+def fetch_data_case(args):
+    import backtesting.BIBO.BIBO9 as bibo9
+    symbols = bibo9.get_sp500_symbols() + ["SPY"]
+
+    def body():
+        frames = [bibo9.fetch_data(symbol, BIBO_START, BIBO_END) for symbol in symbols]
+        return {"symbols": len(frames), "bars": sum(len(df) for df in frames)}
+    return body
+
+
+@case("bibo9.add_indicators")
+def add_indicators_case(args):
+    import backtesting.BIBO.BIBO9 as bibo9
+    market_data, spy_data = _daily_frames()
+    frames = list(market_data.values()) + [spy_data]
+
+    def body():
+        for df in frames:
+            bibo9.add_indicators(df)
+        return {"frames": len(frames)}
+    return body
+
+
+# The per-day find_signal_today loop lives on as panel.bibo_signal_calendar
+@case("bibo9.signal_calendar")
+def signal_calendar_case(args):
+    import backtesting.BIBO.BIBO9 as bibo9
+    market_data, spy_data = _daily_frames()
+    data = {"market_data": {s: bibo9.add_indicators(df) for s, df in market_data.items()},
+            "spy_data": bibo9.add_indicators(spy_data)}
+
+    def body():
+        signal_calendar = bibo9.scan_signals(data)["signal_calendar"]
+        return {"days": len(signal_calendar), "signals": sum(len(day) for day in signal_calendar.values())}
+    return body
+
+
+@case("bibo9.simulate_market")
+def bibo9_case(args):
+    import backtesting.BIBO.BIBO9 as bibo9
+    market_data, spy_data = _daily_frames()
+    market_data = {s: bibo9.add_indicators(df) for s, df in market_data.items()}
+    spy_data = bibo9.add_indicators(spy_data)
+    shared = bibo9.scan_signals({"market_data": market_data, "spy_data": spy_data})
+
+    def body():
+        trades, final_capital, max_dd, _, signals_taken = bibo9.simulate_market(
+            BIBO_START, BIBO_END, market_data, spy_data, **BIBO9_PARAMS, signal_calendar=shared["signal_calendar"],
+            trading_days=shared["trading_days"])
+        return {"trades": len(trades), "final_capital": round(final_capital, 2)}
+    return body
+
+
+def _simulate_market_case(module):
+    def setup(args):
+        import importlib
+        engine = importlib.import_module(module)
+
+        def body():
+            trades, _, final_capital, _, _, _ = engine.simulate_market(BIBO_START, BIBO_END)
+            return {"trades": len(trades), "final_capital": round(final_capital, 2)}
+        return body
+    return setup
+
+
+case("bibo10.simulate_market")(_simulate_market_case("backtesting.BIBO.BIBO10"))
+case("bibo11.simulate_market")(_simulate_market_case("backtesting.BIBO.BIBO11"))
+
+
+@case("orb1.simulate_orb")
+def orb_case(args):
+    import backtesting.ORB.ORB1 as orb1
+    start, end = orb1.MST.localize(INTRADAY_START), orb1.MST.localize(INTRADAY_END)
+
+    def body():
+        trades, final_capital, _, _ = orb1.simulate_orb(start, end)
+        return {"trades": len(trades), "final_capital": round(final_capital, 2)}
+    return body
+
+
+@case("fib5.run_backtest")
+def fib_case(args):
+    import backtesting.FibRetrace.fibRetrace5 as fib
+
+    def body():
+        logs = [fib.run_backtest(symbol, INTRADAY_START, INTRADAY_END) for symbol in FIB_SYMBOLS]
+        return {"trades": sum(len(log) for log in logs)}
+    return body
+
+
+# Stand-in for the paper TradingClient: an empty account that accepts every order
+class FakeBroker:
+
+    def __init__(self, cash=100000.0):
+        self.cash = cash
+        self.orders = []
+
+    def get_account(self):
+        return types.SimpleNamespace(cash=str(self.cash), portfolio_value=str(self.cash))
+
+    def get_all_positions(self):
+        return []
+
+    def get_orders(self, request=None):
+        return []
+
+    def cancel_order_by_id(self, order_id):
+        pass
+
+    def submit_order(self, request):
+        self.orders.append(request)
+        return request
+
+
+# The live runner's modules wired to fakes: synthetic bars with args.latency per call, the fake broker,
+# no Discord, no position CSV, no log file, and no pacing for alpaca's rate limit
+def _live(args):
+    sys.path.insert(0, os.path.join(args.root, "algorithm", "BIBO"))
+    for name in ("EMAIL", "PASSWORD", "PAPERACC", "LIVEACC", "PAPERACCUUID", "ACCUUID", "API_KEY", "SECRET_KEY",
+                 "DISCORD_WEBHOOK"):
+        os.environ.setdefault(name, "benchmark")
+
+    import pandas as pd
+    from account import clients
+    from market_data import batch_loader, fake_client
+    broker = FakeBroker()
+    clients.install("trading", broker)
+    now = pd.Timestamp(LIVE_NOW, tz="UTC")
+    clients.install("historical", fake_client.FakeDataClient(fake_client.SyntheticSource(), latency=args.latency,
+                                                             now=now))
+    batch_loader.limiter = batch_loader.AdaptiveRateLimiter(rate=1000, max_rate=1000)
+
+    import config
+    import logger
+    import strategy
+    import trading
+    import warmup
+    logger.logger.disabled = True
+    silent = lambda *a, **k: None
+    strategy.send_discord_alert = trading.send_discord_alert = silent
+    trading.save_position = silent
+    strategy.time_check = lambda: True
+    warmup.save_warmup = silent
+    warmup.universe = lambda: list(config.SPY_VOL_HARD)
+    warmup.history_window = lambda: (now - pd.Timedelta(days=config.HISTORY_DAYS + 1), now - pd.Timedelta(days=1))
+    # the synthetic SPY may sit below its 150SMA on any given day; scan regardless
+    spy_data = strategy.spy_data
+    strategy.spy_data = lambda warm, snapshots: (True, spy_data(warm, snapshots)[1] or 0.0)
+    return broker, strategy, warmup
+
+
+@case("live.warmup")
+def warmup_case(args):
+    _, _, warmup = _live(args)
+
+    def body():
+        warm = warmup.run_warmup()
+        return {"ranked": len(warm["rank"])}
+    return body
+
+
+@case("live.run_strategy")
+def run_strategy_case(args):
+    broker, strategy, warmup = _live(args)
+    warm = warmup.run_warmup()
+    strategy.load_warmup = lambda: warm
+
+    def body():
+        broker.orders.clear()
+        strategy.run_strategy()
+        return {"orders": len(broker.orders)}
+    return body
+
+
+def _rss_mb():
+    # ru_maxrss is the peak so far, in KB on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+# One case in this process (the child side of run_suite)
+def run_case(args):
+    sys.path[0] = args.root
+    result = {}
+    try:
+        body = CASES[args.case](args)
+        result["setup_rss_mb"] = round(_rss_mb(), 1)
+        seconds = []
+        for _ in range(args.repeat):
+            t0 = time.perf_counter()
+            summary = body()
+            seconds.append(time.perf_counter() - t0)
+        result.update(seconds=[round(s, 4) for s in seconds], min=round(min(seconds), 4),
+                      median=round(statistics.median(seconds), 4), peak_rss_mb=round(_rss_mb(), 1), summary=summary)
+        idle = [key for key in ACTIVITY if summary.get(key) == 0]
+        if idle:
+            result["error"] = f"no {', '.join(idle)} on the bar store"
+    except Exception:
+        result["error"] = traceback.format_exc(limit=3).strip().splitlines()[-1]
+    with open(args.result, "w") as f:
+        json.dump(result, f)
+
+
+# Fill the fixture store with synthetic bars for every symbol the cases read
+def ensure_store(store):
+    marker = os.path.join(store, "fixture.json")
+    if os.path.isfile(marker):
+        with open(marker) as f:
+            if json.load(f).get("fixture") == FIXTURE:
+                return
+
+    from alpaca.data.timeframe import TimeFrame
+    from market_data import bar_store, synthetic
+    import backtesting.BIBO.BIBO9 as bibo9
+    import backtesting.BIBO.BIBO11 as bibo11
+    import backtesting.ORB.ORB1 as orb1
+
+    daily = sorted(set(bibo9.get_sp500_symbols()) | set(bibo11.get_sp500_symbols()) | {"SPY"})
+    minute = sorted(set(orb1.get_sp500_symbols()) | set(FIB_SYMBOLS))
+    print(f"building the fixture bar store in {store}: {len(daily)} daily, {len(minute)} minute symbols")
+    bar_store.STORE_DIR = store
+    synthetic.write(synthetic.Universe(*DAILY_RANGE, seed=FIXTURE_SEED), TimeFrame.Day, daily)
+    synthetic.write(synthetic.Universe(*MINUTE_RANGE, seed=FIXTURE_SEED), TimeFrame.Minute, minute)
+    with open(marker, "w") as f:
+        json.dump({"fixture": FIXTURE, "daily": DAILY_RANGE, "minute": MINUTE_RANGE, "seed": FIXTURE_SEED}, f)
+
+
+# Stop unless the store holds bars (<timeframe>/<symbol>.npz), so a wrong --store can't pass for a baseline
+def check_store(store):
+    timeframes = [os.path.join(store, name) for name in os.listdir(store)] if os.path.isdir(store) else []
+    if not any(name.endswith(".npz") for path in timeframes if os.path.isdir(path) for name in os.listdir(path)):
+        sys.exit(f"no bars in {store}: point --store at a bar store (a copy of market_data/bars), "
+                 f"or leave it out for the fixture store")
+
+
+def _git(*command, cwd=ROOT):
+    return subprocess.run(["git", *command], cwd=cwd, check=True, capture_output=True, text=True).stdout.strip()
+
+
+def run_suite(root, store, cases, repeat, latency, out):
+    commit = _git("rev-parse", "HEAD", cwd=root)
+    report = {
+        "commit": commit,
+        "dirty": bool(_git("status", "--porcelain", "--untracked-files=no", cwd=root)),
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "store": store,
+        "repeat": repeat,
+        "latency": latency,
+        "cases": {},
+    }
+    env = dict(os.environ, BAR_STORE_DIR=store, BAR_STORE_OFFLINE="1", ALPACA_OFFLINE="1")
+    for name in cases:
+        with tempfile.NamedTemporaryFile(suffix=".json", delete=False) as f:
+            result_path = f.name
+        completed = subprocess.run([sys.executable, SUITE_FILE, "case", name, "--root", root, "--repeat", str(repeat),
+                                    "--latency", str(latency), "--result", result_path],
+                                   cwd=root, env=env, capture_output=True, text=True)
+        with open(result_path) as f:
+            text = f.read()
+        os.remove(result_path)
+        result = json.loads(text) if text else {"error": (completed.stderr.strip().splitlines() or ["no result"])[-1]}
+        report["cases"][name] = result
+        if "error" in result:
+            print(f"{name:<26} error: {result['error']}")
+        else:
+            print(f"{name:<26} {result['min']:8.3f}s best  {result['median']:8.3f}s median  "
+                  f"{result['peak_rss_mb']:7.1f} MB peak  {result['summary']}")
+
+    os.makedirs(os.path.dirname(os.path.abspath(out)), exist_ok=True)
+    with open(out, "w") as f:
+        json.dump(report, f, indent=1)
+    print(f"results: {out}")
+    return report
+
+
+def default_out(report_commit, dirty):
+    return os.path.join(RESULTS_DIR, f"{report_commit}{'-dirty' if dirty else ''}.json")
+
+
+# A results file, or a commit: its saved results, else a run in a temporary worktree
+def resolve(ref, args):
+    if os.path.isfile(ref):
+        with open(ref) as f:
+            return json.load(f)
+    commit = _git("rev-parse", "--verify", f"{ref}^{{commit}}")
+    saved = default_out(commit, False)
+    if os.path.isfile(saved):
+        with open(saved) as f:
+            return json.load(f)
+
+    worktree = tempfile.mkdtemp(prefix="benchmark-")
+    _git("worktree", "add", "--detach", worktree, commit)
+    try:
+        suite = os.path.join(worktree, "benchmarks", "suite.py")
+        if not os.path.isfile(suite):
+            sys.exit(f"compare: {ref} ({commit[:10]}) predates benchmarks/suite.py; compare from that commit on")
+        # the commit's own suite, with its own cases; only a full run is kept as the commit's results
+        known = subprocess.run([sys.executable, suite, "list"], cwd=worktree, check=True, capture_output=True,
+                               text=True).stdout.split()
+        cases = [name for name in args.cases if name in known] if args.cases else []
+        if args.cases and not cases:
+            sys.exit(f"compare: none of {args.cases} is a case at {commit[:10]}")
+        out = saved if not args.cases else os.path.join(tempfile.gettempdir(), f"benchmark-{commit}.json")
+        print(f"running the suite at {commit[:10]} ({worktree})")
+        # a run with errored cases exits 1 but still writes its results; compare reports those errors
+        if os.path.isfile(out):
+            os.remove(out)
+        subprocess.run([sys.executable, suite, "run", *cases, "--store", args.store, "--repeat", str(args.repeat),
+                        "--latency", str(args.latency), "--out", out], cwd=worktree)
+        if not os.path.isfile(out):
+            sys.exit(f"compare: the suite at {commit[:10]} wrote no results")
+        with open(out) as f:
+            return json.load(f)
+    finally:
+        _git("worktree", "remove", "--force", worktree)
+
+
+def compare(old, new, threshold):
+    print(f"old {old['commit'][:10]}{' (dirty)' if old.get('dirty') else ''}   "
+          f"new {new['commit'][:10]}{' (dirty)' if new.get('dirty') else ''}   threshold {threshold:.0%}")
+    print(f"{'case':<26} {'old':>9} {'new':>9} {'ratio':>7} {'old MB':>8} {'new MB':>8}")
+    flagged = 0
+    for name in [n for n in old["cases"] if n in new["cases"]]:
+        a, b = old["cases"][name], new["cases"][name]
+        # an error on either side leaves nothing to compare against, so it fails the comparison too
+        if "error" in a or "error" in b:
+            print(f"{name:<26} {'error' if 'error' in a else a['min']:>9} {'error' if 'error' in b else b['min']:>9}"
+                  f"  ERROR {a.get('error') or b.get('error')}")
+            flagged += 1
+            continue
+        ratio = b["min"] / a["min"] if a["min"] else float("inf")
+        notes = []
+        if ratio > 1 + threshold and b["min"] - a["min"] > MIN_DELTA:
+            notes.append("SLOWER")
+        elif ratio < 1 - threshold and a["min"] - b["min"] > MIN_DELTA:
+            notes.append("faster")
+        if b["peak_rss_mb"] > a["peak_rss_mb"] * (1 + threshold):
+            notes.append("MORE MEMORY")
+        if b["summary"] != a["summary"]:
+            notes.append(f"output changed {a['summary']} -> {b['summary']}")
+        flagged += "SLOWER" in notes or "MORE MEMORY" in notes
+        print(f"{name:<26} {a['min']:9.3f} {b['min']:9.3f} {ratio:6.2f}x {a['peak_rss_mb']:8.1f} "
+              f"{b['peak_rss_mb']:8.1f}  {' '.join(notes)}")
+    print(f"{flagged} regression(s) or error(s)")
+    return flagged
+
+
+def main():
+    parser = argparse.ArgumentParser(description="offline benchmark suite")
+    parser.add_argument("command", choices=["run", "compare", "list", "case"])
+    parser.add_argument("refs", nargs="*", help="run: cases (default all); compare: OLD [NEW]; case: the case")
+    parser.add_argument("--cases", nargs="+", help="compare: only these cases")
+    parser.add_argument("--repeat", type=int, default=REPEAT)
+    parser.add_argument("--store", default=DATA_DIR)
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds per fake API call in the live cases")
+    parser.add_argument("--out")
+    parser.add_argument("--threshold", type=float, default=THRESHOLD)
+    parser.add_argument("--root", default=ROOT)
+    parser.add_argument("--result")
+    args = parser.parse_args()
+    args.store = os.path.abspath(args.store)
+
+    if args.command == "list":
+        print("\n".join(CASES))
+        return 0
+    if args.command == "case":
+        args.case = args.refs[0]
+        run_case(args)
+        return 0
+
+    sys.path.insert(0, ROOT)
+    if args.store == DATA_DIR:
+        ensure_store(args.store)
+    check_store(args.store)
+    if args.command == "run":
+        unknown = [name for name in args.refs if name not in CASES]
+        if unknown:
+            parser.error(f"unknown case(s) {unknown}; see `list`")
+        report_commit = _git("rev-parse", "HEAD")
+        dirty = bool(_git("status", "--porcelain", "--untracked-files=no"))
+        report = run_suite(ROOT, args.store, args.refs or list(CASES), args.repeat, args.latency,
+                           args.out or default_out(report_commit, dirty))
+        return 1 if any("error" in result for result in report["cases"].values()) else 0
+
+    if not 1 <= len(args.refs) <= 2:
+        parser.error("compare takes OLD [NEW]")
+    old = resolve(args.refs[0], args)
+    if len(args.refs) == 2:
+        new = resolve(args.refs[1], args)
+    else:
+        new = run_suite(ROOT, args.store, args.cases or [name for name in old["cases"] if name in CASES],
+                        args.repeat, args.latency,
+                        os.path.join(tempfile.gettempdir(), "benchmark-working-tree.json"))
+    return 1 if compare(old, new, args.threshold) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
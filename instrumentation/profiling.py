@@ -0,0 +1,214 @@
+# profiling.py
+
+# Per-phase timings for backtests and the live runner: how much of a run goes to fetching bars,
+# indicators, the signal scan, exits, orders and CSV output, in total and per symbol.
+#
+#   with profiling.phase("signals"):              time a block
+#   with profiling.phase("add_indicators", symbol):
+#   @profiling.timed(symbol_arg=0)                time every call of a function (symbol from args[0])
+#
+# Off unless PROFILE=1 (or enable() is called): phase() then hands back one shared no-op context
+# and a timed function costs a flag check, so the hooks stay in the hot paths. When on, every
+# phase adds to its (phase, symbol) count / total / max, and the summary table is printed when the
+# process exits (or by report()). PROFILE_TRACE=run.json also writes every phase as a Chrome trace
+# (open in chrome://tracing, ui.perfetto.dev or speedscope.app), one row per thread.
+#
+#   PROFILE=1 PROFILE_TRACE=bibo10.json python BIBO10.py
+#
+# Timings are per process: sweep workers started by simulation.sweep keep their own and don't report.
+
+import atexit
+import functools
+import json
+import os
+import threading
+import time
+
+
+ENABLED = os.getenv("PROFILE", "0") == "1"
+TRACE_FILE = os.getenv("PROFILE_TRACE") or None
+TOP_SYMBOLS = 5         # slowest symbols listed under each per-symbol phase
+
+_enabled = ENABLED
+_trace_file = TRACE_FILE
+_lock = threading.Lock()
+_stats = {}             # (phase, symbol) -> [calls, total seconds, max seconds]
+_events = []            # (phase, symbol, thread id, start, seconds), only while tracing
+_started = time.perf_counter()
+_reported = False
+
+
+class _NoPhase:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NO_PHASE = _NoPhase()
+
+
+class _Phase:
+    __slots__ = ("name", "symbol", "start")
+
+    def __init__(self, name, symbol):
+        self.name = name
+        self.symbol = symbol
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        _record(self.name, self.symbol, self.start, time.perf_counter())
+        return False
+
+
+def enabled():
+    return _enabled
+
+
+# Start collecting (again, from empty); trace_file: also keep every phase for write_trace()
+def enable(trace_file=None):
+    global _enabled, _trace_file, _started, _reported
+    reset()
+    _trace_file = trace_file
+    _started = time.perf_counter()
+    _reported = False
+    _enabled = True
+
+
+def disable():
+    global _enabled
+    _enabled = False
+
+
+def reset():
+    with _lock:
+        _stats.clear()
+        _events.clear()
+
+
+def phase(name, symbol=None):
+    if not _enabled:
+        return _NO_PHASE
+    return _Phase(name, symbol)
+
+
+# Decorator timing every call as one phase (default: the function's name); symbol_arg is the
+# position of the symbol among the positional arguments, for a per-symbol breakdown
+def timed(name=None, symbol_arg=None):
+    def decorate(fn):
+        label = name or fn.__name__
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return fn(*args, **kwargs)
+            symbol = args[symbol_arg] if symbol_arg is not None and symbol_arg < len(args) else None
+            start = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                _record(label, symbol, start, time.perf_counter())
+
+        return wrapper
+
+    return decorate
+
+
+def _record(name, symbol, start, end):
+    seconds = end - start
+    with _lock:
+        stat = _stats.get((name, symbol))
+        if stat is None:
+            _stats[(name, symbol)] = [1, seconds, seconds]
+        else:
+            stat[0] += 1
+            stat[1] += seconds
+            if seconds > stat[2]:
+                stat[2] = seconds
+        if _trace_file is not None:
+            _events.append((name, symbol, threading.get_ident(), start, seconds))
+
+
+# {phase: {"calls", "total", "max", "symbols": {symbol: (calls, total, max)}}} in first-seen order
+def stats():
+    with _lock:
+        items = [(key, tuple(stat)) for key, stat in _stats.items()]
+    phases = {}
+    for (name, symbol), (calls, total, longest) in items:
+        entry = phases.setdefault(name, {"calls": 0, "total": 0.0, "max": 0.0, "symbols": {}})
+        entry["calls"] += calls
+        entry["total"] += total
+        entry["max"] = max(entry["max"], longest)
+        if symbol is not None:
+            entry["symbols"][symbol] = (calls, total, longest)
+    return phases
+
+
+# The summary table: phases by total time, then the slowest symbols of each per-symbol phase.
+# "% wall" is against the time since profiling started; nested phases and phases running on
+# several threads can add up to more than 100%.
+def summary(top=TOP_SYMBOLS):
+    wall = time.perf_counter() - _started
+    phases = sorted(stats().items(), key=lambda item: -item[1]["total"])
+    lines = [f"profile: {wall:.2f}s wall",
+             f"{'phase':<24}{'calls':>9}{'symbols':>9}{'total s':>10}{'mean ms':>10}{'max ms':>10}{'% wall':>8}"]
+    for name, entry in phases:
+        lines.append(f"{name:<24}{entry['calls']:>9}{len(entry['symbols']) or '':>9}{entry['total']:>10.3f}"
+                     f"{entry['total'] / entry['calls'] * 1000:>10.2f}{entry['max'] * 1000:>10.2f}"
+                     f"{entry['total'] / wall * 100 if wall > 0 else 0.0:>7.1f}%")
+    for name, entry in phases:
+        if not entry["symbols"] or top <= 0:
+            continue
+        slowest = sorted(entry["symbols"].items(), key=lambda item: -item[1][1])[:top]
+        lines.append(f"slowest {name}: " + ", ".join(f"{symbol} {total * 1000:.1f}ms/{calls}"
+                                                    for symbol, (calls, total, _) in slowest))
+    return "\n".join(lines)
+
+
+# Every recorded phase as Chrome trace events ("X" complete events, microseconds from the start)
+def write_trace(path):
+    pid = os.getpid()
+    with _lock:
+        events = list(_events)
+    main = threading.main_thread().ident
+    threads = {main: 0}
+    trace = []
+    for name, symbol, thread, start, seconds in events:
+        tid = threads.setdefault(thread, len(threads))
+        event = {"name": name, "cat": "phase", "ph": "X", "pid": pid, "tid": tid,
+                 "ts": round((start - _started) * 1e6, 3), "dur": round(seconds * 1e6, 3)}
+        if symbol is not None:
+            event["args"] = {"symbol": symbol}
+        trace.append(event)
+    trace.extend({"name": "thread_name", "ph": "M", "pid": pid, "tid": tid,
+                  "args": {"name": "main" if tid == 0 else f"thread {tid}"}} for tid in threads.values())
+    with open(path, "w") as f:
+        json.dump({"traceEvents": trace, "displayTimeUnit": "ms"}, f)
+    return len(events)
+
+
+# Summary through write (print, logger.info, ...) and the trace file if one was asked for;
+# does nothing when profiling is off. The exit hook skips a run that already reported.
+def report(write=print):
+    global _reported
+    if not _enabled:
+        return
+    _reported = True
+    write(summary())
+    if _trace_file is not None:
+        count = write_trace(_trace_file)
+        write(f"profile: {count} phases traced to {_trace_file}")
+
+
+def _report_at_exit():
+    if not _reported:
+        report()
+
+
+atexit.register(_report_at_exit)
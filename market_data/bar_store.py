@@ -0,0 +1,201 @@
+# bar_store.py
+
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+
+from alpaca.data.requests import StockBarsRequest
+
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+STORE_DIR = os.getenv("BAR_STORE_DIR", os.path.join(BASE_DIR, "bars"))
+
+# BAR_STORE_OFFLINE=1 serves everything from disk and never touches the network
+OFFLINE = os.getenv("BAR_STORE_OFFLINE", "0") == "1"
+
+BAR_COLUMNS = ["open", "high", "low", "close", "volume", "trade_count", "vwap"]
+
+_locks = {}
+_locks_guard = threading.Lock()
+
+
+def _lock_for(path):
+    with _locks_guard:
+        if path not in _locks:
+            _locks[path] = threading.Lock()
+        return _locks[path]
+
+
+def to_utc(ts):
+    ts = pd.Timestamp(ts)
+    if ts.tzinfo is None:
+        return ts.tz_localize("UTC")
+    return ts.tz_convert("UTC")
+
+
+def empty_frame():
+    df = pd.DataFrame({col: np.array([], dtype="float64") for col in BAR_COLUMNS},
+                      index=pd.DatetimeIndex([], tz="UTC", name="timestamp"))
+    return df
+
+
+def store_path(symbol, timeframe):
+    return os.path.join(STORE_DIR, str(timeframe), f"{symbol}.npz")
+
+
+# One .npz per (symbol, timeframe): a column array per field plus the covered [start, end) ranges
+def _read(path):
+    if not os.path.isfile(path):
+        return empty_frame(), []
+
+    with np.load(path) as npz:
+        index = pd.DatetimeIndex(npz["timestamp"], name="timestamp").tz_localize("UTC")
+        df = pd.DataFrame({col: npz[col] for col in BAR_COLUMNS}, index=index)
+        coverage = list(zip(npz["covered_start"].tolist(), npz["covered_end"].tolist()))
+
+    return df, coverage
+
+
+def _write(path, df, coverage):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    columns = {col: df[col].to_numpy(dtype="float64") for col in BAR_COLUMNS}
+    columns["timestamp"] = df.index.tz_convert("UTC").tz_localize(None).to_numpy(dtype="datetime64[ns]").astype("int64")
+    columns["covered_start"] = np.array([s for s, _ in coverage], dtype="int64")
+    columns["covered_end"] = np.array([e for _, e in coverage], dtype="int64")
+
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp_path, "wb") as f:
+        np.savez(f, **columns)
+    os.replace(tmp_path, path)
+
+
+def _merge_ranges(ranges):
+    merged = []
+    for start, end in sorted(ranges):
+        if merged and start <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def missing_ranges(coverage, start, end):
+    missing = []
+    cursor = start
+    for covered_start, covered_end in _merge_ranges(coverage):
+        if covered_end <= cursor:
+            continue
+        if covered_start >= end:
+            break
+        if covered_start > cursor:
+            missing.append((cursor, covered_start))
+        cursor = max(cursor, covered_end)
+    if cursor < end:
+        missing.append((cursor, end))
+    return missing
+
+
+def default_client():
+    from account import clients
+    return clients.get("historical")
+
+
+def bars_to_frame(bars):
+    if not bars:
+        return empty_frame()
+
+    df = pd.DataFrame([{
+        "timestamp": bar.timestamp,
+        "open": bar.open,
+        "high": bar.high,
+        "low": bar.low,
+        "close": bar.close,
+        "volume": bar.volume,
+        "trade_count": bar.trade_count,
+        "vwap": bar.vwap
+    } for bar in bars])
+    df["timestamp"] = pd.to_datetime(df["timestamp"], utc=True)
+    df = df.set_index("timestamp")
+    return df[BAR_COLUMNS].astype("float64")
+
+
+def _download(client, symbol, timeframe, start, end):
+    request = StockBarsRequest(
+        symbol_or_symbols=symbol,
+        timeframe=timeframe,
+        start=start.to_pydatetime(),
+        end=end.to_pydatetime()
+    )
+    bars = client.get_stock_bars(request)
+    return bars_to_frame(bars.data.get(symbol, []))
+
+
+# Cached bars and covered ranges (UTC ns, half-open) for one symbol
+def read_store(symbol, timeframe):
+    path = store_path(symbol, timeframe)
+    with _lock_for(path):
+        return _read(path)
+
+
+# Write freshly downloaded bars into the store and mark [start, end) as covered
+def merge_into_store(symbol, timeframe, frame, ranges):
+    path = store_path(symbol, timeframe)
+    with _lock_for(path):
+        df, coverage = _read(path)
+        return _commit(path, df, coverage, [frame], ranges)
+
+
+# Replace a symbol's file with df covering ranges (generated data, nothing to merge with)
+def write_store(symbol, timeframe, df, ranges):
+    path = store_path(symbol, timeframe)
+    with _lock_for(path):
+        _write(path, df, _merge_ranges(ranges))
+
+
+def _commit(path, df, coverage, frames, ranges):
+    # today's bar is still forming, so the range is only trusted up to the start of the UTC day
+    trusted_until = pd.Timestamp.now(tz="UTC").normalize().value
+    frames = [f for f in frames if not f.empty]
+    if frames:
+        df = pd.concat([df] + frames)
+        df = df[~df.index.duplicated(keep="last")].sort_index()
+    for start, end in ranges:
+        end = min(end, trusted_until)
+        if start < end:
+            coverage.append((start, end))
+    coverage = _merge_ranges(coverage)
+    _write(path, df, coverage)
+    return df
+
+
+# Load bars for [start, end] from disk, downloading only the ranges the store has not seen yet
+def load_bars(symbol, timeframe, start, end, offline=None, client=None):
+    offline = OFFLINE if offline is None else offline
+    start = to_utc(start)
+    end = to_utc(end)
+    path = store_path(symbol, timeframe)
+
+    with _lock_for(path):
+        df, coverage = _read(path)
+        # coverage is half-open, so extend the inclusive end by one microsecond (alpaca's resolution)
+        missing = missing_ranges(coverage, start.value, end.value + 1000)
+
+        if missing and offline:
+            print(f"bar store offline: {symbol} {timeframe} has {len(missing)} uncached range(s) between {start} and {end}")
+        elif missing:
+            client = client or default_client()
+            frames = []
+            for range_start, range_end in missing:
+                frames.append(_download(client, symbol, timeframe, pd.Timestamp(range_start, tz="UTC"),
+                                        pd.Timestamp(range_end, tz="UTC")))
+            df = _commit(path, df, coverage, frames, missing)
+
+    return df.loc[start:end].copy()
+
+
+# Bars for [start, end] as a list of rows exposing .timestamp/.open/.high/.low/.close like alpaca Bar objects
+def load_bar_rows(symbol, timeframe, start, end, offline=None, client=None):
+    df = load_bars(symbol, timeframe, start, end, offline=offline, client=client)
+    return list(df.reset_index().itertuples(index=False))
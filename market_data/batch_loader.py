@@ -0,0 +1,216 @@
+# batch_loader.py
+
+import threading
+import time
+import concurrent.futures
+
+import pandas as pd
+
+from alpaca.common.exceptions import APIError
+from alpaca.data.requests import StockBarsRequest
+
+from market_data import bar_store
+
+
+BATCH_SIZE = 100        # symbols per StockBarsRequest
+MAX_WORKERS = 4         # batches in flight at once
+MAX_RETRIES = 5
+
+
+# AIMD limiter: creeps the request rate up after every success and halves it on a 429
+class AdaptiveRateLimiter:
+
+    def __init__(self, rate=3.0, min_rate=0.2, max_rate=3.3, increase=0.05, backoff=0.5):
+        # rates are requests per second; alpaca's basic data plan allows 200 per minute
+        self.rate = rate
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.increase = increase
+        self.backoff = backoff
+        self.throttled_count = 0
+        self._next_slot = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        with self._lock:
+            now = time.monotonic()
+            wait = self._next_slot - now
+            self._next_slot = max(now, self._next_slot) + 1 / self.rate
+        if wait > 0:
+            time.sleep(wait)
+
+    def success(self):
+        with self._lock:
+            self.rate = min(self.max_rate, self.rate + self.increase)
+
+    def throttled(self):
+        with self._lock:
+            self.rate = max(self.min_rate, self.rate * self.backoff)
+            self.throttled_count += 1
+            # push the next slot out so every thread backs off, not just this one
+            self._next_slot = max(self._next_slot, time.monotonic()) + 1 / self.rate
+
+
+limiter = AdaptiveRateLimiter()
+
+
+# Raised once every batch has finished when some of them failed; frames holds the symbols that
+# did load, failed maps each symbol of a failed batch to its error
+class BatchLoadError(Exception):
+
+    def __init__(self, frames, failed):
+        super().__init__(f"{len(failed)} symbol(s) failed to load: {', '.join(sorted(failed)[:10])}"
+                         f"{' ...' if len(failed) > 10 else ''}")
+        self.frames = frames
+        self.failed = failed
+
+
+def chunk(symbols, size):
+    return [symbols[i:i + size] for i in range(0, len(symbols), size)]
+
+
+# Split the (symbol, timestamp) multi-index frame of a BarSet into one frame per symbol
+def split_barset(bars):
+    frames = {}
+    df = bars.df
+    if df.empty:
+        return frames
+
+    for symbol, frame in df.groupby(level="symbol", sort=False):
+        frame = frame.droplevel("symbol")
+        frame.index = pd.to_datetime(frame.index, utc=True).rename("timestamp")
+        frames[symbol] = frame.reindex(columns=bar_store.BAR_COLUMNS).astype("float64")
+    return frames
+
+
+def _is_rate_limited(error):
+    try:
+        return error.status_code == 429
+    except Exception:
+        return "429" in str(error)
+
+
+# One multi-symbol request; the SDK already follows next_page_token until the range is exhausted.
+# 429s are retried here, paced by the limiter: clients.get builds the historical client with the
+# SDK's own retries off, so the limiter sees the first 429 instead of one after ~9s of SDK sleeps
+def fetch_batch(client, symbols, timeframe, start, end, rate_limiter=None, max_retries=MAX_RETRIES):
+    rate_limiter = rate_limiter or limiter
+    request = StockBarsRequest(
+        symbol_or_symbols=list(symbols),
+        timeframe=timeframe,
+        start=start,
+        end=end
+    )
+
+    for attempt in range(max_retries + 1):
+        rate_limiter.acquire()
+        try:
+            bars = client.get_stock_bars(request)
+        except APIError as e:
+            if not _is_rate_limited(e) or attempt == max_retries:
+                raise
+            rate_limiter.throttled()
+            continue
+        rate_limiter.success()
+        frames = split_barset(bars)
+        # symbols with no bars in the range still count as fetched
+        return {symbol: frames.get(symbol, bar_store.empty_frame()) for symbol in symbols}
+
+
+# Bars for many symbols straight from the API, packed BATCH_SIZE symbols per request;
+# raises BatchLoadError (with the frames that did load) if any batch failed
+def load_bars_batched(symbols, timeframe, start, end, client=None, batch_size=BATCH_SIZE,
+                      max_workers=MAX_WORKERS, rate_limiter=None):
+    client = client or bar_store.default_client()
+    frames = {}
+    failed = {}
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {
+            executor.submit(fetch_batch, client, batch, timeframe, start, end, rate_limiter): batch
+            for batch in chunk(list(symbols), batch_size)
+        }
+        for future in concurrent.futures.as_completed(futures):
+            try:
+                frames.update(future.result())
+            except Exception as e:
+                failed.update((symbol, e) for symbol in futures[future])
+
+    if failed:
+        raise BatchLoadError(frames, failed)
+    return frames
+
+
+# Same as bar_store.load_bars for a list of symbols; symbols missing the same ranges share requests.
+# Whatever loaded is stored either way; if a batch failed this raises BatchLoadError afterwards, its
+# frames holding every symbol's bars (stored only, for the failed ones)
+def load_bars_many(symbols, timeframe, start, end, offline=None, client=None, batch_size=BATCH_SIZE,
+                   max_workers=MAX_WORKERS, rate_limiter=None):
+    offline = bar_store.OFFLINE if offline is None else offline
+    start = bar_store.to_utc(start)
+    end = bar_store.to_utc(end)
+
+    cached = {}
+    groups = {}
+    for symbol in symbols:
+        df, coverage = bar_store.read_store(symbol, timeframe)
+        cached[symbol] = df
+        missing = tuple(bar_store.missing_ranges(coverage, start.value, end.value + 1000))
+        if missing:
+            groups.setdefault(missing, []).append(symbol)
+
+    failed = {}
+    if groups and offline:
+        print(f"bar store offline: {sum(len(g) for g in groups.values())} symbol(s) have uncached {timeframe} ranges")
+    elif groups:
+        client = client or bar_store.default_client()
+        for missing, group in groups.items():
+            downloaded = {symbol: [] for symbol in group}
+            for range_start, range_end in missing:
+                try:
+                    frames = load_bars_batched(group, timeframe,
+                                               pd.Timestamp(range_start, tz="UTC").to_pydatetime(),
+                                               pd.Timestamp(range_end, tz="UTC").to_pydatetime(),
+                                               client=client, batch_size=batch_size, max_workers=max_workers,
+                                               rate_limiter=rate_limiter)
+                except BatchLoadError as e:
+                    frames = e.frames
+                    failed.update(e.failed)
+                for symbol, frame in frames.items():
+                    if symbol in downloaded:
+                        downloaded[symbol].append(frame)
+
+            for symbol, parts in downloaded.items():
+                # a failed batch leaves the symbol short of parts; don't mark its ranges as covered
+                if len(parts) != len(missing):
+                    continue
+                cached[symbol] = bar_store.merge_into_store(symbol, timeframe, pd.concat(parts), list(missing))
+
+    result = {symbol: df.loc[start:end].copy() for symbol, df in cached.items()}
+    if failed:
+        raise BatchLoadError(result, failed)
+    return result
+
+
+# Warm the bar store for a universe so later per-symbol load_bars calls are served from disk; symbols
+# whose batch failed are reported and left to those per-symbol loads
+def prefetch(symbols, timeframe, start, end, offline=None, client=None, batch_size=BATCH_SIZE):
+    try:
+        load_bars_many(symbols, timeframe, start, end, offline=offline, client=client, batch_size=batch_size)
+    except BatchLoadError as e:
+        print(f"prefetch: {e}; they will be loaded one by one")
+
+
+# {symbol: result} from futures ({future: symbol}), in the order of symbols whatever order they finish in,
+# so runs over the same universe see the same dict order. process(symbol, result) runs on each result
+# as it arrives; a symbol whose future or process fails is reported and left out.
+def collect_in_order(futures, symbols, process=None):
+    results = {}
+    for future in concurrent.futures.as_completed(futures):
+        symbol = futures[future]
+        try:
+            result = future.result()
+            results[symbol] = process(symbol, result) if process is not None else result
+        except Exception as e:
+            print(f"Error loading {symbol}: {e}")
+    return {symbol: results[symbol] for symbol in symbols if symbol in results}
@@ -0,0 +1,201 @@
+# fake_client.py
+
+# A local stand-in for alpaca's StockHistoricalDataClient, so the loaders, the snapshot service
+# and the backtests can be timed on a disconnected box and give the same numbers run after run.
+# It answers get_stock_bars / get_stock_snapshot with the SDK's own BarSet and Snapshot models,
+# from one of two sources:
+#   StoreSource(path)     recorded fixtures: a copy of a bar store directory (<timeframe>/<symbol>.npz)
+#   SyntheticSource(seed) market_data.synthetic's universe, the same bars for a symbol whatever range is asked for
+# Every HTTP call the real API would see (one per page of PAGE_SIZE bars, one per snapshot request)
+# costs latency + uniform jitter, and more than rate_limit calls in a sliding window raise the
+# SDK's 429 APIError, so batching, caching, concurrency and the AIMD limiter are all exercised.
+#
+#   clients.install("historical", FakeDataClient(SyntheticSource(), latency=0.05, rate_limit=200))
+#
+# or, for a whole process:  ALPACA_FAKE_DATA=synthetic (or a fixture directory), with
+# ALPACA_FAKE_LATENCY, ALPACA_FAKE_JITTER and ALPACA_FAKE_RATE_LIMIT (calls per minute).
+
+import collections
+import math
+import os
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+from requests import HTTPError, Response
+
+from alpaca.common.exceptions import APIError
+from alpaca.data.models import BarSet, Snapshot
+from alpaca.data.timeframe import TimeFrame, TimeFrameUnit
+
+from market_data import bar_store, synthetic
+
+
+PAGE_SIZE = 10000       # bars per page of a multi-symbol bars request, as on alpaca's API
+RATE_WINDOW = 60.0      # seconds; rate_limit counts calls in this window (alpaca: 200 per minute)
+
+
+def _rate_limited():
+    response = Response()
+    response.status_code = 429
+    error = '{"code": 42910000, "message": "rate limit exceeded"}'
+    return APIError(error, HTTPError(error, response=response))
+
+
+def _timeframe_key(timeframe):
+    if timeframe.amount_value != 1 or timeframe.unit_value not in (TimeFrameUnit.Day, TimeFrameUnit.Minute):
+        raise ValueError(f"fake client serves 1Day and 1Min bars only, not {timeframe}")
+    return str(timeframe)
+
+
+def _symbols(request):
+    symbols = request.symbol_or_symbols
+    return [symbols] if isinstance(symbols, str) else list(symbols)
+
+
+# Recorded bars: any directory laid out like the bar store (copy market_data/bars to keep a fixture set)
+class StoreSource:
+
+    def __init__(self, path=bar_store.STORE_DIR):
+        self.path = path
+        self._frames = {}
+        self._lock = threading.Lock()
+
+    def bars(self, symbol, timeframe, start, end):
+        key = (symbol, _timeframe_key(timeframe))
+        with self._lock:
+            if key not in self._frames:
+                self._frames[key] = bar_store._read(os.path.join(self.path, key[1], f"{symbol}.npz"))[0]
+            df = self._frames[key]
+        return df.loc[start:end]
+
+
+# The synthetic universe of market_data.synthetic served from memory, from origin to horizon: the
+# daily series of a symbol is drawn once, minute bars only for the sessions a request covers. Every
+# draw is seeded per symbol and block of days, so any two requests agree on every bar they share.
+class SyntheticSource:
+
+    def __init__(self, seed=0, origin="2000-01-03", horizon="2040-12-31"):
+        self.universe = synthetic.Universe(origin, horizon, seed=seed)
+        self._daily = {}
+        self._lock = threading.Lock()
+
+    def daily(self, symbol):
+        with self._lock:
+            if symbol in self._daily:
+                return self._daily[symbol]
+        df = self.universe.daily(symbol)
+        with self._lock:
+            return self._daily.setdefault(symbol, df)
+
+    def bars(self, symbol, timeframe, start, end):
+        if _timeframe_key(timeframe) == str(TimeFrame.Day):
+            return self.daily(symbol).loc[start:end]
+        first, last = self.universe.sessions(start, end)
+        return self.universe.minutes(symbol, first, last).loc[start:end]
+
+
+class FakeDataClient:
+
+    # latency/jitter in seconds per call; rate_limit calls per window seconds (None: unlimited);
+    # now: the moment snapshots are taken at (default: the wall clock)
+    def __init__(self, source=None, latency=0.0, jitter=0.0, rate_limit=None, window=RATE_WINDOW,
+                 page_size=PAGE_SIZE, now=None, seed=0):
+        self.source = source if source is not None else SyntheticSource()
+        self.latency = latency
+        self.jitter = jitter
+        self.rate_limit = rate_limit
+        self.window = window
+        self.page_size = page_size
+        self.now = now
+        self.requests = 0
+        self.throttled = 0
+        self.bars_served = 0
+        self._calls = collections.deque()
+        self._rng = np.random.default_rng(seed)
+        self._lock = threading.Lock()
+
+    # One HTTP call: take a rate-limit slot (or fail with a 429 like the API), then wait out the latency
+    def _call(self):
+        with self._lock:
+            now = time.monotonic()
+            while self._calls and self._calls[0] <= now - self.window:
+                self._calls.popleft()
+            if self.rate_limit is not None and len(self._calls) >= self.rate_limit:
+                self.throttled += 1
+                raise _rate_limited()
+            self._calls.append(now)
+            self.requests += 1
+            delay = self.latency + (self.jitter * self._rng.random() if self.jitter else 0.0)
+        if delay > 0:
+            time.sleep(delay)
+
+    def _range(self, request):
+        start = bar_store.to_utc(request.start) if request.start is not None else pd.Timestamp(0, tz="UTC")
+        end = bar_store.to_utc(request.end) if request.end is not None else self._now()
+        return start, end
+
+    def _now(self):
+        return bar_store.to_utc(self.now) if self.now is not None else pd.Timestamp.now(tz="UTC")
+
+    def get_stock_bars(self, request):
+        start, end = self._range(request)
+        frames = {symbol: self.source.bars(symbol, request.timeframe, start, end) for symbol in _symbols(request)}
+        # limit caps the bars of the whole request, taken symbol by symbol in request order
+        if request.limit is not None:
+            remaining = request.limit
+            for symbol, df in frames.items():
+                frames[symbol] = df.iloc[:remaining]
+                remaining -= len(frames[symbol])
+        count = sum(len(df) for df in frames.values())
+        # the SDK follows next_page_token, one call per page
+        for _ in range(max(1, math.ceil(count / self.page_size))):
+            self._call()
+        with self._lock:
+            self.bars_served += count
+        return BarSet({symbol: _raw_bars(df) for symbol, df in frames.items() if len(df)})
+
+    # Snapshots as of now: the latest daily bar, the one before, the last minute
+    # bar when the source has minutes, and a last trade at the latest close
+    def get_stock_snapshot(self, request):
+        self._call()
+        now = self._now()
+        snapshots = {}
+        for symbol in _symbols(request):
+            days = self.source.bars(symbol, TimeFrame.Day, now - pd.Timedelta(days=10), now)
+            if days.empty:
+                continue
+            minutes = self.source.bars(symbol, TimeFrame.Minute, days.index[-1], now)
+            raw = _raw_bars(days.iloc[-2:])
+            latest = _raw_bars(minutes.iloc[-1:])[0] if len(minutes) else raw[-1]
+            snapshots[symbol] = Snapshot(symbol, {
+                "dailyBar": raw[-1],
+                "prevDailyBar": raw[-2] if len(raw) > 1 else None,
+                "minuteBar": latest if len(minutes) else None,
+                "latestTrade": {"t": latest["t"], "p": latest["c"], "s": 100, "x": "V", "i": 0, "c": ["@"], "z": "C"},
+            })
+        return snapshots
+
+    def stats(self):
+        with self._lock:
+            return {"requests": self.requests, "throttled": self.throttled, "bars_served": self.bars_served}
+
+
+def _raw_bars(df):
+    columns = [df[col].tolist() for col in bar_store.BAR_COLUMNS]
+    return [{"t": t, "o": o, "h": h, "l": l, "c": c, "v": v, "n": n, "vw": vw}
+            for t, o, h, l, c, v, n, vw in zip(df.index.to_pydatetime(), *columns)]
+
+
+# ALPACA_FAKE_DATA=synthetic or a fixture directory; None when unset
+def from_env():
+    data = os.getenv("ALPACA_FAKE_DATA")
+    if not data:
+        return None
+    source = SyntheticSource() if data == "synthetic" else StoreSource(data)
+    rate_limit = os.getenv("ALPACA_FAKE_RATE_LIMIT")
+    return FakeDataClient(source,
+                          latency=float(os.getenv("ALPACA_FAKE_LATENCY", "0")),
+                          jitter=float(os.getenv("ALPACA_FAKE_JITTER", "0")),
+                          rate_limit=int(rate_limit) if rate_limit else None)
@@ -0,0 +1,257 @@
+# synthetic.py
+
+# Seeded synthetic OHLCV universes for scale testing: thousands of symbols over decades, written
+# straight into the bar store so the backtests (with BAR_STORE_OFFLINE=1) and fake_client.StoreSource
+# read them like downloaded bars.
+#
+# Returns follow a one-factor-plus-sector model under a Markov chain of market regimes:
+#   regime     calm / bull / bear / crash, each with its own market drift and volatility multiplier
+#   market     one daily factor every symbol loads on with its beta (the index symbol is the factor)
+#   sector     SECTORS sector factors, each symbol loads on one
+#   overnight  a gap at every open, plus earnings-style jumps on about one day a quarter
+# Volume scales with the regime and the size of the day's move. Minute bars (09:30-16:00 ET on
+# business days) share an intraday market path, carry a U-shaped volume profile, and are bridged
+# to the day's open and close; their volumes split the day's volume.
+#
+# Every draw is seeded from (seed, symbol) or (seed, day), so a symbol's bars don't depend on which
+# other symbols are generated, in what order, or in how many processes.
+#
+#   python -m market_data.synthetic daily 5000 2005-01-01 2024-12-31 [seed]
+#   python -m market_data.synthetic minute 50 2024-01-01 2024-12-31 [seed]
+#
+# Point BAR_STORE_DIR at a scratch directory first; synthetic symbols are SYN0000, SYN0001, ...
+
+import concurrent.futures
+import math
+import os
+import sys
+import time
+import zlib
+
+import numpy as np
+import pandas as pd
+
+from alpaca.data.timeframe import TimeFrame
+
+from market_data import bar_store
+
+
+NY = "America/New_York"
+SESSION_MINUTES = 390
+MINUTE_CHUNK_DAYS = 21      # minute draws are seeded per block of days, aligned to the start date
+
+SECTORS = 11
+INDEX_SYMBOL = "SPY"
+
+# name: (daily market drift, volatility multiplier)
+REGIMES = {
+    "calm": (0.0004, 0.8),
+    "bull": (0.0008, 1.0),
+    "bear": (-0.0008, 1.6),
+    "crash": (-0.004, 3.5),
+}
+# daily transition probabilities, rows and columns in REGIMES order
+TRANSITIONS = np.array([
+    [0.985, 0.010, 0.005, 0.000],
+    [0.010, 0.984, 0.005, 0.001],
+    [0.010, 0.010, 0.975, 0.005],
+    [0.000, 0.020, 0.080, 0.900],
+])
+
+MARKET_VOL = 0.009
+SECTOR_VOL = 0.006
+OVERNIGHT_VOL = 0.25        # overnight gap volatility, as a fraction of the symbol's daily volatility
+JUMP_PROB = 1 / 63
+JUMP_VOL = 0.05
+
+
+def symbols(n, prefix="SYN"):
+    width = max(4, len(str(n - 1)))
+    return [f"{prefix}{k:0{width}d}" for k in range(n)]
+
+
+class Universe:
+
+    def __init__(self, start, end, seed=0, index_symbol=INDEX_SYMBOL):
+        self.seed = seed
+        self.index_symbol = index_symbol
+        self.start = bar_store.to_utc(pd.Timestamp(start).normalize())
+        self.end = bar_store.to_utc(pd.Timestamp(end).normalize())
+        self.days = pd.bdate_range(pd.Timestamp(start).date(), pd.Timestamp(end).date())
+        self.day_index = self.days.tz_localize(NY).tz_convert("UTC").rename("timestamp")
+        # UTC ns of each session's 09:30 open
+        self.session_open = (self.days + pd.Timedelta(hours=9, minutes=30)).tz_localize(NY).tz_convert("UTC").asi8
+
+        rng = np.random.default_rng([seed, 0])
+        n = len(self.days)
+        self.regime = _regime_path(rng, n)
+        drift, multiplier = np.array(list(REGIMES.values())).T
+        self.drift = drift[self.regime]
+        self.multiplier = multiplier[self.regime]
+        self.market = MARKET_VOL * rng.standard_normal(n)
+        self.sectors = SECTOR_VOL * rng.standard_normal((SECTORS, n))
+        self._market_minutes = {}  # block start -> draws
+
+    def _rng(self, symbol, *extra):
+        return np.random.default_rng([self.seed, 1, zlib.crc32(symbol.encode()), *extra])
+
+    # The symbol's loadings and levels; the index symbol is the market factor itself
+    def profile(self, symbol):
+        rng = self._rng(symbol)
+        if symbol == self.index_symbol:
+            return {"beta": 1.0, "sector": 0, "gamma": 0.0, "sigma": 0.001, "price": 400.0, "volume": 8e7}
+        return {
+            "beta": float(np.clip(rng.normal(1.0, 0.35), 0.2, 2.5)),
+            "sector": int(rng.integers(SECTORS)),
+            "gamma": float(np.clip(rng.normal(0.8, 0.3), 0.0, 1.5)),
+            "sigma": float(0.011 * rng.lognormal(0, 0.35)),
+            "price": float(math.exp(rng.normal(math.log(60), 0.9))),
+            "volume": float(math.exp(rng.normal(math.log(2e6), 1.0))),
+        }
+
+    # Daily columns of one symbol plus the pieces its minute bars are built from
+    def _daily(self, symbol):
+        p = self.profile(symbol)
+        rng = self._rng(symbol, 0)
+        n = len(self.days)
+        e, gap, spread_high, spread_low, volume_noise = rng.standard_normal((5, n))
+        jumps = np.where(rng.random(n) < JUMP_PROB, JUMP_VOL * rng.standard_normal(n), 0.0)
+        if symbol == self.index_symbol:
+            jumps[:] = 0.0
+
+        m = self.multiplier
+        sigma = math.sqrt((p["beta"] * MARKET_VOL) ** 2 + (p["gamma"] * SECTOR_VOL) ** 2 + p["sigma"] ** 2)
+        intraday = p["beta"] * self.drift + m * (p["beta"] * self.market + p["gamma"] * self.sectors[p["sector"]]
+                                                 + p["sigma"] * e)
+        overnight = OVERNIGHT_VOL * sigma * m * gap + jumps
+
+        log_close = math.log(p["price"]) + (overnight + intraday).cumsum()
+        close = np.exp(log_close)
+        open_ = np.exp(log_close - intraday)
+        half_range = 0.5 * sigma * m
+        high = np.maximum(open_, close) * np.exp(half_range * np.abs(spread_high))
+        low = np.minimum(open_, close) * np.exp(-half_range * np.abs(spread_low))
+        volume = np.round(p["volume"] * np.sqrt(m) * (1 + 2 * np.abs(intraday + overnight) / sigma)
+                          * np.exp(0.3 * volume_noise))
+        columns = {"open": open_, "high": high, "low": low, "close": close, "volume": volume,
+                   "trade_count": np.round(volume / 150), "vwap": (high + low + close) / 3}
+        return p, columns, intraday
+
+    def daily(self, symbol):
+        _, columns, _ = self._daily(symbol)
+        return pd.DataFrame(columns, index=self.day_index)
+
+    # Market minute returns of the block of sessions starting at d0, one draw per session shared by
+    # every symbol (days x minutes); each block is built once, when first asked for
+    def market_minutes(self, d0):
+        if d0 not in self._market_minutes:
+            d1 = min(d0 + MINUTE_CHUNK_DAYS, len(self.days))
+            self._market_minutes[d0] = np.stack([np.random.default_rng([self.seed, 2, d]).standard_normal(SESSION_MINUTES)
+                                                 for d in range(d0, d1)])
+        return self._market_minutes[d0]
+
+    # [first, last) positions of the sessions with a minute bar in [start, end]
+    def sessions(self, start, end):
+        last_bar = self.session_open + (SESSION_MINUTES - 1) * 60_000_000_000
+        first = int(np.searchsorted(last_bar, bar_store.to_utc(start).value, side="left"))
+        last = int(np.searchsorted(self.session_open, bar_store.to_utc(end).value, side="right"))
+        return first, max(first, last)
+
+    # Minute bars of sessions first to last (default: every session). Each block of MINUTE_CHUNK_DAYS
+    # sessions is drawn whole from its own seed and cut to the range, so any range gives the same bars.
+    def minutes(self, symbol, first=0, last=None):
+        last = len(self.days) if last is None else last
+        if first >= last:
+            return bar_store.empty_frame()
+        p, daily, intraday = self._daily(symbol)
+        profile = 1 + 2 * np.linspace(-1, 1, SESSION_MINUTES) ** 2
+        profile /= profile.sum()
+        step = 1 / math.sqrt(SESSION_MINUTES)
+        bridge = np.arange(1, SESSION_MINUTES + 1) / SESSION_MINUTES
+
+        frames = []
+        for d0 in range(first - first % MINUTE_CHUNK_DAYS, last, MINUTE_CHUNK_DAYS):
+            d1 = min(d0 + MINUTE_CHUNK_DAYS, len(self.days))
+            rng = self._rng(symbol, 1, d0)
+            e, spread_high, spread_low, volume_noise = rng.standard_normal((4, d1 - d0, SESSION_MINUTES))
+            m = self.multiplier[d0:d1, None]
+            market = self.market_minutes(d0)
+
+            walk = (step * m * (p["beta"] * MARKET_VOL * market + p["sigma"] * e)).cumsum(axis=1)
+            # pin each session's last close to the daily close
+            walk += bridge * (intraday[d0:d1, None] - walk[:, -1:])
+            day_open = daily["open"][d0:d1, None]
+            close = day_open * np.exp(walk)
+            open_ = np.concatenate([day_open, close[:, :-1]], axis=1)
+            half_range = 0.5 * step * m * p["sigma"]
+            high = np.maximum(open_, close) * np.exp(half_range * np.abs(spread_high))
+            low = np.minimum(open_, close) * np.exp(-half_range * np.abs(spread_low))
+            weights = profile * np.exp(0.3 * volume_noise)
+            volume = np.round(daily["volume"][d0:d1, None] * weights / weights.sum(axis=1, keepdims=True))
+            index = self.session_open[d0:d1, None] + np.arange(SESSION_MINUTES) * 60_000_000_000
+            # the sessions of this block inside [first, last)
+            keep = slice(max(first, d0) - d0, min(last, d1) - d0)
+            columns = {"open": open_, "high": high, "low": low, "close": close, "volume": volume,
+                       "trade_count": np.round(volume / 150), "vwap": (high + low + close) / 3}
+            frames.append((index[keep].ravel(), {col: values[keep].ravel() for col, values in columns.items()}))
+
+        index = pd.DatetimeIndex(np.concatenate([f[0] for f in frames]), name="timestamp").tz_localize("UTC")
+        return pd.DataFrame({col: np.concatenate([f[1][col] for f in frames]) for col in bar_store.BAR_COLUMNS},
+                            index=index)
+
+    def bars(self, symbol, timeframe):
+        if str(timeframe) == str(TimeFrame.Day):
+            return self.daily(symbol)
+        if str(timeframe) == str(TimeFrame.Minute):
+            return self.minutes(symbol)
+        raise ValueError(f"synthetic universe generates 1Day and 1Min bars only, not {timeframe}")
+
+    # The [start, end) range a symbol's store file covers: every calendar day from start to end
+    def coverage(self):
+        return [(self.start.value, (self.end + pd.Timedelta(days=1)).value)]
+
+
+def _regime_path(rng, n):
+    cumulative = TRANSITIONS.cumsum(axis=1)
+    draws = rng.random(n)
+    path = np.empty(n, dtype=np.int64)
+    state = 0
+    for t in range(n):
+        path[t] = state
+        state = min(int(np.searchsorted(cumulative[state], draws[t], side="right")), len(REGIMES) - 1)
+    return path
+
+
+# Generate and store the given symbols one at a time; returns the number of bars written
+def _write_symbols(universe, timeframe, symbol_list):
+    count = 0
+    for symbol in symbol_list:
+        df = universe.bars(symbol, timeframe)
+        bar_store.write_store(symbol, timeframe, df, universe.coverage())
+        count += len(df)
+    return count
+
+
+# Stream a universe into the bar store, max_workers processes each taking every max_workers-th symbol
+def write(universe, timeframe, symbol_list, max_workers=None):
+    max_workers = max_workers or os.cpu_count() or 1
+    if max_workers == 1:
+        return _write_symbols(universe, timeframe, symbol_list)
+    with concurrent.futures.ProcessPoolExecutor(max_workers=max_workers) as executor:
+        futures = [executor.submit(_write_symbols, universe, timeframe, symbol_list[k::max_workers])
+                   for k in range(max_workers)]
+        return sum(future.result() for future in futures)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 5 or sys.argv[1] not in ("daily", "minute"):
+        sys.exit("usage: python -m market_data.synthetic daily|minute <symbols> <start> <end> [seed]")
+    timeframe = TimeFrame.Day if sys.argv[1] == "daily" else TimeFrame.Minute
+    universe = Universe(sys.argv[3], sys.argv[4], seed=int(sys.argv[5]) if len(sys.argv) > 5 else 0)
+    symbol_list = symbols(int(sys.argv[2])) + [universe.index_symbol]
+
+    t0 = time.perf_counter()
+    count = write(universe, timeframe, symbol_list)
+    elapsed = time.perf_counter() - t0
+    print(f"{count:,} {timeframe} bars for {len(symbol_list)} symbols in {elapsed:.1f}s "
+          f"({count / elapsed * 60 / 1e6:.1f}M bars/min) -> {os.path.join(bar_store.STORE_DIR, str(timeframe))}")
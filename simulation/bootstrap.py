@@ -0,0 +1,127 @@
+# bootstrap.py
+
+# Robustness view of a finished run from its trade log alone (no re-simulation): the trades' PnL
+# is resampled with replacement ("resample") or reshuffled ("permute") into thousands of
+# alternative sequences, and each path's final capital, max drawdown and longest losing streak
+# are computed by stepping through the trade positions with one array operation across all paths.
+# Drawdown here is measured trade to trade on closed PnL, not on the engine's daily marks.
+#
+# python -m simulation.bootstrap trades.csv [paths] [initial_capital]
+
+import csv
+import sys
+
+import numpy as np
+
+from simulation import sweep
+
+
+METHODS = ("resample", "permute")
+
+
+def trade_pnls(trade_log):
+    return np.array([float(trade["PnL"]) for trade in trade_log], dtype=np.float64)
+
+
+# Trade rows from a save_trades_to_csv file: the CSV block between the description lines and the summary.
+# The table ends at the first row that isn't a trade (another field count, or no PnL): BIBO9 writes its
+# description lines again straight after the trades, with no blank line in between.
+def read_trade_csv(path):
+    with open(path, newline="", encoding="utf-8") as f:
+        lines = f.read().splitlines()
+    start = next(i for i, line in enumerate(lines) if line.startswith("Symbol,") or ",PnL" in line)
+    rows = csv.reader(lines[start:])
+    header = next(rows)
+    pnl = header.index("PnL")
+    trades = []
+    for row in rows:
+        if len(row) != len(header) or not row[pnl].strip():
+            break
+        trades.append(dict(zip(header, row)))
+    return trades
+
+
+# Walk every path forward one trade at a time, each step one array operation across all paths:
+# columns yields the next trade's PnL for each path. Only per-path running state is kept
+# (equity, peak, worst equity/peak ratio, current and longest losing run), never the equity curves.
+def walk(columns, rows, initial_capital):
+    equity = np.full(rows, float(initial_capital))
+    peak = equity.copy()
+    worst = np.ones(rows)
+    ratio = np.empty(rows)
+    losing = np.empty(rows, dtype=bool)
+    run = np.zeros(rows, dtype=np.int64)
+    longest = np.zeros(rows, dtype=np.int64)
+    for pnl in columns:
+        equity += pnl
+        np.maximum(peak, equity, out=peak)
+        np.divide(equity, peak, out=ratio)
+        np.minimum(worst, ratio, out=worst)
+        np.less(pnl, 0, out=losing)
+        run += 1
+        run *= losing
+        np.maximum(longest, run, out=longest)
+    return equity, (1 - worst) * 100, longest
+
+
+# Per-path final capital, max drawdown (%) and longest losing streak for `paths` reorderings of pnls.
+# resample draws each trade position for all paths at once, so memory is a few arrays of `paths`.
+# permute builds chunk_size full permutations at a time (a chunk_size x trades block).
+def bootstrap(pnls, initial_capital, paths=10_000, method="resample", seed=0, chunk_size=4096):
+    if method not in METHODS:
+        raise ValueError(f"unknown method {method!r}, expected one of {METHODS}")
+    pnls = np.asarray(pnls, dtype=np.float64)
+    n = len(pnls)
+    rng = np.random.default_rng(seed)
+
+    if method == "resample":
+        columns = (pnls[rng.integers(0, n, size=paths)] for _ in range(n))
+        final_capital, max_drawdown, losing_streak = walk(columns, paths, initial_capital)
+    else:
+        final_capital = np.empty(paths)
+        max_drawdown = np.empty(paths)
+        losing_streak = np.empty(paths, dtype=np.int64)
+        for start in range(0, paths, chunk_size):
+            rows = min(chunk_size, paths - start)
+            # one independent shuffle per path, each shuffled in place along its own contiguous row
+            # (about twice as fast as shuffling the columns of a trades x rows block); the walk then
+            # steps down the block's columns
+            block = np.tile(pnls, (rows, 1))
+            rng.permuted(block, axis=1, out=block)
+            chunk = slice(start, start + rows)
+            final_capital[chunk], max_drawdown[chunk], losing_streak[chunk] = walk(block.T, rows, initial_capital)
+
+    return {"final_capital": final_capital, "max_drawdown_pct": max_drawdown, "longest_losing_streak": losing_streak}
+
+
+# The same three measures for the trades in the order they actually happened
+def observed(pnls, initial_capital):
+    pnls = np.asarray(pnls, dtype=np.float64)
+    final_capital, max_drawdown, losing_streak = walk(pnls[:, None], 1, initial_capital)
+    return {"final_capital": float(final_capital[0]), "max_drawdown_pct": float(max_drawdown[0]),
+            "longest_losing_streak": int(losing_streak[0])}
+
+
+def summarize(results):
+    return {name: sweep.distribution(values) for name, values in results.items()}
+
+
+def print_summary(results, actual=None):
+    for name, stats in summarize(results).items():
+        sweep.print_distribution(name, stats)
+        if actual is not None:
+            below = float((results[name] < actual[name]).mean() * 100)
+            print(f"    observed {actual[name]:.2f} ({below:.1f}% of paths below)")
+
+
+if __name__ == "__main__":
+    path = sys.argv[1]
+    paths = int(sys.argv[2]) if len(sys.argv) > 2 else 10_000
+    initial_capital = float(sys.argv[3]) if len(sys.argv) > 3 else 10000.0
+
+    pnls = trade_pnls(read_trade_csv(path))
+    print(f"{len(pnls)} trades from {path}, {paths} paths, initial capital {initial_capital:.2f}")
+    actual = observed(pnls, initial_capital)
+    for method in METHODS:
+        print(f"\n{method}:")
+        print_summary(bootstrap(pnls, initial_capital, paths=paths, method=method), actual)
@@ -0,0 +1,82 @@
+# bracket_grid.py
+
+# Exits for a whole grid of ATR brackets at once. A BIBO signal's exit depends only on its entry and
+# its stop/target levels, never on capital, so every signal in the date range is resolved against
+# every (sl_multiple, tp_multiple) pair up front: the levels form a (signals x brackets) matrix that
+# goes through exits.first_touch as one flattened batch. A parameter set is then replayed through
+# engine.simulate with an exit_rule that only looks its positions up, so sizing, capital and the
+# skipped signals come out exactly as in a full run.
+
+import numpy as np
+
+from simulation import exits
+
+
+class BracketGrid:
+
+    # brackets: (sl_multiple, tp_multiple) pairs; entry_markup as for engine.atr_bracket
+    def __init__(self, market_data, signal_calendar, dates, brackets, entry_markup=None, trading_calendar=None):
+        self.schedule = exits.ExitSchedule(market_data, trading_calendar)
+        self.brackets = {bracket: b for b, bracket in enumerate(dict.fromkeys(brackets))}
+        date_pos = self.schedule.panel.date_pos
+        symbol_pos = self.schedule.symbol_pos
+
+        keys, s, d, close, atr = [], [], [], [], []
+        for date in dates:
+            for symbol, signal in signal_calendar.get(date, {}).items():
+                keys.append((date, symbol))
+                s.append(symbol_pos[symbol])
+                d.append(date_pos[date])
+                close.append(signal["close"])
+                atr.append(signal["ATR14"])
+        self.rows = {key: k for k, key in enumerate(keys)}
+        self.symbol = np.array(s, dtype=np.int64)
+
+        sl = np.array([bracket[0] for bracket in self.brackets], dtype=np.float64)
+        tp = np.array([bracket[1] for bracket in self.brackets], dtype=np.float64)
+        entry = np.array(close, dtype=np.float64)
+        if entry_markup is not None:
+            entry = entry * entry_markup
+        atr = np.array(atr, dtype=np.float64)
+        # the engine stores the level rounded to cents (numpy rounding, see engine.round2) on the position,
+        # and ExitSchedule tests against that
+        self.stop_loss = np.round(entry[:, None] - sl[None, :] * atr[:, None], 2)
+        self.take_profit = np.round(entry[:, None] + tp[None, :] * atr[:, None], 2)
+        shape = self.stop_loss.shape
+
+        d = np.array(d, dtype=np.int64)
+        exit_index, outcome = self.schedule.touch(np.repeat(self.symbol, shape[1]), np.repeat(d, shape[1]),
+                                                  self.stop_loss.ravel(), self.take_profit.ravel())
+        self.exit_index = exit_index.reshape(shape)
+        self.outcome = outcome.reshape(shape)
+        self.exit_dates = {}
+
+    def __len__(self):
+        return len(self.rows)
+
+    # engine exit_rule for one bracket: (exit_date, exit_price, outcome) or None per position
+    def exit_rule(self, sl_multiple, tp_multiple):
+        b = self.brackets[(sl_multiple, tp_multiple)]
+
+        def exit_rule(positions):
+            resolved = []
+            for position in positions:
+                k = self.rows[(position["EntryDate"], position["Symbol"])]
+                hit = int(self.outcome[k, b])
+                if hit == exits.STOPPED:
+                    price = position["StopLoss"]
+                elif hit == exits.TARGET:
+                    price = position["TakeProfit"]
+                else:
+                    resolved.append(None)
+                    continue
+                resolved.append((self._exit_date(k, int(self.exit_index[k, b])), price, exits.OUTCOMES[hit]))
+            return resolved
+        return exit_rule
+
+    # Timestamps are looked up once per exit bar; the replays of a grid keep asking for the same ones
+    def _exit_date(self, k, exit_index):
+        exit_date = self.exit_dates.get(exit_index)
+        if exit_date is None:
+            exit_date = self.exit_dates[exit_index] = self.schedule.exit_date(int(self.symbol[k]), exit_index)
+        return exit_date
@@ -0,0 +1,164 @@
+# engine.py
+
+# The daily portfolio loop shared by the BIBO backtests. Each script supplies the parts that
+# differed between its copies of simulate_market:
+#   entry_rule(symbol, signal, capital, available_capital) -> (entry_price, stop_loss, take_profit,
+#       position_size) or None, for one of the day's signals
+#   exit_rule(positions) -> [(exit_date, exit_price, outcome) or None], resolving the day's new
+#       positions in one call (exits.ExitSchedule(market_data).resolve)
+#   order(current_date, signals) -> the symbols of the day's {symbol: signal} to consider, in order
+#       (one of the ordering policies)
+# Positions live in a PositionBook and exits are filed under their exit date, so a day only touches
+# the positions that close on it; capital, available capital and drawdown have one code path.
+
+import math
+from collections import namedtuple
+
+import numpy as np
+
+from simulation import ordering
+
+
+# Columns added to a position when it closes, in trade-log (CSV) order
+CLOSE_COLUMNS = ("ExitPrice", "Outcome", "PnL", "BarsHeld")
+
+Result = namedtuple("Result", ["trade_log", "initial_capital", "capital", "max_drawdown_pct",
+                               "signals_total", "signals_taken", "open_positions"])
+
+
+# Open positions by id (ids increase in opening order, so iteration is opening order) with a
+# per-symbol count, so membership checks are a dict lookup instead of a scan of every position
+class PositionBook:
+
+    def __init__(self):
+        self.positions = {}
+        self.symbols = {}
+        self.next_id = 0
+
+    def open(self, position):
+        position_id = self.next_id
+        self.next_id += 1
+        self.positions[position_id] = position
+        self.symbols[position["Symbol"]] = self.symbols.get(position["Symbol"], 0) + 1
+        return position_id
+
+    def close(self, position_id):
+        position = self.positions.pop(position_id)
+        symbol = position["Symbol"]
+        self.symbols[symbol] -= 1
+        if not self.symbols[symbol]:
+            del self.symbols[symbol]
+        return position
+
+    def holds(self, symbol):
+        return symbol in self.symbols
+
+    def __len__(self):
+        return len(self.positions)
+
+    def __iter__(self):
+        return iter(self.positions.values())
+
+
+# round(value, 2) for the float64 values positions are built from, the way numpy scalars round
+# (value * 100, half to even, / 100) but without the numpy scalar __round__, which dominated the
+# loop. Anything else (whole-share ints, plain floats) goes through round() as before.
+def round2(value):
+    if type(value) is np.float64:
+        scaled = float(value) * 100.0
+        if math.isfinite(scaled):
+            rounded = round(scaled) / 100.0
+            return np.float64(rounded if rounded else math.copysign(0.0, value))
+    return round(value, 2)
+
+
+# entry_rule for the BIBO bracket: stop and target at ATR multiples from the entry, risking
+# risk_perc of capital (or of available capital) per trade. entry_markup scales the signal close
+# into the fill price; whole_shares floors the position size.
+def atr_bracket(sl_multiple, tp_multiple, risk_perc, entry_markup=None, risk_available=False, whole_shares=False):
+    def entry_rule(symbol, signal, capital, available_capital):
+        entry_price = signal["close"] if entry_markup is None else signal["close"] * entry_markup
+        atr = signal["ATR14"]
+        stop_loss = entry_price - sl_multiple * atr
+        take_profit = entry_price + tp_multiple * atr
+        risk = risk_perc * (available_capital if risk_available else capital)
+        diff = entry_price - stop_loss
+        if diff <= 0:
+            return entry_price, stop_loss, take_profit, 0
+        position_size = math.floor(risk / diff) if whole_shares else risk / diff
+        return entry_price, stop_loss, take_profit, position_size
+    return entry_rule
+
+
+# Run the daily loop over dates. one_per_symbol skips a signal while a position in that symbol is open
+# (BIBO11). It is off by default because the other scripts' check, position.get("symbol") against
+# positions keyed "Symbol", never matched, so their results come from letting positions stack.
+# verbose prints the signal/opening lines some of the scripts print.
+def simulate(signal_calendar, dates, entry_rule, exit_rule, initial_capital=10000, order=ordering.calendar,
+             one_per_symbol=False, verbose=False, close_columns=CLOSE_COLUMNS):
+    available_capital = capital = initial_capital
+    signals_total = 0
+    signals_taken = 0
+    book = PositionBook()
+    exits_by_date = {}
+    trade_log = []
+    peak = capital
+    max_drawdown = 0
+
+    for current_date in dates:
+        # Close trades, in the order they were opened
+        for position_id, exit_price, outcome in sorted(exits_by_date.pop(current_date, ())):
+            trade = book.close(position_id)
+
+            pnl = round2((exit_price - trade["EntryPrice"]) * trade["PositionSize"])
+            bars_held = (current_date - trade["EntryDate"]).days
+            capital += pnl
+            available_capital += ((trade["PositionSize"] * trade["EntryPrice"]) + pnl)
+
+            closed = {"ExitPrice": round2(exit_price), "Outcome": outcome, "PnL": pnl, "BarsHeld": bars_held}
+            trade_log.append({**trade, **{column: closed[column] for column in close_columns}})
+
+        # Open new trades
+        signals = signal_calendar.get(current_date, {})
+        opened = []
+        for symbol in order(current_date, signals):
+            if one_per_symbol and book.holds(symbol):
+                continue
+
+            if verbose:
+                print(f"signal found in {symbol}")
+            signals_total += 1
+
+            entry = entry_rule(symbol, signals[symbol], capital, available_capital)
+            if entry is None:
+                continue
+            entry_price, stop_loss, take_profit, position_size = entry
+            required_capital = position_size * entry_price
+
+            if required_capital <= available_capital and position_size > 0:
+                if verbose:
+                    print(f"opening a position in {symbol} @ {entry_price} -- portfolio = {capital}")
+                available_capital -= required_capital
+                signals_taken += 1
+                position = {
+                    "Symbol": symbol,
+                    "EntryDate": current_date,
+                    "EntryPrice": round2(entry_price),
+                    "StopLoss": round2(stop_loss),
+                    "TakeProfit": round2(take_profit),
+                    "PositionSize": round2(position_size)
+                }
+                opened.append((book.open(position), position))
+
+        # resolve today's entries up front; positions that never exit simply stay in the book
+        for (position_id, _), exit in zip(opened, exit_rule([position for _, position in opened])):
+            if exit is not None:
+                exit_date, exit_price, outcome = exit
+                exits_by_date.setdefault(exit_date, []).append((position_id, exit_price, outcome))
+
+        if capital > peak:
+            peak = capital
+        drawdown = (peak - capital) / peak
+        max_drawdown = max(max_drawdown, drawdown)
+
+    return Result(trade_log, initial_capital, capital, max_drawdown * 100, signals_total, signals_taken, list(book))
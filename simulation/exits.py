@@ -0,0 +1,106 @@
+# exits.py
+
+import numpy as np
+
+from simulation.panel import Panel
+
+
+STOPPED = 1
+TARGET = 2
+OUTCOMES = {STOPPED: "Stopped Out", TARGET: "Target Hit"}
+
+
+# First bar after each entry where low <= stop_loss or high >= take_profit, for many trades at once.
+# The search starts at entry_index + 1 and stops before end_index (default: end of the arrays).
+# Returns (exit_index, outcome): exit_index is -1 and outcome 0 when neither level is touched.
+# When both levels are touched on the same bar the stop wins, as in the bar-by-bar loops.
+# Pending trades are checked a window of bars at a time (argmax over a (trades, window) hit
+# matrix); the window doubles each round so long holds only cost a few passes.
+def first_touch(low, high, entry_index, stop_loss, take_profit, end_index=None, window=16, max_window=1024):
+    low = np.asarray(low, dtype=np.float64)
+    high = np.asarray(high, dtype=np.float64)
+    stop_loss = np.asarray(stop_loss, dtype=np.float64)
+    take_profit = np.asarray(take_profit, dtype=np.float64)
+    start = np.asarray(entry_index, dtype=np.int64) + 1
+    n = len(start)
+    end = np.full(n, len(low), dtype=np.int64) if end_index is None else np.asarray(end_index, dtype=np.int64)
+
+    exit_index = np.full(n, -1, dtype=np.int64)
+    outcome = np.zeros(n, dtype=np.int8)
+    if not len(low):
+        return exit_index, outcome
+
+    pending = np.flatnonzero(start < end)
+    while pending.size:
+        pos = start[pending, None] + np.arange(window)[None, :]
+        valid = pos < end[pending, None]
+        pos = np.minimum(pos, len(low) - 1)
+
+        stop_hit = valid & (low[pos] <= stop_loss[pending, None])
+        target_hit = valid & (high[pos] >= take_profit[pending, None])
+        hit = stop_hit | target_hit
+        found = hit.any(axis=1)
+        first = hit.argmax(axis=1)
+
+        rows = pending[found]
+        exit_index[rows] = start[rows] + first[found]
+        outcome[rows] = np.where(stop_hit[found, first[found]], STOPPED, TARGET)
+
+        start[pending] += window
+        pending = pending[~found & (start[pending] < end[pending])]
+        window = min(window * 2, max_window)
+
+    return exit_index, outcome
+
+
+# Exit of a single bracket trade on one symbol's frame, in the shape simulate_trade reports it:
+# (outcome, exit_price, bars_held). A trade that never touches either level expires at the last close.
+def resolve_bracket(df, signal_index, stop_loss, take_profit):
+    exit_index, outcome = first_touch(df["low"].to_numpy(), df["high"].to_numpy(),
+                                      [signal_index], [stop_loss], [take_profit])
+    if outcome[0] == STOPPED:
+        return OUTCOMES[STOPPED], stop_loss, int(exit_index[0]) - signal_index
+    if outcome[0] == TARGET:
+        return OUTCOMES[TARGET], take_profit, int(exit_index[0]) - signal_index
+    return "Expired", df.iloc[-1]["close"], max(len(df) - 1 - signal_index, 0)
+
+
+# Exit dates for the positions simulate_market opens, resolved in a batch (engine.simulate calls
+# resolve with each day's new trades) instead of looking up every open position's bar with df.loc.
+# StopLoss/TakeProfit are the rounded levels stored on the trade, the same ones the old daily
+# check compared against.
+class ExitSchedule:
+
+    def __init__(self, market_data, trading_calendar=None):
+        self.panel = Panel(market_data, fields=["low", "high"], trading_calendar=trading_calendar)
+        self.symbol_pos = self.panel.trading_calendar.symbol_pos
+        self.indexes = [market_data[symbol].index for symbol in self.panel.symbols]
+
+    # (exit_date, exit_price, outcome) for each trade, or None when it never touches either level
+    def resolve(self, trades):
+        if not trades:
+            return []
+
+        s = np.array([self.symbol_pos[t["Symbol"]] for t in trades], dtype=np.int64)
+        d = np.array([self.panel.date_pos[t["EntryDate"]] for t in trades], dtype=np.int64)
+        exit_index, outcome = self.touch(s, d, [t["StopLoss"] for t in trades], [t["TakeProfit"] for t in trades])
+
+        resolved = []
+        for trade, sym, idx, hit in zip(trades, s.tolist(), exit_index.tolist(), outcome.tolist()):
+            if hit == STOPPED:
+                resolved.append((self.exit_date(sym, idx), trade["StopLoss"], OUTCOMES[hit]))
+            elif hit == TARGET:
+                resolved.append((self.exit_date(sym, idx), trade["TakeProfit"], OUTCOMES[hit]))
+            else:
+                resolved.append(None)
+        return resolved
+
+    # first_touch for trades entered on calendar positions (symbol s, session d): exit_index is a
+    # flat panel index (see exit_date), -1 when neither level is touched before the symbol's data ends
+    def touch(self, s, d, stop_loss, take_profit):
+        offsets = self.panel.offsets[s]
+        return first_touch(self.panel.flat["low"], self.panel.flat["high"], offsets + self.panel.row[d, s],
+                           stop_loss, take_profit, end_index=offsets + self.panel.lengths[s])
+
+    def exit_date(self, s, exit_index):
+        return self.indexes[s][exit_index - self.panel.offsets[s]]
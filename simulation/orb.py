@@ -0,0 +1,70 @@
+# orb.py
+
+# Opening-range breakout over one symbol's minute frame, resolved for every day at once.
+# The frame is split into day segments once (integer offsets on its local dates) instead of
+# filtering the whole frame by date for each business day, and each day's opening range,
+# breakout bar and stop/target exit come out of a few array passes over all segments.
+
+from collections import namedtuple
+
+import numpy as np
+
+from simulation import exits
+
+
+OPENING_BARS = 15
+
+# One day's breakout: bar indexes into the frame, levels as the ORB1 loop computed them.
+# outcome is exits.STOPPED / exits.TARGET, or 0 with exit_index -1 when neither level is hit that day.
+Setup = namedtuple("Setup", ["entry_index", "entry", "stop", "target", "range", "exit_index", "outcome", "exit_price"])
+
+
+class OrbDays:
+
+    def __init__(self, df, opening_bars=OPENING_BARS):
+        self.index = df.index
+        high = df["high"].to_numpy(dtype=np.float64)
+        low = df["low"].to_numpy(dtype=np.float64)
+
+        # local calendar date of each bar (the index is already in the session's timezone)
+        days = df.index.tz_localize(None).to_numpy().astype("datetime64[D]")
+        self.segments = {}
+        self.setups = {}
+        if not len(days):
+            return
+        starts = np.flatnonzero(np.r_[True, days[1:] != days[:-1]])
+        ends = np.r_[starts[1:], len(days)]
+        self.segments = {day: (int(a), int(b)) for day, a, b in zip(days[starts].tolist(), starts, ends)}
+
+        traded = np.flatnonzero(ends - starts > opening_bars)
+        if not len(traded):
+            return
+        starts, ends = starts[traded], ends[traded]
+
+        # opening range over each day's first bars: reduceat over [start, start + opening_bars) pairs
+        bounds = np.column_stack([starts, starts + opening_bars]).ravel()
+        range_high = np.maximum.reduceat(high, bounds)[::2]
+        range_low = np.minimum.reduceat(low, bounds)[::2]
+
+        # breakout = first bar after the range whose high is strictly above it; first_touch's target test
+        # is high >= level, so the level is nudged to the next float above the range high
+        no_stop = np.full(len(starts), -np.inf)
+        entry_index, found = exits.first_touch(low, high, starts + opening_bars - 1, no_stop,
+                                               np.nextafter(range_high, np.inf), end_index=ends)
+        found = found == exits.TARGET
+
+        entry = range_high[found]
+        rng = np.round(range_high[found] - range_low[found], 2)
+        stop = entry - (rng / 4)
+        target = entry + rng
+        exit_index, outcome = exits.first_touch(low, high, entry_index[found], stop, target, end_index=ends[found])
+
+        for k, day in enumerate(days[starts[found]].tolist()):
+            hit = outcome[k]
+            exit_price = stop[k] if hit == exits.STOPPED else target[k] if hit == exits.TARGET else None
+            self.setups[day] = Setup(int(entry_index[found][k]), entry[k], stop[k], target[k], rng[k],
+                                     int(exit_index[k]), int(hit), exit_price)
+
+    # The breakout for a date (datetime.date), or None when the day has no bars, too few bars or no breakout
+    def setup(self, day):
+        return self.setups.get(day)
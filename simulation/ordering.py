@@ -0,0 +1,98 @@
+# ordering.py
+
+# Policies for the order in which engine.simulate considers a day's signals. The order decides
+# which signals still find capital, so an unseeded shuffle makes every run different. Each policy
+# is an order(current_date, signals) callable returning the day's symbols; all of them are
+# deterministic given their inputs (and seed), so two runs can be compared trade for trade.
+
+import random
+
+import numpy as np
+
+
+ORDERINGS = ("calendar", "random", "dollar_volume", "signal_strength")
+
+# Dollar-volume rank window, as the live runner's warm-up (config.RANK_DAYS)
+RANK_DAYS = 20
+
+
+# The day's signals in the order the signal calendar lists them (market_data order)
+def calendar(current_date, signals):
+    return list(signals)
+
+
+# Every symbol shuffled each day with rng (even on days without signals, so the stream matches the
+# scripts' random.shuffle(list(market_data.items()))), then narrowed to the day's signals
+def shuffled(symbols, rng):
+    symbols = list(symbols)
+
+    def order(current_date, signals):
+        items = list(symbols)
+        rng.shuffle(items)
+        return [symbol for symbol in items if symbol in signals]
+    return order
+
+
+def seeded(symbols, seed):
+    return shuffled(symbols, random.Random(seed))
+
+
+# Highest average dollar volume (close * volume over the `window` bars before the signal bar) first,
+# the ranking the live runner uses to pick its symbols. Symbols without enough history go last.
+def by_dollar_volume(market_data, trading_days, window=RANK_DAYS):
+    ranks = np.full(trading_days.row.shape, np.nan)
+    for s, symbol in enumerate(trading_days.symbols):
+        df = market_data[symbol]
+        if not len(df):
+            continue
+        values = (df["close"] * df["volume"]).rolling(window).mean().shift(1).to_numpy(dtype=np.float64)
+        rows = trading_days.row[:, s]
+        have = rows >= 0
+        ranks[have, s] = values[rows[have]]
+
+    def order(current_date, signals):
+        day = ranks[trading_days.position[current_date]]
+        return sorted(signals, key=lambda symbol: _descending(day[trading_days.symbol_pos[symbol]]))
+    return order
+
+
+# BIBO breakout strength: how far the close cleared SMA50, in ATRs
+def breakout_strength(signal):
+    return (signal["close"] - signal["SMA50"]) / signal["ATR14"]
+
+
+# Strongest signal first by strength(signal); ties keep calendar order
+def by_signal_strength(strength=breakout_strength):
+    def order(current_date, signals):
+        return sorted(signals, key=lambda symbol: _descending(strength(signals[symbol])))
+    return order
+
+
+def _descending(value):
+    return (True, 0.0) if value is None or np.isnan(value) else (False, -value)
+
+
+# The first answer order gives for each date, replayed on every later call: runs over the same signal
+# calendar all see one ordering (the parameter sets of a batched grid share it). A shuffled policy
+# still draws once per date in date order, so the first run matches a fresh policy's run exactly.
+def memoized(order):
+    orders = {}
+
+    def replay(current_date, signals):
+        if current_date not in orders:
+            orders[current_date] = order(current_date, signals)
+        return orders[current_date]
+    return replay
+
+
+# Policy by name, for scripts that pick their ordering with a setting
+def make(name, market_data, trading_days=None, seed=0):
+    if name == "calendar":
+        return calendar
+    if name == "random":
+        return seeded(market_data, seed)
+    if name == "dollar_volume":
+        return by_dollar_volume(market_data, trading_days)
+    if name == "signal_strength":
+        return by_signal_strength()
+    raise ValueError(f"unknown ordering {name!r}, expected one of {ORDERINGS}")
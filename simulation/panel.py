@@ -0,0 +1,120 @@
+# panel.py
+
+import numpy as np
+
+from simulation.trading_calendar import TradingCalendar
+
+
+PANEL_FIELDS = ["open", "high", "low", "close", "SMA50", "SMA100", "SMA150", "ATR14"]
+
+
+# Dates x symbols view over a market_data dict ({symbol: indicator frame}).
+# Each symbol's columns are concatenated into one flat array; row[d, s] is the symbol's own
+# row number on panel date d (-1 when it has no bar), so "yesterday" means the symbol's
+# previous bar exactly like df.iloc[idx - 1], even across gaps in its history.
+# Dates and rows come from a TradingCalendar, which can be shared between panels over the same data.
+class Panel:
+
+    def __init__(self, market_data, fields=PANEL_FIELDS, trading_calendar=None):
+        self.trading_calendar = trading_calendar if trading_calendar is not None else TradingCalendar(market_data)
+        self.symbols = self.trading_calendar.symbols
+        self.fields = list(fields)
+        frames = [market_data[symbol] for symbol in self.symbols]
+
+        self.dates = self.trading_calendar.sessions
+        self.row = self.trading_calendar.row
+        self.date_pos = self.trading_calendar.position
+
+        self.lengths = np.array([len(df) for df in frames], dtype=np.int64)
+        self.offsets = np.concatenate([[0], np.cumsum(self.lengths)[:-1]]).astype(np.int64)
+
+        self.flat = {}
+        for field in self.fields:
+            parts = [df[field].to_numpy(dtype=np.float64) for df in frames if field in df]
+            self.flat[field] = np.concatenate(parts) if parts else np.empty(0)
+
+    @property
+    def shape(self):
+        return self.row.shape
+
+    # (dates, symbols) matrix of `name` taken `lag` rows back in each symbol's own history
+    def field(self, name, lag=0):
+        flat = self.flat[name]
+        rows = self.row - lag
+        valid = (self.row >= 0) & (rows >= 0)
+        if not flat.size:
+            return np.full(self.shape, np.nan)
+        idx = np.where(valid, self.offsets[None, :] + rows, 0)
+        return np.where(valid, flat[idx], np.nan)
+
+    # (dates, symbols) matrix of a benchmark column (e.g. SPY).
+    # align="row" reproduces find_signal_today's spy.iloc[idx], i.e. the benchmark row with the
+    # same row number as the symbol's bar; align="date" uses the benchmark bar on the same date.
+    def benchmark(self, df, name, lag=0, align="row"):
+        values = df[name].to_numpy(dtype=np.float64)
+        if not values.size:
+            return np.full(self.shape, np.nan)
+        if align == "row":
+            rows = self.row - lag
+            valid = (self.row >= 0) & (rows >= 0) & (rows < len(values))
+        else:
+            pos = df.index.get_indexer(self.dates)[:, None]
+            rows = np.broadcast_to(pos - lag, self.shape)
+            valid = (self.row >= 0) & (pos >= 0) & (rows >= 0)
+        idx = np.where(valid, rows, 0)
+        return np.where(valid, values[idx], np.nan)
+
+    # Sparse {date: {symbol: {field: value}}} for every True cell of a (dates, symbols) mask,
+    # symbols kept in market_data order
+    def calendar(self, mask):
+        calendar = {}
+        d_idx, s_idx = np.nonzero(mask)
+        if not len(d_idx):
+            return calendar
+
+        flat_idx = self.offsets[s_idx] + self.row[d_idx, s_idx]
+        values = {field: self.flat[field][flat_idx] for field in self.fields}
+        for k, (d, s) in enumerate(zip(d_idx.tolist(), s_idx.tolist())):
+            day = calendar.setdefault(self.dates[d], {})
+            day[self.symbols[s]] = {field: values[field][k] for field in self.fields}
+        return calendar
+
+
+# BIBO entry conditions for every (date, symbol) at once:
+#   cond1 SMA50 > SMA100 > SMA150            cond4 green candle
+#   cond2 yesterday's low < SMA50 < close    cond5 SPY close > SPY SMA150
+#   cond3 close above yesterday's close      cond6 20-bar return beats SPY's
+def bibo_signals(panel, spy=None, min_row=151, spy_filter=True, relative_strength=False, spy_align="row"):
+    close = panel.field("close")
+    y_close = panel.field("close", 1)
+    y_low = panel.field("low", 1)
+    y_sma50 = panel.field("SMA50", 1)
+    sma50 = panel.field("SMA50")
+    sma100 = panel.field("SMA100")
+
+    mask = panel.row >= min_row
+    mask &= (sma50 > sma100) & (sma100 > panel.field("SMA150"))
+    mask &= (y_low < y_sma50) & (y_sma50 < y_close)
+    mask &= close > y_close
+    mask &= close > panel.field("open")
+
+    if spy is not None and spy_filter:
+        mask &= panel.benchmark(spy, "close", align=spy_align) > panel.benchmark(spy, "SMA150", align=spy_align)
+
+    if spy is not None and relative_strength:
+        with np.errstate(divide="ignore", invalid="ignore"):
+            stock_change = close / panel.field("close", 20) - 1
+            spy_change = (panel.benchmark(spy, "close", align=spy_align)
+                          / panel.benchmark(spy, "close", 20, align=spy_align) - 1)
+        mask &= (stock_change - spy_change) > 0
+
+    return mask
+
+
+# market_data + SPY -> sparse signal calendar that simulate_market reads day by day
+def bibo_signal_calendar(market_data, spy=None, min_row=151, spy_filter=True, relative_strength=False,
+                         spy_align="row", trading_calendar=None):
+    panel = Panel(market_data, trading_calendar=trading_calendar)
+    mask = bibo_signals(panel, spy, min_row=min_row, spy_filter=spy_filter,
+                        relative_strength=relative_strength, spy_align=spy_align)
+    return panel.calendar(mask)
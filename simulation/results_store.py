@@ -0,0 +1,148 @@
+# results_store.py
+
+# Typed, columnar storage for backtest runs instead of free-text summary CSVs. Every add() writes
+# one batch (e.g. a whole sweep) as two .npz tables, the way the bar store keeps bars:
+#   runs-<batch>.npz    one row per run: run_id, strategy, the run's parameters and summary metrics
+#   trades-<batch>.npz  every run's trade log, one row per trade, tagged with its run_id
+# Each column is a numpy array (float, int, bool, str, or datetime as UTC ns), so reading thousands
+# of runs back is a few array loads and filtering them is a DataFrame.query:
+#
+#   store = ResultsStore()
+#   store.query("win_rate > 20 and total_pnl > 10000")
+#   store.trades(run_ids)
+
+import os
+import threading
+import time
+import uuid
+
+import numpy as np
+import pandas as pd
+
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+RESULTS_DIR = os.getenv("RESULTS_STORE_DIR", os.path.join(BASE_DIR, "results"))
+
+# stored alongside the columns: the column order and which columns hold datetimes (ns on disk;
+# tz-aware ones as UTC)
+_COLUMNS = "__columns__"
+_DATETIMES = "__datetimes__"
+_UTC = "__utc__"
+
+
+# Summary metrics of one run, the figures save_parameter_stats_to_csv wrote as text (percentages in %)
+def summary(trade_log, initial_capital, final_capital, max_drawdown_pct, signals_total, signals_taken):
+    pnl = np.array([trade["PnL"] for trade in trade_log], dtype=np.float64)
+    bars_held = np.array([trade["BarsHeld"] for trade in trade_log], dtype=np.float64)
+    num_trades = len(trade_log)
+    return {
+        "initial_capital": float(initial_capital),
+        "final_capital": float(final_capital),
+        "trades": num_trades,
+        "total_pnl": float(pnl.sum()),
+        "win_rate": float((pnl > 0).mean() * 100) if num_trades else 0.0,
+        "avg_pnl": float(pnl.mean()) if num_trades else 0.0,
+        "avg_bars_held": float(bars_held.mean()) if num_trades else 0.0,
+        "pct_change": (final_capital - initial_capital) / initial_capital * 100,
+        "max_drawdown_pct": float(max_drawdown_pct),
+        "signals_total": int(signals_total),
+        "signals_taken": int(signals_taken),
+        "signals_taken_pct": signals_taken / signals_total * 100 if signals_total else 0.0,
+    }
+
+
+class ResultsStore:
+
+    def __init__(self, path=RESULTS_DIR):
+        self.path = path
+
+    # runs: iterable of (params, metrics, trade_log) for one strategy. Returns the new run ids, in order.
+    def add(self, strategy, runs):
+        batch = f"{time.strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:8]}"
+        rows, trades, run_ids = [], [], []
+        for k, (params, metrics, trade_log) in enumerate(runs):
+            run_id = f"{batch}-{k:05d}"
+            run_ids.append(run_id)
+            rows.append({"run_id": run_id, "strategy": strategy, **params, **metrics})
+            trades.extend({"run_id": run_id, **trade} for trade in trade_log)
+
+        os.makedirs(self.path, exist_ok=True)
+        _write(os.path.join(self.path, f"trades-{batch}.npz"), pd.DataFrame(trades))
+        # the runs table goes last, so a batch is only visible once its trades are on disk
+        _write(os.path.join(self.path, f"runs-{batch}.npz"), pd.DataFrame(rows))
+        return run_ids
+
+    def batches(self):
+        if not os.path.isdir(self.path):
+            return []
+        return sorted(name[len("runs-"):-len(".npz")] for name in os.listdir(self.path)
+                      if name.startswith("runs-") and name.endswith(".npz"))
+
+    # Every stored run, one row each, indexed by run_id (batches oldest first)
+    def runs(self, strategy=None):
+        frames = [_read(os.path.join(self.path, f"runs-{batch}.npz")) for batch in self.batches()]
+        frames = [df for df in frames if len(df)]
+        if not frames:
+            return pd.DataFrame(columns=["strategy"], index=pd.Index([], name="run_id"))
+        df = pd.concat(frames, ignore_index=True).set_index("run_id")
+        return df[df["strategy"] == strategy] if strategy is not None else df
+
+    # Runs matching a DataFrame.query expression over the run columns, e.g. "win_rate > 20 and total_pnl > 10000"
+    def query(self, expr, strategy=None):
+        return self.runs(strategy).query(expr)
+
+    # Trade logs of the given runs (all runs when None), one row per trade with its run_id
+    def trades(self, run_ids=None):
+        if run_ids is None:
+            batches = self.batches()
+        else:
+            run_ids = list(run_ids)
+            batches = sorted({run_id.rsplit("-", 1)[0] for run_id in run_ids})
+        frames = [_read(os.path.join(self.path, f"trades-{batch}.npz")) for batch in batches]
+        frames = [df for df in frames if len(df)]
+        if not frames:
+            return pd.DataFrame(columns=["run_id"])
+        df = pd.concat(frames, ignore_index=True)
+        return df[df["run_id"].isin(run_ids)].reset_index(drop=True) if run_ids is not None else df
+
+
+def _write(path, df):
+    columns, datetimes, utc = {}, [], []
+    for name in df.columns:
+        values = df[name]
+        if isinstance(values.dtype, pd.DatetimeTZDtype):
+            utc.append(name)
+            values = values.dt.tz_convert("UTC").dt.tz_localize(None)
+        if values.dtype.kind == "M":
+            datetimes.append(name)
+            columns[name] = values.to_numpy(dtype="datetime64[ns]").astype("int64")
+        elif values.dtype.kind in "biuf":
+            columns[name] = values.to_numpy()
+        else:
+            # object columns (symbols, outcomes, mixed parameters) are stored as text
+            columns[name] = values.astype(str).to_numpy(dtype=str)
+    columns[_COLUMNS] = np.array(list(df.columns), dtype=str)
+    columns[_DATETIMES] = np.array(datetimes, dtype=str)
+    columns[_UTC] = np.array(utc, dtype=str)
+
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp_path, "wb") as f:
+        np.savez(f, **columns)
+    os.replace(tmp_path, path)
+
+
+def _read(path):
+    if not os.path.isfile(path):
+        return pd.DataFrame()
+    with np.load(path) as npz:
+        datetimes = set(npz[_DATETIMES].tolist())
+        utc = set(npz[_UTC].tolist())
+        data = {}
+        for name in npz[_COLUMNS].tolist():
+            values = npz[name]
+            if name in datetimes:
+                values = pd.DatetimeIndex(values.view("datetime64[ns]"))
+                if name in utc:
+                    values = values.tz_localize("UTC")
+            data[name] = values
+    return pd.DataFrame(data)
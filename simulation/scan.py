@@ -0,0 +1,17 @@
+# scan.py
+
+# Cursor-based bar scan. A step gets the full series plus the index of the current bar
+# instead of a freshly copied prefix (data[:i+1]), so a scan over n bars costs O(n)
+# rather than O(n^2). Anything the step reads at index i must only look at [0, i].
+
+
+# Call step(i, state) for every bar from start to length - 1, threading state through
+def scan(step, length, start=0, state=None):
+    for i in range(start, length):
+        state = step(i, state)
+    return state
+
+
+# The n values before index i (fewer near the start); same as values[:i][-n:] without the copy of the prefix
+def lookback(values, i, n):
+    return values[max(0, i - n):i]
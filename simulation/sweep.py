@@ -0,0 +1,193 @@
+# sweep.py
+
+# Parameter sweeps over a ProcessPoolExecutor. The market data is copied once into a
+# multiprocessing SharedMemory block; each worker maps it back into DataFrames when it starts,
+# so tasks only pickle their parameters and results. Every combination gets its own
+# random.Random seeded from (seed, combination index), so a parallel sweep returns exactly
+# what a serial sweep with the same seed does, in combination order.
+
+import concurrent.futures
+import itertools
+import random
+import time
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+
+
+# Frames shared across the pool: {name: DataFrame or {key: DataFrame}} flattened to one buffer.
+# Each frame's float64 columns are stored as one (columns x rows) block so the rebuilt frame is a
+# view of shared memory; other numeric columns are copied out of the buffer on attach and
+# anything non-numeric (e.g. a symbol string column) rides along in the metadata.
+class SharedFrames:
+
+    def __init__(self, data):
+        self.layout = []
+        size = 0
+        for name, key, df in _walk(data):
+            n = len(df)
+            floats = [col for col in df.columns if df[col].dtype == np.float64]
+            others = []
+            for pos, col in enumerate(df.columns):
+                if col in floats:
+                    continue
+                values = df[col].to_numpy()
+                if values.dtype.kind in "biuf":
+                    others.append((pos, col, "shm", size, values.dtype.str))
+                    size += values.nbytes
+                else:
+                    others.append((pos, col, "meta", values.tolist(), None))
+            tz = str(df.index.tz) if getattr(df.index, "tz", None) is not None else None
+            self.layout.append((name, key, n, size, size + n * 8, floats, others, tz, df.index.name))
+            size += n * 8 * (1 + len(floats))
+
+        self.shm = shared_memory.SharedMemory(create=True, size=max(size, 1))
+        for (name, key, df), (_, _, n, index_offset, float_offset, floats, others, _, _) in zip(_walk(data), self.layout):
+            np.ndarray(n, dtype=np.int64, buffer=self.shm.buf, offset=index_offset)[:] = _index_values(df.index)
+            if floats:
+                block = np.ndarray((len(floats), n), dtype=np.float64, buffer=self.shm.buf, offset=float_offset)
+                block[:] = df[floats].to_numpy().T
+            for _, col, where, offset, dtype in others:
+                if where == "shm":
+                    np.ndarray(n, dtype=dtype, buffer=self.shm.buf, offset=offset)[:] = df[col].to_numpy()
+
+        self.meta = {"shm_name": self.shm.name, "layout": self.layout,
+                     "groups": {name: isinstance(frames, dict) for name, frames in data.items()}}
+
+    def close(self):
+        self.shm.close()
+        self.shm.unlink()
+
+
+def _walk(data):
+    for name, frames in data.items():
+        if isinstance(frames, dict):
+            for key, df in frames.items():
+                yield name, key, df
+        else:
+            yield name, None, frames
+
+
+def _index_values(index):
+    if isinstance(index, pd.DatetimeIndex):
+        if index.tz is not None:
+            index = index.tz_convert("UTC").tz_localize(None)
+        return index.as_unit("ns").asi8
+    return np.asarray(index, dtype=np.int64)
+
+
+# Rebuild the {name: frames} structure on top of the shared buffer (the float block is read-only)
+def attach(meta):
+    shm = shared_memory.SharedMemory(name=meta["shm_name"])
+    data = {name: {} if grouped else None for name, grouped in meta["groups"].items()}
+
+    for name, key, n, index_offset, float_offset, floats, others, tz, index_name in meta["layout"]:
+        stamps = np.ndarray(n, dtype=np.int64, buffer=shm.buf, offset=index_offset).view("datetime64[ns]")
+        index = pd.DatetimeIndex(stamps, name=index_name)
+        if tz is not None:
+            index = index.tz_localize("UTC").tz_convert(tz)
+
+        block = np.ndarray((len(floats), n), dtype=np.float64, buffer=shm.buf, offset=float_offset)
+        block.flags.writeable = False
+        df = pd.DataFrame(block.T, index=index, columns=floats, copy=False)
+        # inserting in column order puts every column back at its original position
+        for pos, col, where, value, dtype in others:
+            if where == "shm":
+                value = np.ndarray(n, dtype=dtype, buffer=shm.buf, offset=value)
+            df.insert(pos, col, value)
+
+        if meta["groups"][name]:
+            data[name][key] = df
+        else:
+            data[name] = df
+
+    return data, shm
+
+
+# Combinations of a {param: [values]} grid, in the nested-loop order the scripts use
+def grid(**params):
+    names = list(params)
+    return [dict(zip(names, values)) for values in itertools.product(*params.values())]
+
+
+def combination_rng(seed, i):
+    return random.Random(int(np.random.SeedSequence([seed, i]).generate_state(1)[0]))
+
+
+def print_progress(done, total, elapsed):
+    eta = elapsed / done * (total - done) if done else 0
+    print(f"sweep: {done}/{total} ({done / total * 100:.0f}%) elapsed {elapsed:.1f}s eta {eta:.1f}s")
+
+
+_worker = {}
+
+
+def _init_worker(meta, setup):
+    data, shm = attach(meta)
+    if setup is not None:
+        data.update(setup(data))
+    _worker["data"] = data
+    _worker["shm"] = shm
+
+
+def _run_one(task, params, seed, i):
+    return task(_worker["data"], params, combination_rng(seed, i))
+
+
+# task(data, params, rng) -> result for each params dict in combinations. setup(data) -> dict runs
+# once per process (and once for a serial run) for derived inputs shared by all combinations.
+# max_workers=1 runs serially in-process.
+def run_sweep(task, combinations, data, seed=0, setup=None, max_workers=None, progress=print_progress):
+    combinations = list(combinations)
+    total = len(combinations)
+    results = [None] * total
+    start = time.perf_counter()
+
+    if max_workers == 1:
+        data = dict(data)
+        if setup is not None:
+            data.update(setup(data))
+        for i, params in enumerate(combinations):
+            results[i] = task(data, params, combination_rng(seed, i))
+            if progress:
+                progress(i + 1, total, time.perf_counter() - start)
+        return results
+
+    shared = SharedFrames(data)
+    try:
+        with concurrent.futures.ProcessPoolExecutor(max_workers=max_workers, initializer=_init_worker,
+                                                    initargs=(shared.meta, setup)) as executor:
+            futures = {executor.submit(_run_one, task, params, seed, i): i for i, params in enumerate(combinations)}
+            for done, future in enumerate(concurrent.futures.as_completed(futures), start=1):
+                results[futures[future]] = future.result()
+                if progress:
+                    progress(done, total, time.perf_counter() - start)
+    finally:
+        shared.close()
+
+    return results
+
+
+# Monte-Carlo mode: the same task `runs` times, run i getting combination_rng(seed, i), so a seeded
+# ordering policy built from that rng varies between runs but not between invocations
+def run_seeds(task, data, runs, seed=0, setup=None, max_workers=None, progress=print_progress):
+    return run_sweep(task, [{"run": i} for i in range(runs)], data, seed=seed, setup=setup,
+                     max_workers=max_workers, progress=progress)
+
+
+# Distribution of one result across runs: mean, std, extremes and percentiles
+def distribution(values, percentiles=(5, 25, 50, 75, 95)):
+    values = np.asarray(values, dtype=np.float64)
+    stats = {"runs": len(values), "mean": float(values.mean()),
+             "std": float(values.std(ddof=1)) if len(values) > 1 else 0.0,
+             "min": float(values.min()), "max": float(values.max())}
+    for p, value in zip(percentiles, np.percentile(values, percentiles)):
+        stats[f"p{p}"] = float(value)
+    return stats
+
+
+def print_distribution(name, stats):
+    percentiles = "  ".join(f"{key} {value:.2f}" for key, value in stats.items() if key.startswith("p"))
+    print(f"{name}: mean {stats['mean']:.2f}  std {stats['std']:.2f}  min {stats['min']:.2f}  "
+          f"max {stats['max']:.2f}  {percentiles}  ({stats['runs']} runs)")
@@ -0,0 +1,56 @@
+# trading_calendar.py
+
+# Trading sessions taken from the loaded data instead of pd.date_range(freq='B'): the sorted union
+# of every symbol's bar dates, so exchange holidays never show up as empty days. row[d, s] is
+# symbol s's own row number on session d, -1 when it has no bar that day, so "does this symbol
+# trade today" and "which row is today" are array reads instead of label lookups on each
+# symbol's tz-aware DatetimeIndex.
+
+import numpy as np
+import pandas as pd
+
+
+class TradingCalendar:
+
+    def __init__(self, market_data):
+        self.symbols = list(market_data)
+        self.symbol_pos = {symbol: s for s, symbol in enumerate(self.symbols)}
+        frames = [market_data[symbol] for symbol in self.symbols]
+
+        indexes = [df.index for df in frames if len(df)]
+        self.sessions = indexes[0].append(indexes[1:]).unique().sort_values() if indexes else pd.DatetimeIndex([])
+        self.position = {date: d for d, date in enumerate(self.sessions)}
+
+        self.row = np.full((len(self.sessions), len(self.symbols)), -1, dtype=np.int64)
+        for s, df in enumerate(frames):
+            if len(df):
+                self.row[self.sessions.get_indexer(df.index), s] = np.arange(len(df))
+
+    def __len__(self):
+        return len(self.sessions)
+
+    # Sessions from start to end inclusive. Weekend bars are dropped by default so the result is
+    # exactly the business days of pd.date_range(start, end, freq='B') that have data.
+    def between(self, start, end, weekdays_only=True):
+        start, end = self._stamp(start), self._stamp(end)
+        keep = (self.sessions >= start) & (self.sessions <= end)
+        if weekdays_only:
+            keep &= self.sessions.dayofweek < 5
+        return self.sessions[keep]
+
+    def _stamp(self, value):
+        value = pd.Timestamp(value)
+        if self.sessions.tz is not None and value.tz is None:
+            value = value.tz_localize(self.sessions.tz)
+        return value
+
+    # Row of symbol on date, -1 when the symbol has no bar that session (or the date is not a session)
+    def row_of(self, symbol, date):
+        d = self.position.get(date)
+        if d is None:
+            return -1
+        return int(self.row[d, self.symbol_pos[symbol]])
+
+    # Every session's row for one symbol
+    def rows(self, symbol):
+        return self.row[:, self.symbol_pos[symbol]]
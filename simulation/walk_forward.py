@@ -0,0 +1,124 @@
+# walk_forward.py
+
+# Walk-forward optimization: the period is split into rolling train/test folds, the parameter grid is
+# swept on every train fold, and each fold's best parameters are run on the test fold right after it.
+# The out-of-sample equity curve is the test folds' closed trades stitched end to end.
+#
+# Every run is one sweep task over the same shared data, so anything the scripts' setup derives
+# (indicators, trading calendar, signal calendar) is computed once per worker over the whole range
+# and reused by every fold; a fold only narrows the dates the daily loop walks. All train runs of
+# all folds go to the pool as one sweep. The task receives its window as params["start"] /
+# params["end"] and returns simulate_market's tuple (trade_log, final_capital, max_drawdown_pct, ...).
+
+from collections import namedtuple
+from datetime import timedelta
+
+import numpy as np
+import pandas as pd
+
+from simulation import sweep
+
+
+Fold = namedtuple("Fold", ["train_start", "train_end", "test_start", "test_end"])
+
+WalkForward = namedtuple("WalkForward", ["folds", "best_params", "train_scores", "test_results", "equity"])
+
+
+# Rolling folds over [start, end]: train_months of training followed by test_months of testing,
+# moving forward step_months (default test_months, so the test folds tile the period without gaps).
+# Ends are inclusive days; the last test fold is cut at end.
+def folds(start, end, train_months=24, test_months=6, step_months=None):
+    start, end = pd.Timestamp(start), pd.Timestamp(end)
+    step = pd.DateOffset(months=step_months or test_months)
+    day = pd.Timedelta(days=1)
+    result = []
+    train_start = start
+    while True:
+        test_start = train_start + pd.DateOffset(months=train_months)
+        if test_start > end:
+            break
+        test_end = min(test_start + pd.DateOffset(months=test_months) - day, end)
+        result.append(Fold(train_start, test_start - day, test_start, test_end))
+        train_start += step
+    return result
+
+
+def final_capital(result):
+    return result[1]
+
+
+# Exit date of a closed engine trade (BarsHeld is calendar days from the entry)
+def exit_date(trade):
+    return trade["EntryDate"] + timedelta(days=trade["BarsHeld"])
+
+
+# Out-of-sample capital after each closed test trade. Every test fold is run from the same initial
+# capital (so the folds can run in parallel); the risk is a fraction of capital, so a fold's curve is
+# scaled by the capital the previous folds ended with, i.e. the folds' returns compound.
+def stitch(fold_list, test_results, initial_capital):
+    dates, values = [], []
+    capital = initial_capital
+    for fold, (trade_log, fold_capital, *_) in zip(fold_list, test_results):
+        scale = capital / initial_capital
+        dates.append(_naive(fold.test_start))
+        values.append(capital)
+        equity = initial_capital
+        for trade in sorted(trade_log, key=exit_date):
+            equity += trade["PnL"]
+            dates.append(_naive(exit_date(trade)))
+            values.append(equity * scale)
+        capital = fold_capital * scale
+    return pd.Series(values, index=pd.DatetimeIndex(dates), name="equity", dtype=np.float64)
+
+
+# Session dates come tz-aware from the bar store, fold bounds naive; the curve is indexed by naive dates
+def _naive(stamp):
+    stamp = pd.Timestamp(stamp)
+    return stamp.tz_localize(None) if stamp.tz is not None else stamp
+
+
+def max_drawdown_pct(equity):
+    if not len(equity):
+        return 0.0
+    values = equity.to_numpy(dtype=np.float64)
+    peak = np.maximum.accumulate(values)
+    return float(((peak - values) / peak).max() * 100)
+
+
+# task(data, params, rng) as for sweep.run_sweep, with params = one grid combination plus "start"/"end".
+# score(result) ranks train runs (highest wins, ties go to the earlier combination).
+def run(task, combinations, data, fold_list, initial_capital=10000, score=final_capital, seed=0, setup=None,
+        max_workers=None, progress=sweep.print_progress):
+    combinations = list(combinations)
+    train = [{**params, "start": fold.train_start, "end": fold.train_end}
+             for fold in fold_list for params in combinations]
+    train_results = sweep.run_sweep(task, train, data, seed=seed, setup=setup, max_workers=max_workers,
+                                    progress=progress)
+
+    best_params, train_scores = [], []
+    for f in range(len(fold_list)):
+        scores = [score(result) for result in train_results[f * len(combinations):(f + 1) * len(combinations)]]
+        best = int(np.argmax(scores))
+        best_params.append(combinations[best])
+        train_scores.append(scores[best])
+
+    test = [{**params, "initial_capital": initial_capital, "start": fold.test_start, "end": fold.test_end}
+            for fold, params in zip(fold_list, best_params)]
+    test_results = sweep.run_sweep(task, test, data, seed=seed, setup=setup, max_workers=max_workers,
+                                   progress=progress)
+
+    return WalkForward(fold_list, best_params, train_scores, test_results,
+                       stitch(fold_list, test_results, initial_capital))
+
+
+def print_walk_forward(result, initial_capital=10000):
+    for k, (fold, params, train_score, test) in enumerate(zip(result.folds, result.best_params, result.train_scores,
+                                                               result.test_results)):
+        chosen = ", ".join(f"{name}={value}" for name, value in params.items() if name != "initial_capital")
+        print(f"Fold {k}: train {fold.train_start:%Y-%m-%d}..{fold.train_end:%Y-%m-%d} score {train_score:.2f}  "
+              f"test {fold.test_start:%Y-%m-%d}..{fold.test_end:%Y-%m-%d} return "
+              f"{(test[1] / initial_capital - 1) * 100:.2f}% trades {len(test[0])}  [{chosen}]")
+    equity = result.equity
+    final = equity.iloc[-1] if len(equity) else initial_capital
+    print(f"Out-of-sample: Final Capital: {final:.2f}, Return: {(final / initial_capital - 1) * 100:.2f}%, "
+          f"Max Drawdown: {max_drawdown_pct(equity):.2f}%")
@@ -0,0 +1,37 @@
+# test_bootstrap.py
+
+# simulation.bootstrap on trade logs as the backtests write them: the CSV from BIBO9's own
+# save_trades_to_csv, and the permute mode's per-path shuffles.  Run from the repo root:  pytest tests
+
+import numpy as np
+
+import backtesting.BIBO.BIBO9 as bibo9
+from simulation import bootstrap
+
+
+def _trades():
+    pnls = [120.5, -40.25, 33.0, -12.75, 80.0]
+    return [{"Symbol": symbol, "EntryDate": f"2024-01-0{i + 2}", "EntryPrice": 100.0, "StopLoss": 98.0,
+             "TakeProfit": 106.0, "PositionSize": 10.0, "ExitPrice": 100.0 + pnl / 10, "Outcome": "TP" if pnl > 0 else "SL",
+             "PnL": pnl, "BarsHeld": i + 1}
+            for i, (symbol, pnl) in enumerate(zip(["AAPL", "MSFT", "KO", "XOM", "JPM"], pnls))]
+
+
+# BIBO9 repeats its description lines straight after the trade rows, with no blank line
+def test_reads_bibo9_trade_csv(tmp_path, monkeypatch):
+    trades = _trades()
+    path = tmp_path / "trades.csv"
+    monkeypatch.setattr("builtins.input", lambda prompt="": "1")
+    bibo9.save_trades_to_csv(trades, 10000, 10180.5, 1.2, 8, 5, 3.4, 2.1, str(path))
+
+    rows = bootstrap.read_trade_csv(str(path))
+    assert [row["Symbol"] for row in rows] == [trade["Symbol"] for trade in trades]
+    np.testing.assert_array_equal(bootstrap.trade_pnls(rows), [trade["PnL"] for trade in trades])
+
+
+def test_permute_shuffles_each_path_on_its_own():
+    pnls = np.arange(1.0, 41.0) * np.where(np.arange(40) % 3, 1, -1)
+    results = bootstrap.bootstrap(pnls, 1000, paths=500, method="permute", chunk_size=128)
+    # every path is a reordering: same final capital, but the drawdowns vary from path to path
+    np.testing.assert_allclose(results["final_capital"], 1000 + pnls.sum())
+    assert len(np.unique(results["max_drawdown_pct"])) > 100
@@ -0,0 +1,119 @@
+# test_indicators.py
+
+# Parity of the streaming indicators with the pandas expressions used across the backtests, on a
+# seeded random walk; every streamed indicator is persisted and restored halfway through, as the
+# live runner does overnight.  Run from the repo root:  pytest tests
+
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from algorithm.tradingObjects.indicators import (ADX, ATR, EMA, SMA, BiboIndicators, Swing, rolling_max,
+                                                 rolling_min, swing_levels)
+
+
+N = 2000
+
+
+@pytest.fixture(scope="module")
+def bars():
+    rng = np.random.default_rng(0)
+    close = pd.Series(100 * np.exp(np.cumsum(rng.normal(0, 0.01, N))))
+    high = close * (1 + np.abs(rng.normal(0, 0.005, N)))
+    low = close * (1 - np.abs(rng.normal(0, 0.005, N)))
+    return pd.DataFrame({"high": high, "low": low, "close": close})
+
+
+def _restored(stream):
+    return type(stream).from_dict(json.loads(json.dumps(stream.to_dict())))
+
+
+def _true_range(df):
+    return pd.concat([df["high"] - df["low"], (df["high"] - df["close"].shift()).abs(),
+                      (df["low"] - df["close"].shift()).abs()], axis=1).max(axis=1)
+
+
+def _adx(df, period=14):
+    tr = _true_range(df)
+    delta_high = df["high"].diff()
+    delta_low = -df["low"].diff()
+    plus_dm = ((delta_high > delta_low) & (delta_high > 0)) * delta_high
+    minus_dm = ((delta_low > delta_high) & (delta_low > 0)) * delta_low
+    tr_smooth = tr.rolling(period).sum()
+    plus_di = 100 * plus_dm.rolling(period).sum() / tr_smooth
+    minus_di = 100 * minus_dm.rolling(period).sum() / tr_smooth
+    return (100 * (plus_di - minus_di).abs() / (plus_di + minus_di)).rolling(period).mean()
+
+
+@pytest.mark.parametrize("name, make, expected", [
+    ("SMA50", lambda: SMA(50), lambda df: df["close"].rolling(50).mean()),
+    ("SMA150", lambda: SMA(150), lambda df: df["close"].rolling(150).mean()),
+    ("ATR14", lambda: ATR(14), lambda df: _true_range(df).rolling(14).mean()),
+    ("ADX14", lambda: ADX(14), _adx),
+])
+def test_matches_pandas(bars, name, make, expected):
+    stream = make()
+    got = []
+    for i, (high, low, close) in enumerate(zip(bars["high"], bars["low"], bars["close"])):
+        if i == N // 2:
+            stream = _restored(stream)
+        value = stream.update(close) if isinstance(stream, SMA) else stream.update(high, low, close)
+        got.append(np.nan if value is None else value)
+
+    reference = expected(bars).to_numpy()
+    assert np.isfinite(reference).sum() > N // 2
+    np.testing.assert_allclose(got, reference, rtol=1e-10, atol=1e-10, equal_nan=True)
+
+
+# calculate_ema in backtesting.py seeds with the SMA of the first `period` closes
+def test_ema_matches_calculate_ema(bars):
+    close = bars["close"]
+    k = 2 / 10
+    reference = [None] * 8 + [sum(close[:9]) / 9]
+    for x in close[9:]:
+        reference.append(x * k + reference[-1] * (1 - k))
+
+    ema = EMA(9)
+    assert [ema.update(x) for x in close] == reference
+
+
+# find_recent_swing in fibRetrace4/5: max/min over the 20 bars before the current one
+def test_swing_matches_window_max_min(bars):
+    high, low = bars["high"], bars["low"]
+    reference = np.array([(max(high[i - 20:i]), min(low[i - 20:i])) if i >= 20 else (np.nan, np.nan)
+                          for i in range(N)])
+
+    swing = Swing(20)
+    streamed = []
+    for i, (h, l) in enumerate(zip(high, low)):
+        if i == N // 2:
+            swing = _restored(swing)
+        streamed.append(swing.value or (np.nan, np.nan))
+        swing.update(h, l)
+    np.testing.assert_array_equal(np.array(streamed), reference)
+
+    swing_high, swing_low = swing_levels(high, low, 20)
+    np.testing.assert_array_equal(np.column_stack([swing_high, swing_low]), reference)
+
+
+@pytest.mark.parametrize("window", [1, 3, 7, 20, N, N + 1])
+def test_rolling_max_min_match_pandas(bars, window):
+    np.testing.assert_array_equal(rolling_max(bars["high"], window), bars["high"].rolling(window).max().to_numpy())
+    np.testing.assert_array_equal(rolling_min(bars["low"], window), bars["low"].rolling(window).min().to_numpy())
+
+
+# A state resumed from JSON applies only the bars after last_timestamp and ends where a single pass does
+def test_bibo_indicators_resume(bars):
+    df = bars.set_index(pd.date_range("2020-01-01", periods=N, freq="D", tz="UTC"))
+    full = BiboIndicators()
+    full.update_frame(df)
+
+    resumed = BiboIndicators()
+    resumed.update_frame(df.iloc[:N // 2])
+    resumed = BiboIndicators.from_dict(json.loads(json.dumps(resumed.to_dict())))
+    resumed.update_frame(df)
+
+    assert resumed.values() == full.values()
+    assert resumed.last_timestamp == full.last_timestamp